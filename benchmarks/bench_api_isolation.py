@@ -0,0 +1,111 @@
+"""
+Latence de /prices/latest pendant des prévisions /predict concurrentes.
+
+Le scénario « boucle » exécute lectures SQLite et prévisions Prophet
+directement dans la boucle d'événements (comportement d'origine) ; le
+scénario « pools » les délègue aux exécuteurs de l'API (threads pour
+SQLite, processus pour Prophet).
+
+Usage :
+    python -m benchmarks.bench_api_isolation --predicts 8 --reads 200
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from src.api import executors
+from src.api import main as api
+from src.data import config as data_config
+from src.data.storage import connect_reader
+from src.models.prophet_model import BitcoinProphetModel
+from benchmarks.bench_api_pool import seed
+
+
+def fit_model(db_file):
+    """Entraîne un modèle sur la base de test, sans l'enregistrer."""
+    conn = connect_reader(db_file)
+    df = pd.read_sql_query("""
+        SELECT timestamp, open_price, high_price, low_price, close_price, volume
+        FROM bitcoin_prices ORDER BY timestamp ASC
+    """, conn)
+    conn.close()
+    model = BitcoinProphetModel()
+    model.model.fit(model.prepare_data(df))
+    model.is_trained = True
+    return model
+
+
+def use_inline_executors():
+    """Remplace les pools par une exécution directe dans la boucle."""
+    executors.shutdown_executors()
+    for name in ("db", "forecast"):
+        executors._executors[name] = executors.BoundedExecutor(executors.InlineExecutor(), 10 ** 6, name)
+
+
+async def scenario(n_predicts, n_reads, read_interval):
+    """Lance n_predicts prévisions puis mesure n_reads lectures pendant leur exécution."""
+    latencies = []
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        async def predict():
+            response = await client.post(f"{api.API_PREFIX}/predict", json={"horizon": 7})
+            return response.status_code
+
+        async def read():
+            t0 = time.perf_counter()
+            response = await client.get(f"{api.API_PREFIX}/prices/latest")
+            latencies.append((time.perf_counter() - t0) * 1000)
+            assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        predicts = [asyncio.create_task(predict()) for _ in range(n_predicts)]
+        await asyncio.sleep(0)
+        readers = []
+        for _ in range(n_reads):
+            readers.append(asyncio.create_task(read()))
+            await asyncio.sleep(read_interval)
+        await asyncio.gather(*readers)
+        statuses = await asyncio.gather(*predicts)
+        elapsed = time.perf_counter() - started
+    return np.array(latencies), statuses, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--predicts", type=int, default=8)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--read-interval", type=float, default=0.01)
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_config.DB_FILE = os.path.join(tmp, "bench.db")
+        seed(data_config.DB_FILE, args.rows)
+        model = fit_model(data_config.DB_FILE)
+        api.app.dependency_overrides[api.get_prophet_model] = lambda: model
+
+        print(f"{'scénario':<10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'total s':>10}{'429':>6}")
+        for name in ("boucle", "pools"):
+            if name == "boucle":
+                use_inline_executors()
+            else:
+                executors.shutdown_executors()
+            asyncio.run(scenario(1, 5, 0))  # Échauffement (démarrage des processus)
+            latencies, statuses, elapsed = asyncio.run(
+                scenario(args.predicts, args.reads, args.read_interval)
+            )
+            print(f"{name:<10}{np.percentile(latencies, 50):>10.2f}"
+                  f"{np.percentile(latencies, 99):>10.2f}{latencies.max():>10.2f}"
+                  f"{elapsed:>10.1f}{statuses.count(429):>6}")
+        executors.shutdown_executors()
+        api.close_db_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Test de charge de /prices/latest : connexion par requête vs pool.
+
+Le scénario « avant » remplace la dépendance get_db par l'ancienne
+stratégie (os.path.exists + sqlite3.connect + close à chaque requête) ;
+le scénario « après » utilise le pool de connexions de l'API.
+
+Usage :
+    python -m benchmarks.bench_api_pool --requests 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import numpy as np
+
+from src.api import main as api
+from src.data import config as data_config
+from src.data.storage import connect_writer
+
+
+def per_request_db():
+    """Ancienne stratégie : une connexion ouverte et fermée par requête."""
+    if not os.path.exists(data_config.DB_FILE):
+        raise RuntimeError("Base absente")
+    conn = sqlite3.connect(data_config.DB_FILE, check_same_thread=False)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def seed(db_file, rows):
+    """Crée une base de test avec `rows` bougies horaires."""
+    conn = connect_writer(db_file)
+    start = datetime(2020, 1, 1)
+    conn.executemany("""
+        INSERT INTO bitcoin_prices
+        (timestamp, open_price, high_price, low_price, close_price,
+         volume, volume_buy, transactions, transactions_buy)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        ((start + timedelta(hours=h)).strftime('%Y-%m-%d %H:%M:%S'),
+         100.0, 101.0, 99.0, 100.5, 10.0, 5.0, 3, 1)
+        for h in range(rows)
+    ])
+    conn.commit()
+    conn.close()
+
+
+async def load(n_requests, concurrency):
+    """Envoie n_requests requêtes avec `concurrency` clients simultanés."""
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                t0 = time.perf_counter()
+                response = await client.get(f"{api.API_PREFIX}/prices/latest")
+                latencies.append((time.perf_counter() - t0) * 1000)
+                assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(n_requests)))
+        elapsed = time.perf_counter() - started
+    return np.array(latencies), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_config.DB_FILE = os.path.join(tmp, "bench.db")
+        seed(data_config.DB_FILE, args.rows)
+
+        print(f"{'stratégie':<12}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+        for name, override in (("par requête", per_request_db), ("pool", None)):
+            if override:
+                api.app.dependency_overrides[api.get_db] = override
+            else:
+                api.app.dependency_overrides.pop(api.get_db, None)
+            asyncio.run(load(min(200, args.requests), args.concurrency))  # Échauffement
+            latencies, elapsed = asyncio.run(load(args.requests, args.concurrency))
+            print(f"{name:<12}{np.percentile(latencies, 50):>10.2f}"
+                  f"{np.percentile(latencies, 99):>10.2f}{args.requests / elapsed:>10.0f}")
+        api.close_db_pool()
+
+
+if __name__ == "__main__":
+    main()
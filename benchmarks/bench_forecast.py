@@ -0,0 +1,85 @@
+"""
+Prévisions : Prophet d'origine vs matrices en cache vs horizons groupés.
+
+Le scénario « prophet » reproduit l'ancien chemin (objet Prophet standard,
+cadre futur rempli colonne par colonne) au pas natif des données ; le
+scénario « cache » appelle BitcoinProphetModel.predict (ForecastProphet,
+cadre futur vectorisé) ; le scénario « groupé » calcule tous les horizons
+en un seul appel à predict_horizons. Mesure le temps CPU médian pour
+servir l'ensemble des horizons et l'écart maximal de yhat.
+
+Usage :
+    python -m benchmarks.bench_forecast --horizons 1 3 7 14 30
+"""
+import argparse
+import copy
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+from prophet import Prophet
+
+from src.models.indicator_state import IndicatorState
+from src.models.prophet_model import BitcoinProphetModel
+
+
+def predict_prophet(prophet_model: Prophet, state: IndicatorState, horizon: int):
+    """Ancien chemin : cadre futur construit colonne par colonne, Prophet standard."""
+    features = state.features()
+    future = pd.DataFrame({'ds': pd.date_range(start=features['ds'], periods=horizon * 24 + 1, freq='h')[1:]})
+    for col in prophet_model.extra_regressors:
+        future[col] = features[col]
+    future = future.fillna(0.0)
+    future['volume_norm'] = prophet_model.extra_regressors['volume_norm']['mu']
+    return prophet_model.predict(future)
+
+
+def measure(fn, repeat):
+    """Retourne (temps CPU médian en ms, résultat)."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.process_time()
+        result = fn()
+        timings.append((time.process_time() - t0) * 1000)
+    return np.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--horizons", type=int, nargs="+", default=[1, 3, 7, 14, 30])
+    parser.add_argument("--days", type=int, default=180, help="Historique d'entraînement (bougies horaires)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2023-01-01', periods=args.days * 24, freq='h')
+    df = pd.DataFrame({
+        'timestamp': dates,
+        'close_price': 30000 * np.exp(np.cumsum(rng.normal(0, 0.003, len(dates)))),
+        'volume': rng.uniform(10, 1000, len(dates))
+    })
+    model = BitcoinProphetModel()
+    model.train(df, save=False)
+    state = IndicatorState.from_frame(df)
+    plain = copy.copy(model.model)
+    plain.__class__ = Prophet
+
+    scenarios = {
+        "prophet": lambda: {h: predict_prophet(plain, state, h) for h in args.horizons},
+        "cache": lambda: {h: model.predict(state, h) for h in args.horizons},
+        "groupé": lambda: model.predict_horizons(state, args.horizons)
+    }
+    results = {name: measure(fn, args.repeat) for name, fn in scenarios.items()}
+    reference = results["prophet"][1]
+    print(f"Horizons {args.horizons} jours, pas horaire, {args.days} jours d'historique")
+    print(f"{'scénario':>10}{'CPU ms':>10}{'écart yhat':>12}")
+    for name, (ms, forecasts) in results.items():
+        diff = max(np.abs(forecasts[h]['yhat'].to_numpy() - reference[h]['yhat'].to_numpy()).max()
+                   for h in args.horizons)
+        print(f"{name:>10}{ms:>10.1f}{diff:>12.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Export de l'historique : liste de modèles pydantic vs flux NDJSON/CSV par pages.
+
+Le scénario « json » reproduit l'ancienne réponse de /prices/historical
+(toutes les lignes lues d'un coup, un PriceData par ligne, puis sérialisées
+en un seul document) ; les scénarios « ndjson » et « csv » consomment le
+générateur de l'export en flux (pages keyset de HISTORY_STREAM_CHUNK lignes,
+écrites sans modèle). Mesure la durée et le pic de mémoire Python alloué.
+
+Usage :
+    python -m benchmarks.bench_history_export --rows 200000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from src.api.executors import shutdown_executors
+from src.api.main import PriceData, _history_page, _stream_history
+from src.data.storage import ConnectionPool, connect_writer
+
+
+def run(fn):
+    """Retourne (durée en s, pic de mémoire en Mo, octets produits) ; mémoire mesurée sur un second passage."""
+    t0 = time.perf_counter()
+    size = fn()
+    seconds = time.perf_counter() - t0
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return seconds, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    start = datetime(2000, 1, 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        conn = connect_writer(db_file)
+        conn.executemany("""
+            INSERT INTO bitcoin_prices
+            (timestamp, open_price, high_price, low_price, close_price,
+             volume, volume_buy, transactions, transactions_buy, symbol, interval)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'BTCUSDC.A', '1hour')
+        """, (
+            ((start + timedelta(hours=h)).strftime('%Y-%m-%d %H:%M:%S'),
+             30000.0 + h, 30010.0 + h, 29990.0 + h, 30005.0 + h, 100.5, 50.25, 10, 5)
+            for h in range(args.rows)
+        ))
+        conn.commit()
+        conn.close()
+        pool = ConnectionPool(db_file)
+
+        def as_json():
+            query, params = _history_page("BTCUSDC.A", "1hour", None, None, None, "desc", args.rows)
+            with pool.connection() as c:
+                rows = c.execute(query, params).fetchall()
+            models = [PriceData(**dict(zip(PriceData.model_fields, row))) for row in rows]
+            return len(json.dumps([m.model_dump() for m in models]))
+
+        def as_stream(fmt):
+            async def consume():
+                size = 0
+                async for chunk in _stream_history(pool, "BTCUSDC.A", "1hour", None, None, None, "desc", None, fmt):
+                    size += len(chunk)
+                return size
+            return lambda: asyncio.run(consume())
+
+        print(f"{args.rows} lignes")
+        print(f"{'format':>8}{'s':>8}{'pic Mo':>10}{'Mo produits':>13}")
+        for name, fn in [("json", as_json), ("ndjson", as_stream("ndjson")), ("csv", as_stream("csv"))]:
+            seconds, peak, size = run(fn)
+            print(f"{name:>8}{seconds:>8.2f}{peak:>10.1f}{size / 1e6:>13.1f}")
+        pool.close()
+        shutdown_executors()
+
+
+if __name__ == "__main__":
+    main()
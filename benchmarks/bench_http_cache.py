@@ -0,0 +1,84 @@
+"""
+Endpoints de lecture : réponse recalculée vs cache HTTP vs 304 conditionnel.
+
+Le scénario « recalcul » vide le cache avant chaque requête (ancien
+comportement) ; « cache » sert la réponse mise en cache ; « 304 » envoie
+If-None-Match avec l'ETag reçu et n'obtient que les en-têtes. Mesure la
+latence médiane de bout en bout (TestClient) et les octets de corps reçus.
+
+Usage :
+    python -m benchmarks.bench_http_cache --days 365
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from src.api import main as api
+from src.data import config as data_config
+from src.data.collector import BitcoinDataCollector
+
+ROUTES = [
+    "/api/v1/prices/latest",
+    "/api/v1/prices/historical?limit=1000",
+    "/api/v1/prices/ohlcv?bucket=4hour",
+    "/api/v1/prices/stats?period=1y"
+]
+
+
+def measure(fn, repeat):
+    """Retourne (latence médiane en ms, dernière réponse)."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        response = fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return np.median(timings), response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=365, help="Historique de bougies horaires")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    rng = np.random.default_rng(0)
+    end = datetime.now().replace(minute=0, second=0, microsecond=0)
+    prices = 30000 * np.exp(np.cumsum(rng.normal(0, 0.003, args.days * 24)))
+    rows = [
+        ((end - timedelta(hours=len(prices) - h)).strftime('%Y-%m-%d %H:%M:%S'),
+         p, p * 1.002, p * 0.998, p, 100.0, 55.0, 10, 5)
+        for h, p in enumerate(prices)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        data_config.DB_FILE = os.path.join(tmp, "bench.db")
+        collector = BitcoinDataCollector()
+        collector.connect_db()
+        collector.save_price_data(rows)
+        collector.close()
+
+        with TestClient(api.app) as client:
+            print(f"{'route':<40}{'scénario':>10}{'ms':>8}{'octets':>10}")
+            for route in ROUTES:
+                def uncached():
+                    api.http_cache.clear()
+                    return client.get(route)
+                etag = client.get(route).headers["ETag"]
+                scenarios = {
+                    "recalcul": uncached,
+                    "cache": lambda: client.get(route),
+                    "304": lambda: client.get(route, headers={"If-None-Match": etag})
+                }
+                for name, fn in scenarios.items():
+                    ms, response = measure(fn, args.repeat)
+                    print(f"{route:<40}{name:>10}{ms:>8.2f}{len(response.content):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Indicateurs techniques : appels `ta` par indicateur vs moteur NumPy.
+
+Le scénario « ta » reproduit l'ancien calcul de calculate_technical_indicators
+(un objet `ta` par indicateur et par période d'EMA, puis volatilité, volume
+moyen et retours en pandas) ; le scénario « numpy » appelle
+compute_indicators. Mesure la latence médiane, le pic mémoire (tracemalloc)
+et l'écart maximal entre les deux calculs.
+
+Usage :
+    python -m benchmarks.bench_indicators --sizes 10000 100000 1000000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import ta
+
+from src.models.config import TECHNICAL_INDICATORS
+from src.models.indicators import compute_indicators
+
+
+def compute_ta(close: pd.Series, volume: pd.Series) -> dict:
+    """Ancien calcul : un objet `ta` et des Series pandas par indicateur."""
+    out = {'rsi': ta.momentum.RSIIndicator(close=close, window=TECHNICAL_INDICATORS['RSI']['period']).rsi()}
+    macd = ta.trend.MACD(
+        close=close,
+        window_fast=TECHNICAL_INDICATORS['MACD']['fast_period'],
+        window_slow=TECHNICAL_INDICATORS['MACD']['slow_period'],
+        window_sign=TECHNICAL_INDICATORS['MACD']['signal_period']
+    )
+    out['macd'] = macd.macd()
+    out['macd_signal'] = macd.macd_signal()
+    out['macd_diff'] = macd.macd_diff()
+    bollinger = ta.volatility.BollingerBands(
+        close=close,
+        window=TECHNICAL_INDICATORS['BB']['period'],
+        window_dev=TECHNICAL_INDICATORS['BB']['std_dev']
+    )
+    out['bb_high'] = bollinger.bollinger_hband()
+    out['bb_mid'] = bollinger.bollinger_mavg()
+    out['bb_low'] = bollinger.bollinger_lband()
+    for period in TECHNICAL_INDICATORS['EMA']['periods']:
+        out[f'ta_ema_{period}'] = ta.trend.EMAIndicator(close=close, window=period).ema_indicator()
+    out['volatility'] = close.pct_change().rolling(window=TECHNICAL_INDICATORS['VOLATILITY']['period']).std()
+    out['volume_sma'] = volume.rolling(window=TECHNICAL_INDICATORS['VOLUME_SMA']['period']).mean()
+    for period in TECHNICAL_INDICATORS['RETURNS']['periods']:
+        out[f'return_{period}d'] = close.pct_change(periods=period)
+    return out
+
+
+def measure(fn, repeat):
+    """Retourne (latence médiane en ms, pic mémoire en Mo, résultat)."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return np.median(timings), peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'bougies':>10}{'calcul':>10}{'ms':>10}{'pic Mo':>10}{'écart rel.':>12}")
+    for size in args.sizes:
+        close = pd.Series(30000 * np.exp(np.cumsum(rng.normal(0, 0.002, size))))
+        volume = pd.Series(rng.uniform(10, 1000, size))
+        results = {
+            "ta": measure(lambda: compute_ta(close, volume), args.repeat),
+            "numpy": measure(lambda: compute_indicators(close.to_numpy(), volume.to_numpy()), args.repeat)
+        }
+        reference, engine = results["ta"][2], results["numpy"][2]
+        diff = max(
+            np.nanmax(np.abs(engine[name] - values.to_numpy()) / np.maximum(np.abs(values.to_numpy()), 1))
+            for name, values in reference.items()
+        )
+        for name, (ms, peak, _) in results.items():
+            print(f"{size:>10}{name:>10}{ms:>10.1f}{peak:>10.1f}{diff:>12.1e}")
+
+
+if __name__ == "__main__":
+    main()
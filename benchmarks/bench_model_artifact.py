@@ -0,0 +1,77 @@
+"""
+Artefact du modèle : ancien pickle de l'état complet vs format compact.
+
+Le scénario « pickle » reproduit l'ancienne sauvegarde (objet Prophet et
+copie de toutes les données d'entraînement, chargés par pickle puis
+from_state) ; le scénario « compact » écrit et relit l'artefact de
+src.models.artifact (manifeste, paramètres ajustés, état des indicateurs).
+Mesure la taille du fichier, la latence médiane de chargement et l'écart
+maximal entre les prédictions des deux modèles rechargés.
+
+Usage :
+    python -m benchmarks.bench_model_artifact --days 30 180 365
+"""
+import argparse
+import logging
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.models.prophet_model import BitcoinProphetModel
+
+
+def legacy_bytes(model: BitcoinProphetModel) -> bytes:
+    """Ancienne sauvegarde : état complet pickle."""
+    return pickle.dumps({
+        'model': model.model,
+        'last_data': model.last_data.copy(),
+        'is_trained': model.is_trained,
+        'fit_info': model.fit_info
+    })
+
+
+def measure(fn, repeat):
+    """Retourne (latence médiane en ms, résultat)."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return np.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 180, 365])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    rng = np.random.default_rng(0)
+    print(f"{'jours':>8}{'format':>10}{'Ko':>10}{'chargement ms':>16}{'écart yhat':>12}")
+    for days in args.days:
+        dates = pd.date_range('2023-01-01', periods=days * 24, freq='h')
+        df = pd.DataFrame({
+            'timestamp': dates,
+            'close_price': 30000 * np.exp(np.cumsum(rng.normal(0, 0.003, len(dates)))),
+            'volume': rng.uniform(10, 1000, len(dates))
+        })
+        model = BitcoinProphetModel()
+        model.train(df, save=False)
+
+        payloads = {"pickle": legacy_bytes(model), "compact": model.to_bytes()}
+        loaders = {"pickle": BitcoinProphetModel.from_pickle, "compact": BitcoinProphetModel.from_bytes}
+        results = {
+            name: measure(lambda data=data, load=loaders[name]: load(data), args.repeat)
+            for name, data in payloads.items()
+        }
+        forecasts = {name: loaded.predict(df, 7)['yhat'].to_numpy() for name, (_, loaded) in results.items()}
+        diff = np.max(np.abs(forecasts["compact"] - forecasts["pickle"]))
+        for name, (ms, _) in results.items():
+            print(f"{days:>8}{name:>10}{len(payloads[name]) / 1e3:>10.0f}{ms:>16.1f}{diff:>12.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Historique du graphique : bougies brutes vs agrégation SQL vs table d'agrégats.
+
+Le scénario « brut » reproduit l'ancien chargement du tableau de bord
+(toutes les bougies horaires de la période, regroupées ensuite côté client) ;
+le scénario « agrégation » regroupe les bougies en SQL à la demande ; le
+scénario « rollup » lit les tranches précalculées de bitcoin_ohlcv_rollups.
+Mesure le nombre de lignes renvoyées et la latence médiane de lecture.
+
+Usage :
+    python -m benchmarks.bench_ohlcv --days 90 365 --bucket 4hour
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.data.config import INTERVAL_SECONDS
+from src.data.rollups import ROLLUP_TABLE_SCHEMA, read_ohlcv, update_rollups
+from src.data.storage import connect_writer
+
+
+def measure(fn, repeat):
+    """Retourne (latence médiane en ms, résultat)."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return np.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, nargs="+", default=[90, 365])
+    parser.add_argument("--bucket", default="4hour", choices=["4hour", "daily"])
+    parser.add_argument("--history-days", type=int, default=3 * 365, help="Profondeur de la base (bougies horaires)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    start = datetime(2022, 1, 1)
+    prices = 30000 * np.exp(np.cumsum(rng.normal(0, 0.003, args.history_days * 24)))
+    rows = [
+        ((start + timedelta(hours=h)).strftime('%Y-%m-%d %H:%M:%S'),
+         p, p * 1.002, p * 0.998, p, 100.0, 50.0, 10, 5, 'BTCUSDC.A', '1hour')
+        for h, p in enumerate(prices)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = connect_writer(os.path.join(tmp, "bench.db"))
+        conn.execute(ROLLUP_TABLE_SCHEMA)
+        conn.executemany("""
+            INSERT INTO bitcoin_prices
+            (timestamp, open_price, high_price, low_price, close_price,
+             volume, volume_buy, transactions, transactions_buy, symbol, interval)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        update_rollups(conn)
+        conn.commit()
+
+        seconds = INTERVAL_SECONDS[args.bucket]
+        end = start + timedelta(days=args.history_days)
+        print(f"Tranche {args.bucket}, base de {len(rows)} bougies horaires")
+        print(f"{'jours':>8}{'scénario':>14}{'lignes':>10}{'ms':>10}")
+        for days in args.days:
+            first = (end - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+            last = end.strftime('%Y-%m-%d %H:%M:%S')
+            scenarios = {
+                "brut": lambda: conn.execute("""
+                    SELECT timestamp, open_price, high_price, low_price, close_price,
+                           volume, volume_buy, transactions, transactions_buy
+                    FROM bitcoin_prices
+                    WHERE symbol = 'BTCUSDC.A' AND interval = '1hour' AND timestamp >= ? AND timestamp < ?
+                    ORDER BY timestamp DESC
+                """, (first, last)).fetchall(),
+                "agrégation": lambda: read_ohlcv(conn, bucket_seconds=seconds, start=first, end=last,
+                                                 use_rollups=False)[0],
+                "rollup": lambda: read_ohlcv(conn, bucket_seconds=seconds, start=first, end=last)[0]
+            }
+            for name, fn in scenarios.items():
+                ms, result = measure(fn, args.repeat)
+                print(f"{days:>8}{name:>14}{len(result):>10}{ms:>10.1f}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
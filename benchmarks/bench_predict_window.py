@@ -0,0 +1,82 @@
+"""
+Lecture de l'historique pour /predict : table complète vs fenêtre bornée.
+
+Le scénario « complet » reproduit l'ancienne lecture (pd.read_sql_query de
+toute la table puis prepare_data) ; le scénario « fenêtre » lit les
+PREDICT_HISTORY dernières bougies en colonnes typées. Mesure la latence
+et le pic mémoire (tracemalloc) pour plusieurs tailles de table.
+
+Usage :
+    python -m benchmarks.bench_predict_window --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.data.config import DEFAULT_SYMBOL, DEFAULT_INTERVAL
+from src.data.storage import connect_reader, read_recent_candles
+from src.models.prophet_model import BitcoinProphetModel
+from src.models.indicator_state import PREDICT_HISTORY
+from benchmarks.bench_api_pool import seed
+
+
+def read_full(conn):
+    """Ancienne lecture : toute la table du marché."""
+    return pd.read_sql_query("""
+        SELECT timestamp, open_price, high_price, low_price, close_price, volume
+        FROM bitcoin_prices
+        WHERE symbol = ? AND interval = ?
+        ORDER BY timestamp ASC;
+    """, conn, params=(DEFAULT_SYMBOL, DEFAULT_INTERVAL))
+
+
+def read_window(conn):
+    """Nouvelle lecture : fenêtre bornée en colonnes typées."""
+    return read_recent_candles(conn, DEFAULT_SYMBOL, DEFAULT_INTERVAL, PREDICT_HISTORY)
+
+
+def measure(fn, conn, model, repeat):
+    """Retourne (latence médiane en ms, pic mémoire en Mo, dernière ligne préparée)."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        prepared = model.prepare_data(fn(conn))
+        timings.append((time.perf_counter() - t0) * 1000)
+    tracemalloc.start()
+    model.prepare_data(fn(conn))
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return np.median(timings), peak, prepared.iloc[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    model = BitcoinProphetModel()
+    columns = ['ema_5', 'ema_8', 'ema_13', 'ema_21', 'momentum', 'trend_1d', 'trend_3d', 'trend_5d']
+    print(f"Fenêtre : {PREDICT_HISTORY} bougies")
+    print(f"{'lignes':>10}{'lecture':>10}{'ms':>10}{'pic Mo':>10}{'écart max':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            db_file = os.path.join(tmp, f"bench_{size}.db")
+            seed(db_file, size)
+            conn = connect_reader(db_file)
+            results = {name: measure(fn, conn, model, args.repeat)
+                       for name, fn in (("complet", read_full), ("fenêtre", read_window))}
+            conn.close()
+            diff = np.max(np.abs(results["complet"][2][columns].astype(float).values
+                                 - results["fenêtre"][2][columns].astype(float).values))
+            for name, (ms, peak, _) in results.items():
+                print(f"{size:>10}{name:>10}{ms:>10.1f}{peak:>10.1f}{diff:>12.1e}")
+
+
+if __name__ == "__main__":
+    main()
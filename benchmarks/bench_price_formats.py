@@ -0,0 +1,93 @@
+"""
+Formats de /prices/historical : taille, sérialisation et relecture en DataFrame.
+
+Pour chaque format, mesure sur des lignes SQLite déjà lues la taille de la
+réponse, le temps de sérialisation côté API (« json » : un PriceData par
+ligne comme la réponse par défaut ; « columns » et « arrow » : encodeurs de
+src.api.formats ; « ndjson » et « csv » : encodeur de l'export en flux) et
+le temps de relecture côté client en DataFrame aux timestamps convertis,
+comme le fait le tableau de bord. Résultats ramenés à 10 000 lignes.
+
+Usage :
+    python -m benchmarks.bench_price_formats --rows 10000 100000
+"""
+import argparse
+import io
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.api import formats
+from src.api.main import HISTORY_COLUMNS, PriceData, _encode_history_rows
+
+
+def encode_json(rows):
+    """Réponse par défaut : modèles pydantic puis liste de dictionnaires."""
+    models = [PriceData(**dict(zip(HISTORY_COLUMNS, row))) for row in rows]
+    return json.dumps([m.model_dump() for m in models]).encode()
+
+
+def with_timestamps(df):
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    return df
+
+
+ENCODERS = {
+    "json": encode_json,
+    "columns": lambda rows: formats.encode("columns", HISTORY_COLUMNS, rows),
+    "arrow": lambda rows: formats.encode("arrow", HISTORY_COLUMNS, rows),
+    "ndjson": lambda rows: _encode_history_rows(rows, "ndjson"),
+    "csv": lambda rows: (",".join(HISTORY_COLUMNS) + "\n").encode() + _encode_history_rows(rows, "csv")
+}
+
+DECODERS = {
+    "json": lambda body: with_timestamps(pd.DataFrame(json.loads(body))),
+    "columns": lambda body: with_timestamps(pd.DataFrame(json.loads(body))),
+    "arrow": lambda body: pa.ipc.open_stream(body).read_pandas(),
+    "ndjson": lambda body: with_timestamps(pd.read_json(io.BytesIO(body), lines=True, convert_dates=False)),
+    "csv": lambda body: pd.read_csv(io.BytesIO(body), parse_dates=["timestamp"])
+}
+
+
+def measure(fn, arg, repeat):
+    """Retourne (durée médiane en ms, résultat)."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(arg)
+        timings.append((time.perf_counter() - t0) * 1000)
+    return np.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    start = datetime(2015, 1, 1)
+    for n in args.rows:
+        prices = 30000 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+        rows = [
+            ((start + timedelta(hours=h)).strftime('%Y-%m-%d %H:%M:%S'),
+             float(p), float(p * 1.002), float(p * 0.998), float(p * 1.001),
+             float(rng.uniform(10, 1000)), float(rng.uniform(5, 500)), int(rng.integers(100, 5000)), 50)
+            for h, p in enumerate(prices)
+        ]
+        scale = 10000 / n
+        print(f"{n} lignes (valeurs pour 10 000 lignes)")
+        print(f"{'format':>8}{'Ko':>10}{'sérialisation ms':>18}{'relecture ms':>14}")
+        for name, encoder in ENCODERS.items():
+            encode_ms, body = measure(encoder, rows, args.repeat)
+            decode_ms, df = measure(DECODERS[name], body, args.repeat)
+            assert len(df) == n and df["timestamp"].dtype.kind == "M"
+            print(f"{name:>8}{len(body) * scale / 1e3:>10.0f}{encode_ms * scale:>18.1f}{decode_ms * scale:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark de la latence des lecteurs SQLite pendant un backfill.
+
+Compare la configuration historique (journal par défaut, connexions
+sqlite3.connect) à la couche de stockage (WAL, synchronous=NORMAL,
+lecteurs en lecture seule) : un thread écrit des lots comme le backfill
+pendant que des lecteurs exécutent la requête de /prices/latest.
+
+Usage :
+    python -m benchmarks.bench_sqlite_concurrency --duration 5 --readers 4
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.data.config import PRICE_TABLE_SCHEMA
+from src.data.storage import connect_reader, connect_writer
+
+LATEST_QUERY = """
+    SELECT timestamp, open_price, high_price, low_price, close_price,
+           volume, volume_buy, transactions, transactions_buy
+    FROM bitcoin_prices
+    WHERE symbol = 'BTCUSDC.A' AND interval = '1hour'
+    ORDER BY timestamp DESC
+    LIMIT 1
+"""
+
+INSERT_SQL = """
+    INSERT OR REPLACE INTO bitcoin_prices
+    (timestamp, open_price, high_price, low_price, close_price,
+     volume, volume_buy, transactions, transactions_buy)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def make_batch(start, size):
+    """Génère un lot de bougies horaires consécutives."""
+    return [
+        ((start + timedelta(hours=h)).strftime('%Y-%m-%d %H:%M:%S'),
+         100.0, 101.0, 99.0, 100.5, 10.0, 5.0, 3, 1)
+        for h in range(size)
+    ]
+
+
+def open_writer(mode, db_file):
+    """Connexion d'écriture selon la configuration testée."""
+    if mode == "wal":
+        return connect_writer(db_file)
+    conn = sqlite3.connect(db_file)
+    conn.execute(PRICE_TABLE_SCHEMA)
+    conn.commit()
+    return conn
+
+
+def open_reader(mode, db_file):
+    """Connexion de lecture selon la configuration testée."""
+    return connect_reader(db_file) if mode == "wal" else sqlite3.connect(db_file)
+
+
+def run(mode, db_file, duration, readers, batch_size):
+    """Exécute un scénario et retourne les latences de lecture (ms)."""
+    seed = open_writer(mode, db_file)
+    seed.executemany(INSERT_SQL, make_batch(datetime(2015, 1, 1), 20000))
+    seed.commit()
+    seed.close()
+
+    stop = threading.Event()
+    latencies, errors, written = [], [0], [0]
+    lock = threading.Lock()
+
+    def write_loop():
+        writer = open_writer(mode, db_file)
+        start = datetime(2018, 1, 1)
+        while not stop.is_set():
+            writer.executemany(INSERT_SQL, make_batch(start, batch_size))
+            writer.commit()
+            written[0] += batch_size
+            start += timedelta(hours=batch_size)
+        writer.close()
+
+    def read_loop():
+        conn = open_reader(mode, db_file)
+        local, failures = [], 0
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                conn.execute(LATEST_QUERY).fetchone()
+                local.append((time.perf_counter() - t0) * 1000)
+            except sqlite3.OperationalError:
+                failures += 1
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failures
+
+    threads = [threading.Thread(target=write_loop)]
+    threads += [threading.Thread(target=read_loop) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    return np.array(latencies), errors[0], written[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8}{'lectures':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'erreurs':>10}{'lignes écrites':>16}")
+    for mode in ("default", "wal"):
+        with tempfile.TemporaryDirectory() as tmp:
+            latencies, errors, written = run(
+                mode, os.path.join(tmp, "bench.db"), args.duration, args.readers, args.batch_size
+            )
+        if len(latencies):
+            p50, p99, worst = np.percentile(latencies, 50), np.percentile(latencies, 99), latencies.max()
+        else:
+            p50 = p99 = worst = float("nan")
+        print(f"{mode:<8}{len(latencies):>10}{p50:>10.3f}{p99:>10.3f}{worst:>10.3f}{errors:>10}{written:>16}")
+
+
+if __name__ == "__main__":
+    main()
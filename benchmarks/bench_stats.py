@@ -0,0 +1,77 @@
+"""
+Statistiques de prix : parcours des bougies brutes vs combinaison des agrégats.
+
+Le scénario « brut » reproduit l'ancienne requête de /prices/stats
+(MIN/MAX/AVG/SUM/COUNT sur toutes les bougies de la période) ; le scénario
+« rollup » combine les tranches précalculées de bitcoin_ohlcv_rollups et les
+bougies des extrémités (src.data.rollups.read_stats). Mesure la latence
+médiane par période et par profondeur de base.
+
+Usage :
+    python -m benchmarks.bench_stats --history-days 365 1095 --periods 1 30 365
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.data.rollups import read_stats, update_rollups
+from src.data.storage import connect_writer
+
+
+def measure(fn, repeat):
+    """Retourne (latence médiane en ms, résultat)."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return np.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--history-days", type=int, nargs="+", default=[365, 3 * 365])
+    parser.add_argument("--periods", type=int, nargs="+", default=[1, 30, 365], help="Périodes en jours")
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'base j':>8}{'période j':>11}{'brut ms':>10}{'rollup ms':>11}{'écart vwap':>12}")
+    for history_days in args.history_days:
+        start = datetime(2022, 1, 1)
+        prices = 30000 * np.exp(np.cumsum(rng.normal(0, 0.003, history_days * 24)))
+        rows = [
+            ((start + timedelta(hours=h)).strftime('%Y-%m-%d %H:%M:%S'),
+             p, p * 1.002, p * 0.998, p, 100.0 + h % 7, 50.0, 10, 5, 'BTCUSDC.A', '1hour')
+            for h, p in enumerate(prices)
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = connect_writer(os.path.join(tmp, "bench.db"))
+            conn.executemany("""
+                INSERT INTO bitcoin_prices
+                (timestamp, open_price, high_price, low_price, close_price,
+                 volume, volume_buy, transactions, transactions_buy, symbol, interval)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            update_rollups(conn)
+            conn.commit()
+
+            # Fin de période non alignée, comme une requête « jusqu'à maintenant »
+            end = start + timedelta(days=history_days) - timedelta(minutes=90)
+            for days in args.periods:
+                first = (end - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+                last = end.strftime('%Y-%m-%d %H:%M:%S')
+                raw_ms, (raw, _) = measure(lambda: read_stats(conn, start=first, end=last, use_rollups=False),
+                                           args.repeat)
+                fast_ms, (fast, _) = measure(lambda: read_stats(conn, start=first, end=last), args.repeat)
+                print(f"{history_days:>8}{days:>11}{raw_ms:>10.2f}{fast_ms:>11.2f}"
+                      f"{abs(fast['vwap'] - raw['vwap']):>12.1e}")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
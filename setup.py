@@ -12,6 +12,8 @@ setup(
         "uvicorn>=0.23.0",
         "python-dotenv>=1.0.0",
         "requests>=2.31.0",
+        "httpx>=0.24.0",
+        "pyarrow>=14.0.0",
         "SQLAlchemy>=2.0.0",
         "pydantic>=2.0.0",
     ],
@@ -33,4 +33,21 @@ OPENAPI_URL = "/openapi.json"
 
 # Limites de l'API
 RATE_LIMIT = "100/minute"  # Limite de requêtes par minute
-CACHE_EXPIRATION = 60  # Durée de cache en secondes 
\ No newline at end of file
+CACHE_EXPIRATION = 60  # Durée de vie des réponses du cache HTTP et max-age de Cache-Control (secondes)
+HTTP_CACHE_SIZE = int(os.getenv("HTTP_CACHE_SIZE", "256"))  # Réponses conservées par le cache HTTP (LRU)
+OHLCV_MAX_BUCKETS = 5000  # Tranches max par réponse de /prices/ohlcv
+HISTORY_STREAM_CHUNK = 5000  # Lignes lues par page lors des exports NDJSON/CSV de /prices/historical
+
+# Pool de connexions SQLite en lecture
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))  # Connexions ouvertes au maximum
+DB_POOL_TIMEOUT = 5.0  # Attente max d'une connexion libre (secondes)
+
+# Exécuteurs des tâches bloquantes
+API_DB_THREADS = int(os.getenv("API_DB_THREADS", "8"))  # Threads dédiés aux lectures SQLite
+API_DB_QUEUE = 64  # Lectures en attente avant réponse 429
+API_FORECAST_PROCESSES = int(os.getenv("API_FORECAST_PROCESSES", "2"))  # Processus dédiés à Prophet
+API_FORECAST_QUEUE = 4  # Prévisions en attente avant réponse 429
+API_FORECAST_EXECUTOR = os.getenv("API_FORECAST_EXECUTOR", "process")  # process, thread ou inline
+
+# Cache des prévisions
+FORECAST_CACHE_SIZE = int(os.getenv("FORECAST_CACHE_SIZE", "128"))  # Prévisions conservées (LRU)
@@ -0,0 +1,140 @@
+"""
+Exécuteurs des tâches bloquantes de l'API.
+
+Les lectures SQLite sont déléguées à un pool de threads et les prévisions
+Prophet (CPU) à un pool de processus, afin de ne jamais bloquer la boucle
+d'événements. Chaque pool a une file bornée : au-delà, la requête est
+rejetée avec un 429 plutôt que d'attendre indéfiniment. Chaque processus de
+prévision précharge le modèle publié (voir src.models.registry).
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from src.api.config import (
+    API_DB_THREADS,
+    API_DB_QUEUE,
+    API_FORECAST_PROCESSES,
+    API_FORECAST_QUEUE,
+    API_FORECAST_EXECUTOR
+)
+from src.models.config import MODEL_PATHS
+from src.models.registry import preload_process_model
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(HTTPException):
+    """File d'attente d'un exécuteur pleine (répondue en 429)."""
+
+    def __init__(self, name: str):
+        super().__init__(
+            status_code=429,
+            detail=f"Serveur saturé ({name}), réessayez plus tard",
+            headers={"Retry-After": "1"}
+        )
+
+
+class InlineExecutor(Executor):
+    """Exécute les tâches immédiatement dans le thread appelant (débogage, benchmarks)."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+class BoundedExecutor:
+    """Exécuteur dont le nombre de tâches en cours ou en attente est borné."""
+
+    def __init__(self, executor: Executor, max_pending: int, name: str):
+        """
+        Initialise l'exécuteur borné.
+
+        Args:
+            executor (Executor): Pool sous-jacent
+            max_pending (int): Nombre max de tâches en cours ou en file
+            name (str): Nom utilisé dans les logs et les erreurs
+        """
+        self.executor = executor
+        self.name = name
+        self.max_pending = max_pending
+        # Tâches exécutées dans d'autres processus : arguments sérialisés à chaque appel
+        self.isolated = isinstance(executor, ProcessPoolExecutor)
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    async def run(self, fn, *args):
+        """
+        Exécute `fn(*args)` dans le pool et attend son résultat.
+
+        Raises:
+            QueueFullError: Si la file est pleine
+        """
+        if not self._slots.acquire(blocking=False):
+            logger.warning(f"File {self.name} pleine ({self.max_pending} tâches)")
+            raise QueueFullError(self.name)
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Le créneau n'est libéré qu'à la fin réelle de la tâche, même si le client abandonne
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        """Arrête le pool sous-jacent."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _create(name: str) -> BoundedExecutor:
+    if name == "db":
+        return BoundedExecutor(
+            ThreadPoolExecutor(max_workers=API_DB_THREADS, thread_name_prefix="api-db"),
+            API_DB_THREADS + API_DB_QUEUE,
+            "db"
+        )
+    if API_FORECAST_EXECUTOR == "process":
+        pool = ProcessPoolExecutor(
+            max_workers=API_FORECAST_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=preload_process_model,
+            initargs=(MODEL_PATHS['PROPHET'],)
+        )
+    elif API_FORECAST_EXECUTOR == "thread":
+        pool = ThreadPoolExecutor(max_workers=API_FORECAST_PROCESSES, thread_name_prefix="api-forecast")
+    else:
+        pool = InlineExecutor()
+    return BoundedExecutor(pool, API_FORECAST_PROCESSES + API_FORECAST_QUEUE, "forecast")
+
+
+def get_executor(name: str) -> BoundedExecutor:
+    """
+    Retourne l'exécuteur `db` ou `forecast`, créé à la première utilisation.
+
+    Args:
+        name (str): "db" (lectures SQLite) ou "forecast" (Prophet)
+    """
+    with _executors_lock:
+        if name not in _executors:
+            _executors[name] = _create(name)
+        return _executors[name]
+
+
+def shutdown_executors():
+    """Arrête tous les exécuteurs (arrêt de l'application)."""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown()
+        _executors.clear()
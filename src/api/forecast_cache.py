@@ -0,0 +1,135 @@
+"""
+Cache des prévisions servies par /predict.
+
+Une prévision ne dépend que de la version du modèle, des données stockées
+et des paramètres de la requête. Elle est donc mise en cache sous la clé
+(version du modèle, filigrane des données, horizon, return_components),
+où le filigrane est (timestamp, id) de la dernière bougie : il change dès
+que le collecteur insère ou remplace une bougie, ce qui invalide le cache.
+"""
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class ForecastCache:
+    """Cache LRU des réponses de prévision, avec coalescence des calculs concurrents."""
+
+    def __init__(self, maxsize: int = 128):
+        """
+        Initialise le cache.
+
+        Args:
+            maxsize (int): Nombre maximal de prévisions conservées
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._watermark = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def set_watermark(self, watermark):
+        """
+        Enregistre le filigrane courant des données, en vidant le cache s'il a changé.
+
+        Args:
+            watermark (tuple): (timestamp, id) de la dernière bougie stockée
+        """
+        with self._lock:
+            if watermark != self._watermark:
+                if self._entries:
+                    logger.info(f"Nouvelle bougie {watermark[0]} : cache des prévisions invalidé")
+                    self.invalidations += 1
+                self._entries.clear()
+                self._watermark = watermark
+
+    def get(self, key):
+        """Retourne la prévision en cache (et la marque récente), ou None."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            return None
+
+    def put(self, key, value):
+        """Ajoute une prévision, en évinçant la moins récemment utilisée si besoin."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def get_or_compute(self, key, compute):
+        """
+        Retourne la prévision en cache ou la calcule une seule fois.
+
+        Les requêtes identiques arrivant pendant le calcul attendent son
+        résultat au lieu de relancer Prophet.
+
+        Args:
+            key (tuple): Clé de la prévision
+            compute (callable): Coroutine sans argument produisant la prévision
+
+        Returns:
+            dict: Réponse de prévision
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Évite l'avertissement si personne n'attend
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        # Le filigrane a pu changer pendant le calcul : ne pas stocker une prévision périmée
+        if key[1] == self._watermark:
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Vide le cache et remet les compteurs à zéro."""
+        with self._lock:
+            self._entries.clear()
+            self._watermark = None
+            self.hits = self.misses = self.coalesced = self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict:
+        """Compteurs du cache."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else None
+            }
@@ -0,0 +1,133 @@
+"""
+Formats de réponse en colonnes des endpoints de prix.
+
+Les lignes SQLite sont transposées en colonnes (une liste par champ), sans
+modèle pydantic ni dictionnaire par ligne, puis encodées :
+
+- en JSON par colonnes ({"timestamp": [...], "close_price": [...]}) : les
+  noms de champs n'apparaissent qu'une fois et le client construit un
+  DataFrame directement avec pd.DataFrame(payload) ;
+- en Apache Arrow IPC (flux) : colonnes binaires typées, timestamps compris,
+  relues sans analyse de texte par pyarrow.ipc.open_stream(...).read_pandas().
+
+Le format est choisi par le paramètre `format` s'il est fourni, sinon par
+l'en-tête Accept (négociation de contenu, q-valeurs comprises).
+"""
+import json
+from typing import Dict, List, Optional, Sequence
+
+import pyarrow as pa
+
+# Types MIME des formats négociables
+MEDIA_TYPES = {
+    "json": "application/json",
+    "columns": "application/vnd.bitcoin-trends.columns+json",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+# Types Arrow des colonnes des endpoints de prix
+ARROW_TYPES = {
+    "timestamp": pa.timestamp("us"),
+    "transactions": pa.int64(),
+    "transactions_buy": pa.int64(),
+    "candles": pa.int64()
+}
+
+
+def negotiate(fmt: Optional[str], accept: Optional[str], allowed: Sequence[str]) -> str:
+    """
+    Choisit le format d'une réponse.
+
+    Args:
+        fmt: Paramètre `format` de la requête (prioritaire)
+        accept: En-tête Accept
+        allowed: Formats proposés par l'endpoint, le premier par défaut
+
+    Returns:
+        str: Format retenu
+
+    Raises:
+        ValueError: Si le format demandé n'est pas proposé par l'endpoint
+    """
+    if fmt:
+        if fmt not in allowed:
+            raise ValueError(f"Format invalide. Utilisez {', '.join(allowed)}")
+        return fmt
+    by_media_type = {MEDIA_TYPES[name]: name for name in allowed}
+    ranges = []
+    for position, item in enumerate((accept or "").split(",")):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        ranges.append((-quality, position, media_type.lower()))
+    for negative_quality, _, media_type in sorted(ranges):
+        if negative_quality < 0 and media_type in by_media_type:
+            return by_media_type[media_type]
+    return allowed[0]
+
+
+def to_columns(names: Sequence[str], rows: List[tuple]) -> Dict[str, list]:
+    """Transpose des lignes SQLite en une liste par colonne."""
+    if not rows:
+        return {name: [] for name in names}
+    return dict(zip(names, (list(values) for values in zip(*rows))))
+
+
+def encode_columns(names: Sequence[str], rows: List[tuple]) -> bytes:
+    """Encode des lignes en JSON par colonnes."""
+    return json.dumps(to_columns(names, rows), separators=(",", ":")).encode()
+
+
+def arrow_table(names: Sequence[str], rows: List[tuple]) -> pa.Table:
+    """
+    Table Arrow typée construite depuis des lignes SQLite.
+
+    Args:
+        names: Noms des colonnes, dans l'ordre des lignes
+        rows: Lignes du curseur
+
+    Returns:
+        pa.Table: Une colonne par champ (timestamps en microsecondes, entiers, flottants)
+    """
+    columns = to_columns(names, rows)
+    arrays = []
+    for name in names:
+        target = ARROW_TYPES.get(name, pa.float64())
+        if name == "timestamp":
+            arrays.append(pa.array(columns[name], type=pa.string()).cast(target))
+        else:
+            arrays.append(pa.array(columns[name], type=target))
+    return pa.Table.from_arrays(arrays, names=list(names))
+
+
+def encode_arrow(names: Sequence[str], rows: List[tuple]) -> bytes:
+    """Encode des lignes en flux Arrow IPC."""
+    table = arrow_table(names, rows)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode(fmt: str, names: Sequence[str], rows: List[tuple]) -> bytes:
+    """
+    Encode des lignes dans un format en colonnes.
+
+    Args:
+        fmt: columns ou arrow
+        names: Noms des colonnes
+        rows: Lignes du curseur
+
+    Returns:
+        bytes: Corps de la réponse
+    """
+    if fmt == "arrow":
+        return encode_arrow(names, rows)
+    return encode_columns(names, rows)
@@ -1,11 +1,18 @@
 """
 Point d'entrée principal de l'API REST Bitcoin Trends.
 """
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from contextlib import asynccontextmanager
 import sqlite3
-from datetime import datetime, timedelta
+import threading
+import time
+import re
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
 import os
 from typing import List, Optional
 import pandas as pd
@@ -19,24 +26,144 @@ from src.api.config import (
     CORS_ORIGINS,
     DOCS_URL,
     REDOC_URL,
-    OPENAPI_URL
+    OPENAPI_URL,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    API_DB_THREADS,
+    API_FORECAST_PROCESSES,
+    API_FORECAST_EXECUTOR,
+    FORECAST_CACHE_SIZE,
+    OHLCV_MAX_BUCKETS,
+    HISTORY_STREAM_CHUNK,
+    CACHE_EXPIRATION,
+    HTTP_CACHE_SIZE
 )
-from src.data.config import DB_FILE
+from src.api import formats
+from src.api.executors import get_executor, shutdown_executors
+from src.api.forecast_cache import ForecastCache
+from src.api.response_cache import CachedResponse, ResponseCache, http_date, not_modified, strong_etag
+from src.data import config as data_config
+from src.data.config import DEFAULT_SYMBOL, DEFAULT_INTERVAL, INTERVAL_SECONDS
+from src.data.storage import (
+    ConnectionPool,
+    connect_reader,
+    connect_writer,
+    load_indicator_state,
+    needs_migration,
+    read_recent_candles
+)
+from src.data.feature_store import read_training_data
+from src.data.rollups import OHLCV_COLUMNS, parse_bucket, read_ohlcv, read_stats
 from src.models.prophet_model import BitcoinProphetModel
-from src.models.config import MODEL_PATHS, LOGGING_CONFIG
+from src.models.indicator_state import IndicatorState, PREDICT_HISTORY
+from src.models.registry import ModelRegistry, LoadedModel, StaleModelError, forecast_process
+from src.models.backtest import load_report as load_backtest_report
+from src.models.config import MODEL_PATHS, LOGGING_CONFIG, FORECAST_CONFIG
 
 # Configuration du logging
 os.makedirs(os.path.dirname(LOGGING_CONFIG['filename']), exist_ok=True)
 logging.basicConfig(**LOGGING_CONFIG)
 logger = logging.getLogger(__name__)
 
+# Pool de connexions en lecture, partagé par toutes les requêtes
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+def get_db_pool() -> ConnectionPool:
+    """
+    Retourne le pool de connexions de la base courante.
+    
+    Le pool est créé au démarrage de l'application, ou à la première
+    requête si la base n'existait pas encore ; il est recréé si DB_FILE
+    change (tests). Le schéma est vérifié par une connexion en lecture
+    seule : l'API n'ouvre une connexion d'écriture ponctuelle que pour migrer
+    une base au schéma historique, et répond par une erreur explicite si
+    cette migration est impossible (base montée en lecture seule...).
+    """
+    global _db_pool
+    if not os.path.exists(data_config.DB_FILE):
+        raise HTTPException(
+            status_code=500,
+            detail="Base de données non trouvée. Veuillez lancer la collecte des données."
+        )
+    with _db_pool_lock:
+        if _db_pool is None or _db_pool.db_file != data_config.DB_FILE:
+            if _db_pool is not None:
+                _db_pool.close()
+                _db_pool = None
+            try:
+                conn = connect_reader(data_config.DB_FILE)
+                try:
+                    legacy = needs_migration(conn)
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Erreur de base de données: {str(e)}"
+                )
+            if legacy:
+                try:
+                    connect_writer(data_config.DB_FILE).close()
+                    logger.info(f"Schéma de {data_config.DB_FILE} migré vers le schéma multi-marchés")
+                except (sqlite3.Error, OSError) as e:
+                    logger.error(f"❌ Migration du schéma de {data_config.DB_FILE} impossible : {str(e)}")
+                    raise HTTPException(
+                        status_code=500,
+                        detail=(
+                            f"Base au schéma historique non migrée ({str(e)}). Lancez le collecteur "
+                            "(python -m src.data.collector) avec un accès en écriture pour la migrer."
+                        )
+                    )
+            _db_pool = ConnectionPool(data_config.DB_FILE, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT)
+        return _db_pool
+
+# Registre du modèle Prophet, chargé au démarrage et rechargé à chaud
+model_registry = ModelRegistry(MODEL_PATHS["PROPHET"])
+
+# Cache des prévisions, invalidé à chaque nouvelle bougie
+forecast_cache = ForecastCache(FORECAST_CACHE_SIZE)
+
+# Cache HTTP des endpoints de lecture, invalidé à chaque écriture de bougie
+http_cache = ResponseCache(HTTP_CACHE_SIZE, ttl=CACHE_EXPIRATION)
+
+def close_db_pool():
+    """Ferme le pool de connexions."""
+    global _db_pool
+    with _db_pool_lock:
+        if _db_pool is not None:
+            _db_pool.close()
+            _db_pool = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Ouvre les ressources partagées au démarrage et les libère à l'arrêt."""
+    if os.path.exists(data_config.DB_FILE):
+        # Base existante : un schéma impossible à migrer fait échouer le démarrage
+        get_db_pool()
+        logger.info(f"Pool de connexions prêt ({DB_POOL_SIZE} connexions max)")
+    else:
+        logger.warning("Base de données absente au démarrage, pool créé à la première requête")
+    model_registry.start()
+    get_executor("db")
+    get_executor("forecast")
+    logger.info(
+        f"Exécuteurs prêts ({API_DB_THREADS} threads SQLite, "
+        f"{API_FORECAST_PROCESSES} workers Prophet en mode {API_FORECAST_EXECUTOR})"
+    )
+    yield
+    model_registry.stop()
+    shutdown_executors()
+    close_db_pool()
+
 # Création de l'application FastAPI
 app = FastAPI(
     title=API_TITLE,
     description=API_DESCRIPTION,
     docs_url=DOCS_URL,
     redoc_url=REDOC_URL,
-    openapi_url=OPENAPI_URL
+    openapi_url=OPENAPI_URL,
+    lifespan=lifespan
 )
 
 # Configuration CORS
@@ -74,6 +201,10 @@ class PriceData(BaseModel):
     transactions: int
     transactions_buy: int
 
+class OHLCVBar(PriceData):
+    """Tranche OHLCV agrégée (timestamp : début de la tranche)."""
+    candles: int  # Bougies agrégées dans la tranche
+
 class PredictionRequest(BaseModel):
     """Modèle de requête pour les prédictions."""
     horizon: int = 7  # Nombre de jours à prédire
@@ -95,14 +226,115 @@ class PredictionResponse(BaseModel):
         }
 
 # Fonctions utilitaires
-def get_db_connection():
-    """Crée une connexion à la base de données SQLite."""
-    if not os.path.exists(DB_FILE):
+def get_db():
+    """Dépendance fournissant une connexion en lecture empruntée au pool."""
+    pool = get_db_pool()
+    try:
+        conn = pool.acquire()
+    except TimeoutError:
         raise HTTPException(
-            status_code=500,
-            detail="Base de données non trouvée. Veuillez lancer la collecte des données."
+            status_code=503,
+            detail="Trop de requêtes simultanées, réessayez plus tard"
+        )
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+# Les requêtes SQLite et les prévisions sont bloquantes : elles sont exécutées
+# hors de la boucle d'événements, dans les pools de src.api.executors
+def _fetchone(conn, query, params=()):
+    return conn.execute(query, params).fetchone()
+
+def _fetchall(conn, query, params=()):
+    return conn.execute(query, params).fetchall()
+
+def _forecast(model, data, horizon):
+    return model.predict(data, horizon)
+
+async def run_db(fn, *args):
+    """Exécute une lecture SQLite dans le pool de threads dédié."""
+    return await get_executor("db").run(fn, *args)
+
+# Validation des paramètres, déclarée en dépendance avant get_db pour
+# répondre 400 sans emprunter de connexion
+def valid_interval(interval: str = DEFAULT_INTERVAL) -> str:
+    """Vérifie que l'intervalle demandé est supporté."""
+    if interval not in INTERVAL_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Intervalle invalide. Utilisez {', '.join(INTERVAL_SECONDS)}"
         )
-    return sqlite3.connect(DB_FILE)
+    return interval
+
+def valid_start_date(start_date: Optional[str] = None) -> Optional[str]:
+    """Vérifie le format de la date de début (YYYY-MM-DD)."""
+    if start_date:
+        try:
+            datetime.strptime(start_date, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="Format de date de début invalide. Utilisez YYYY-MM-DD"
+            )
+    return start_date
+
+def valid_end_date(end_date: Optional[str] = None) -> Optional[str]:
+    """Vérifie le format de la date de fin (YYYY-MM-DD)."""
+    if end_date:
+        try:
+            datetime.strptime(end_date, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="Format de date de fin invalide. Utilisez YYYY-MM-DD"
+            )
+    return end_date
+
+def valid_bucket(bucket: str = "daily", interval: str = Depends(valid_interval)) -> int:
+    """Vérifie la tranche d'agrégation et retourne sa durée en secondes."""
+    try:
+        seconds = parse_bucket(bucket)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tranche invalide. Utilisez {', '.join(INTERVAL_SECONDS)} ou une durée (15min, 3h, 7d)"
+        )
+    if seconds % INTERVAL_SECONDS[interval]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"La tranche doit être un multiple de l'intervalle {interval}"
+        )
+    return seconds
+
+PERIOD_PATTERN = re.compile(r"^(\d+)(h|d|y)$")
+PERIOD_SECONDS = {"h": 3600, "d": 86400, "y": 365 * 86400}
+
+def valid_period(period: Optional[str] = "24h") -> str:
+    """Vérifie la période des statistiques (nombre suivi de h, d ou y : 24h, 90d, 1y)."""
+    match = PERIOD_PATTERN.match(period or "")
+    if not match or int(match.group(1)) == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="Période invalide. Utilisez un nombre suivi de h, d ou y (24h, 7d, 30d, 90d, 1y)"
+        )
+    return period
+
+def valid_prediction_request(request: PredictionRequest) -> PredictionRequest:
+    """Vérifie l'horizon de prédiction."""
+    if request.horizon <= 0:
+        logger.warning(f"Horizon invalide: {request.horizon}")
+        raise HTTPException(
+            status_code=400,
+            detail="L'horizon de prédiction doit être supérieur à 0"
+        )
+    if request.horizon > FORECAST_CONFIG["MAX_HORIZON_DAYS"]:
+        logger.warning(f"Horizon trop grand: {request.horizon}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"L'horizon de prédiction ne peut pas dépasser {FORECAST_CONFIG['MAX_HORIZON_DAYS']} jours"
+        )
+    return request
 
 # Middleware pour la gestion globale des erreurs
 @app.middleware("http")
@@ -122,6 +354,63 @@ async def error_handling_middleware(request, call_next):
             content={"detail": str(e)}
         )
 
+# Routes servies par le cache HTTP : réponses ne dépendant que des bougies stockées
+HTTP_CACHED_ROUTES = {
+    f"{API_PREFIX}/markets",
+    f"{API_PREFIX}/prices/latest",
+    f"{API_PREFIX}/prices/historical",
+    f"{API_PREFIX}/prices/ohlcv",
+    f"{API_PREFIX}/prices/stats"
+}
+
+def _write_watermark(pool):
+    """Filigrane d'écriture : plus grand id de bitcoin_prices (croît à chaque insertion ou remplacement)."""
+    with pool.connection() as conn:
+        return conn.execute("SELECT MAX(id) FROM bitcoin_prices").fetchone()[0]
+
+@app.middleware("http")
+async def http_cache_middleware(request, call_next):
+    """
+    Cache HTTP des endpoints de lecture : ETag fort, Last-Modified et réponses 304.
+    
+    Les exports en flux (ndjson, csv) et les réponses d'erreur ne sont pas
+    mis en cache ; si le filigrane ne peut être lu, la route répond seule.
+    """
+    route = request.url.path
+    if request.method != "GET" or route not in HTTP_CACHED_ROUTES:
+        return await call_next(request)
+    try:
+        watermark = await run_db(_write_watermark, get_db_pool())
+    except (HTTPException, sqlite3.Error, TimeoutError):
+        return await call_next(request)
+    http_cache.set_watermark(watermark)
+    key = (route, tuple(sorted(request.query_params.multi_items())), request.headers.get("accept", ""))
+    
+    entry = http_cache.get(route, key)
+    if entry is None:
+        response = await call_next(request)
+        media_type = response.headers.get("content-type", "").split(";")[0]
+        if response.status_code != 200 or media_type in STREAM_MEDIA_TYPES:
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+        # Last-Modified : calcul de ce corps (les périodes relatives à l'heure courante
+        # changent sans nouvelle bougie, à l'expiration du TTL)
+        entry = CachedResponse(body, 200, headers, strong_etag(body), time.time(), time.monotonic())
+        http_cache.put(key, entry, watermark)
+    
+    validators = {
+        "ETag": entry.etag,
+        "Last-Modified": http_date(entry.last_modified),
+        "Cache-Control": f"max-age={CACHE_EXPIRATION}"
+    }
+    if not_modified(entry, request.headers.get("if-none-match"), request.headers.get("if-modified-since")):
+        http_cache.record_not_modified(route)
+        if "vary" in entry.headers:
+            validators["Vary"] = entry.headers["vary"]
+        return Response(status_code=304, headers=validators)
+    return Response(content=entry.body, status_code=entry.status_code, headers={**entry.headers, **validators})
+
 # Routes de l'API
 @app.get("/")
 async def root():
@@ -132,22 +421,55 @@ async def root():
         "description": "API pour l'analyse des tendances du Bitcoin"
     }
 
-@app.get(f"{API_PREFIX}/prices/latest", response_model=PriceData)
-async def get_latest_price():
-    """Récupère le dernier prix du Bitcoin."""
+@app.get(f"{API_PREFIX}/markets")
+async def get_markets(conn: sqlite3.Connection = Depends(get_db)):
+    """Liste les marchés (symbole, intervalle) disponibles en base."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        rows = await run_db(_fetchall, conn, """
+            SELECT symbol, interval, COUNT(*), MIN(timestamp), MAX(timestamp)
+            FROM bitcoin_prices
+            GROUP BY symbol, interval
+            ORDER BY symbol, interval
+        """)
+        return [
+            {
+                "symbol": row[0],
+                "interval": row[1],
+                "data_points": row[2],
+                "first_timestamp": row[3],
+                "last_timestamp": row[4]
+            }
+            for row in rows
+        ]
         
-        cursor.execute("""
+    except sqlite3.Error as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur de base de données: {str(e)}"
+        )
+
+@app.get(f"{API_PREFIX}/prices/latest", response_model=PriceData)
+async def get_latest_price(
+    symbol: str = DEFAULT_SYMBOL,
+    interval: str = Depends(valid_interval),
+    conn: sqlite3.Connection = Depends(get_db)
+):
+    """
+    Récupère le dernier prix d'un marché.
+    
+    - symbol: Symbole Coinalyze (défaut: BTCUSDC.A)
+    - interval: Intervalle des bougies (défaut: 1hour)
+    """
+    try:
+        row = await run_db(_fetchone, conn, """
             SELECT timestamp, open_price, high_price, low_price, close_price,
                    volume, volume_buy, transactions, transactions_buy
             FROM bitcoin_prices
+            WHERE symbol = ? AND interval = ?
             ORDER BY timestamp DESC
             LIMIT 1
-        """)
+        """, (symbol, interval))
         
-        row = cursor.fetchone()
         if not row:
             raise HTTPException(
                 status_code=404,
@@ -171,68 +493,170 @@ async def get_latest_price():
             status_code=500,
             detail=f"Erreur de base de données: {str(e)}"
         )
-    finally:
-        conn.close()
+
+# Colonnes de /prices/historical, dans l'ordre des requêtes et des exports
+HISTORY_COLUMNS = [
+    "timestamp", "open_price", "high_price", "low_price", "close_price",
+    "volume", "volume_buy", "transactions", "transactions_buy"
+]
+
+# Formats proposés, le premier par défaut (paramètre format ou en-tête Accept)
+HISTORY_FORMATS = ("json", "columns", "arrow", "ndjson", "csv")
+OHLCV_FORMATS = ("json", "columns", "arrow")
+STREAM_FORMATS = ("ndjson", "csv")
+STREAM_MEDIA_TYPES = {formats.MEDIA_TYPES[fmt] for fmt in STREAM_FORMATS}
+
+def _history_page(symbol, interval, start_date, end_date, cursor, order, limit):
+    """
+    Requête d'une page de l'historique, paginée par timestamp (keyset).
+    
+    La page suivante reprend strictement après le timestamp `cursor` de la
+    dernière ligne lue, dans l'ordre demandé : le coût d'une page ne dépend
+    pas de sa position dans l'historique, contrairement à un OFFSET.
+    """
+    query = f"""
+        SELECT {', '.join(HISTORY_COLUMNS)}
+        FROM bitcoin_prices
+        WHERE symbol = ? AND interval = ?
+    """
+    params = [symbol, interval]
+    
+    if start_date:
+        query += " AND timestamp >= ?"
+        params.append(start_date)
+    
+    if end_date:
+        query += " AND timestamp <= ?"
+        params.append(end_date)
+    
+    if cursor:
+        query += " AND timestamp < ?" if order == "desc" else " AND timestamp > ?"
+        params.append(cursor)
+    
+    query += f" ORDER BY timestamp {order.upper()}"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    return query, params
+
+def _fetch_history_page(pool, query, params):
+    with pool.connection() as conn:
+        return conn.execute(query, params).fetchall()
+
+def _encode_history_rows(rows, fmt: str) -> bytes:
+    """Encode un lot de lignes en NDJSON ou en CSV (sans en-tête)."""
+    if fmt == "ndjson":
+        return "".join(json.dumps(dict(zip(HISTORY_COLUMNS, row))) + "\n" for row in rows).encode()
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue().encode()
+
+async def _stream_history(pool, symbol, interval, start_date, end_date, cursor, order, limit, fmt):
+    """
+    Flux NDJSON ou CSV de l'historique, lu par pages de HISTORY_STREAM_CHUNK lignes.
+    
+    Chaque page emprunte une connexion le temps de sa lecture puis est
+    écrite telle quelle, sans modèle pydantic : la mémoire reste bornée à
+    une page quel que soit le nombre de lignes exportées.
+    """
+    if fmt == "csv":
+        yield (",".join(HISTORY_COLUMNS) + "\n").encode()
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = HISTORY_STREAM_CHUNK if remaining is None else min(HISTORY_STREAM_CHUNK, remaining)
+        query, params = _history_page(symbol, interval, start_date, end_date, cursor, order, size)
+        try:
+            rows = await run_db(_fetch_history_page, pool, query, params)
+        except (sqlite3.Error, TimeoutError) as e:
+            logger.error(f"❌ Export de l'historique interrompu après {cursor}: {str(e)}")
+            raise
+        if not rows:
+            break
+        yield _encode_history_rows(rows, fmt)
+        cursor = rows[-1][0]
+        if remaining is not None:
+            remaining -= len(rows)
+        if len(rows) < size:
+            break
+
+def valid_history_cursor(cursor: Optional[str] = None) -> Optional[str]:
+    """Vérifie le curseur de pagination (timestamp de la dernière ligne lue)."""
+    if cursor:
+        try:
+            datetime.fromisoformat(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="Curseur invalide. Utilisez la valeur de l'en-tête X-Next-Cursor"
+            )
+    return cursor
 
 @app.get(f"{API_PREFIX}/prices/historical", response_model=List[PriceData])
 async def get_historical_prices(
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
-    limit: Optional[int] = 100
+    response: Response,
+    start_date: Optional[str] = Depends(valid_start_date),
+    end_date: Optional[str] = Depends(valid_end_date),
+    limit: Optional[int] = None,
+    cursor: Optional[str] = Depends(valid_history_cursor),
+    order: str = "desc",
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(None),
+    symbol: str = DEFAULT_SYMBOL,
+    interval: str = Depends(valid_interval),
+    conn: sqlite3.Connection = Depends(get_db)
 ):
     """
-    Récupère l'historique des prix du Bitcoin.
+    Récupère l'historique des prix d'un marché.
+    
+    La pagination se fait par curseur : une page pleine renvoie l'en-tête
+    X-Next-Cursor, à repasser en paramètre cursor pour obtenir la suivante.
+    Les formats columns (JSON par colonnes) et arrow (Apache Arrow IPC) sont
+    construits directement depuis le curseur SQLite ; ndjson et csv
+    diffusent les lignes au fil de la lecture (mémoire constante, pour les
+    exports volumineux). Sans paramètre format, l'en-tête Accept choisit.
     
     - start_date: Date de début (format: YYYY-MM-DD)
     - end_date: Date de fin (format: YYYY-MM-DD)
-    - limit: Nombre maximum de résultats (défaut: 100)
+    - limit: Nombre maximum de résultats (défaut: 100 en json, tout l'historique en ndjson/csv)
+    - cursor: Timestamp de la dernière ligne de la page précédente (en-tête X-Next-Cursor)
+    - order: Ordre chronologique, desc (défaut) ou asc
+    - format: json (défaut), columns, arrow, ndjson ou csv
+    - symbol: Symbole Coinalyze (défaut: BTCUSDC.A)
+    - interval: Intervalle des bougies (défaut: 1hour)
     """
-    conn = None
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="Ordre invalide. Utilisez asc ou desc")
     try:
-        # Valider les dates
-        if start_date:
-            try:
-                datetime.strptime(start_date, "%Y-%m-%d")
-            except ValueError:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Format de date de début invalide. Utilisez YYYY-MM-DD"
-                )
-        
-        if end_date:
-            try:
-                datetime.strptime(end_date, "%Y-%m-%d")
-            except ValueError:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Format de date de fin invalide. Utilisez YYYY-MM-DD"
-                )
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT timestamp, open_price, high_price, low_price, close_price,
-                   volume, volume_buy, transactions, transactions_buy
-            FROM bitcoin_prices
-            WHERE 1=1
-        """
-        params = []
-        
-        if start_date:
-            query += " AND timestamp >= ?"
-            params.append(start_date)
-        
-        if end_date:
-            query += " AND timestamp <= ?"
-            params.append(end_date)
-            
-        query += " ORDER BY timestamp DESC LIMIT ?"
-        params.append(limit)
-        
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        fmt = formats.negotiate(format, accept, HISTORY_FORMATS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if limit is not None and limit <= 0:
+        raise HTTPException(status_code=400, detail="La limite doit être supérieure à 0")
+    
+    headers = {"Vary": "Accept"}
+    if fmt in STREAM_FORMATS:
+        if fmt == "csv":
+            headers["Content-Disposition"] = f'attachment; filename="{symbol}_{interval}.csv"'
+        return StreamingResponse(
+            _stream_history(get_db_pool(), symbol, interval, start_date, end_date, cursor, order, limit, fmt),
+            media_type=formats.MEDIA_TYPES[fmt],
+            headers=headers
+        )
+    
+    limit = 100 if limit is None else limit
+    try:
+        query, params = _history_page(symbol, interval, start_date, end_date, cursor, order, limit)
+        rows = await run_db(_fetchall, conn, query, params)
         
+        if len(rows) == limit:
+            headers["X-Next-Cursor"] = rows[-1][0]
+        if fmt != "json":
+            return Response(
+                content=formats.encode(fmt, HISTORY_COLUMNS, rows),
+                media_type=formats.MEDIA_TYPES[fmt],
+                headers=headers
+            )
+        response.headers.update(headers)
         return [
             PriceData(
                 timestamp=row[0],
@@ -253,194 +677,306 @@ async def get_historical_prices(
             status_code=500,
             detail=f"Erreur de base de données: {str(e)}"
         )
-    finally:
-        if conn:
-            conn.close()
+
+@app.get(f"{API_PREFIX}/prices/ohlcv", response_model=List[OHLCVBar])
+async def get_ohlcv(
+    response: Response,
+    bucket_seconds: int = Depends(valid_bucket),
+    start_date: Optional[str] = Depends(valid_start_date),
+    end_date: Optional[str] = Depends(valid_end_date),
+    limit: int = 1000,
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(None),
+    symbol: str = DEFAULT_SYMBOL,
+    interval: str = Depends(valid_interval),
+    conn: sqlite3.Connection = Depends(get_db)
+):
+    """
+    Agrège l'historique des prix d'un marché par tranches de temps.
+    
+    Chaque tranche reprend l'open de sa première bougie, le close de sa
+    dernière, les extrêmes et la somme des volumes et transactions. Les
+    tranches courantes (1hour, 4hour, daily) sont précalculées ; l'en-tête
+    X-OHLCV-Source indique si la réponse vient de la table d'agrégats
+    (rollup) ou d'une agrégation à la demande (aggregate).
+    
+    - bucket: Tranche (intervalle Coinalyze ou durée : 15min, 3h, 7d ; défaut: daily)
+    - start_date: Date de début (format: YYYY-MM-DD)
+    - end_date: Date de fin incluse (format: YYYY-MM-DD)
+    - limit: Nombre maximum de tranches, les plus récentes (défaut: 1000)
+    - format: json (défaut), columns ou arrow (sinon selon l'en-tête Accept)
+    - symbol: Symbole Coinalyze (défaut: BTCUSDC.A)
+    - interval: Intervalle des bougies agrégées (défaut: 1hour)
+    """
+    try:
+        fmt = formats.negotiate(format, accept, OHLCV_FORMATS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not 0 < limit <= OHLCV_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"La limite doit être comprise entre 1 et {OHLCV_MAX_BUCKETS}"
+        )
+    end = None
+    if end_date:
+        end = (datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    try:
+        rows, source = await run_db(read_ohlcv, conn, symbol, interval, bucket_seconds, start_date, end, limit)
+    except sqlite3.Error as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur de base de données: {str(e)}"
+        )
+    headers = {"X-OHLCV-Source": source, "Vary": "Accept"}
+    if fmt != "json":
+        return Response(
+            content=formats.encode(fmt, ["timestamp"] + OHLCV_COLUMNS, rows),
+            media_type=formats.MEDIA_TYPES[fmt],
+            headers=headers
+        )
+    response.headers.update(headers)
+    return [
+        OHLCVBar(
+            timestamp=row[0],
+            open_price=row[1],
+            high_price=row[2],
+            low_price=row[3],
+            close_price=row[4],
+            volume=row[5] or 0.0,
+            volume_buy=row[6] or 0.0,
+            transactions=row[7] or 0,
+            transactions_buy=row[8] or 0,
+            candles=row[9]
+        )
+        for row in rows
+    ]
 
 @app.get(f"{API_PREFIX}/prices/stats")
-async def get_price_stats(period: Optional[str] = "24h"):
+async def get_price_stats(
+    response: Response,
+    period: str = Depends(valid_period),
+    start_date: Optional[str] = Depends(valid_start_date),
+    end_date: Optional[str] = Depends(valid_end_date),
+    symbol: str = DEFAULT_SYMBOL,
+    interval: str = Depends(valid_interval),
+    conn: sqlite3.Connection = Depends(get_db)
+):
     """
-    Récupère les statistiques des prix du Bitcoin.
+    Récupère les statistiques des prix d'un marché.
+    
+    Les statistiques combinent les agrégats précalculés (jours, tranches de
+    4 heures) et les seules bougies des extrémités de la période : la latence
+    ne dépend pas de la profondeur de l'historique. L'en-tête X-Stats-Source
+    indique si la table d'agrégats a été utilisée (rollup) ou non (aggregate).
     
-    - period: Période d'analyse (24h, 7d, 30d)
+    - period: Période d'analyse jusqu'à maintenant (24h, 7d, 30d, 90d, 1y...)
+    - start_date: Date de début d'une plage personnalisée (format: YYYY-MM-DD, remplace period)
+    - end_date: Date de fin incluse de la plage personnalisée (format: YYYY-MM-DD)
+    - symbol: Symbole Coinalyze (défaut: BTCUSDC.A)
+    - interval: Intervalle des bougies (défaut: 1hour)
     """
-    conn = None
+    now = datetime.now(timezone.utc)  # Bougies horodatées en UTC
+    end = None
+    if end_date:
+        end = (datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S")
+    if start_date:
+        start = f"{start_date} 00:00:00"
+        period = f"{start_date}/{end_date or now.strftime('%Y-%m-%d')}"
+    else:
+        count, unit = PERIOD_PATTERN.match(period).groups()
+        start = (now - timedelta(seconds=int(count) * PERIOD_SECONDS[unit])).strftime("%Y-%m-%d %H:%M:%S")
+    
     try:
-        # Valider la période
-        if period not in ["24h", "7d", "30d"]:
-            raise HTTPException(
-                status_code=400,
-                detail="Période invalide. Utilisez 24h, 7d ou 30d"
-            )
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Calcul de la date de début selon la période
-        now = datetime.now()
-        if period == "7d":
-            start_date = now - timedelta(days=7)
-        elif period == "30d":
-            start_date = now - timedelta(days=30)
-        else:  # 24h par défaut
-            start_date = now - timedelta(days=1)
-            
-        cursor.execute("""
-            SELECT 
-                MIN(low_price) as min_price,
-                MAX(high_price) as max_price,
-                AVG(close_price) as avg_price,
-                SUM(volume) as total_volume,
-                COUNT(*) as data_points
-            FROM bitcoin_prices
-            WHERE timestamp >= ?
-        """, (start_date.strftime("%Y-%m-%d %H:%M:%S"),))
-        
-        row = cursor.fetchone()
-        if not row:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Aucune donnée disponible pour la période {period}"
-            )
-            
-        return {
-            "period": period,
-            "min_price": row[0],
-            "max_price": row[1],
-            "avg_price": row[2],
-            "total_volume": row[3],
-            "data_points": row[4]
-        }
-        
+        stats, source = await run_db(read_stats, conn, symbol, interval, start, end)
     except sqlite3.Error as e:
         raise HTTPException(
             status_code=500,
             detail=f"Erreur de base de données: {str(e)}"
         )
-    finally:
-        if conn:
-            conn.close()
+    if not stats["data_points"]:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Aucune donnée disponible pour la période {period}"
+        )
+    response.headers["X-Stats-Source"] = source
+    return {
+        "period": period,
+        "symbol": symbol,
+        "interval": interval,
+        **stats
+    }
+
+# Dépendances pour le modèle Prophet, chargé une fois par le registre
+def get_loaded_model() -> LoadedModel:
+    """Dépendance fournissant la version courante du modèle et ses métadonnées."""
+    loaded = model_registry.current()
+    if loaded is None:
+        raise HTTPException(
+            status_code=500,
+            detail="Erreur lors du chargement du modèle"
+        )
+    return loaded
 
-# Dépendance pour le modèle Prophet
-def get_prophet_model():
+def get_prophet_model(loaded: LoadedModel = Depends(get_loaded_model)):
     """Dépendance pour obtenir une instance du modèle Prophet."""
-    model = BitcoinProphetModel()
+    return loaded.model
+
+def _load_indicator_state(conn, last_timestamp: str) -> IndicatorState:
+    """
+    État des indicateurs à jour de la dernière bougie.
+    
+    Utilise l'état persisté par le collecteur ; s'il est absent ou en retard
+    (base alimentée par un autre outil), il est reconstruit depuis les
+    PREDICT_HISTORY dernières bougies.
+    """
+    stored = load_indicator_state(conn, DEFAULT_SYMBOL, DEFAULT_INTERVAL)
+    if stored and stored["last_timestamp"] == last_timestamp:
+        return IndicatorState.from_dict(stored)
+    return IndicatorState.from_frame(
+        read_recent_candles(conn, DEFAULT_SYMBOL, DEFAULT_INTERVAL, PREDICT_HISTORY)
+    )
+
+async def _run_forecast(model: BitcoinProphetModel, loaded: Optional[LoadedModel], data, horizon: int):
+    """
+    Exécute Prophet dans l'exécuteur de prévision.
+
+    Dans un pool de processus, le modèle entraîné du registre n'est pas
+    sérialisé à chaque requête : le processus le charge une fois par version
+    et ne reçoit que les données et l'horizon. Si le fichier a été remplacé
+    entre-temps, le modèle est exceptionnellement envoyé avec la requête.
+    """
+    executor = get_executor("forecast")
+    if executor.isolated and loaded is not None and model is loaded.model and model.is_trained:
+        try:
+            return await executor.run(forecast_process, loaded.path, loaded.sha256, data, horizon)
+        except StaleModelError as e:
+            logger.warning(f"Version du modèle remplacée pendant la requête : {str(e)}")
+    return await executor.run(_forecast, model, data, horizon)
+
+async def _compute_forecast(model: BitcoinProphetModel, conn: sqlite3.Connection,
+                            request: PredictionRequest, last_timestamp: str,
+                            loaded: Optional[LoadedModel] = None) -> dict:
+    """
+    Calcule une prévision (lecture des régresseurs puis Prophet).
+
+    Args:
+        model (BitcoinProphetModel): Modèle servi
+        conn (sqlite3.Connection): Connexion en lecture
+        request (PredictionRequest): Paramètres de la prévision
+        last_timestamp (str): Timestamp de la dernière bougie stockée
+        loaded (LoadedModel): Version du registre dont provient le modèle
+
+    Returns:
+        dict: Réponse de prévision
+    """
+    # Régresseurs : état des indicateurs tenu par le collecteur ; tout l'historique
+    # si le modèle doit encore être entraîné
+    try:
+        if getattr(model, "is_trained", False):
+            logger.info("Récupération de l'état des indicateurs...")
+            data = await run_db(_load_indicator_state, conn, last_timestamp)
+            logger.info(f"État des indicateurs au {data.last_timestamp}")
+        else:
+            logger.info("Récupération des données historiques...")
+            data = await run_db(read_training_data, conn, DEFAULT_SYMBOL, DEFAULT_INTERVAL)
+            logger.info(f"Données récupérées: {len(data)} entrées")
+    except sqlite3.Error as e:
+        logger.error(f"Erreur de base de données: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de l'accès à la base de données: {str(e)}"
+        )
+    
+    # Faire la prédiction
+    logger.info(f"Génération des prédictions pour {request.horizon} jours...")
     try:
-        model.load(MODEL_PATHS["PROPHET"])
+        forecast = await _run_forecast(model, loaded, data, request.horizon)
+        logger.info("Prédictions générées avec succès")
+        logger.debug(f"Colonnes du forecast: {forecast.columns.tolist()}")
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Erreur lors du chargement du modèle: {str(e)}")
+        logger.error(f"Erreur lors de la génération des prédictions: {str(e)}")
+        logger.error(f"Type d'erreur: {type(e)}")
+        logger.error(f"Stack trace:", exc_info=True)
         raise HTTPException(
             status_code=500,
-            detail="Erreur lors du chargement du modèle"
+            detail=f"Erreur lors de la génération des prédictions: {str(e)}"
+        )
+    
+    # Préparer la réponse
+    try:
+        response = {
+            "dates": forecast["ds"].dt.strftime("%Y-%m-%d %H:%M:%S").tolist(),
+            "predictions": np.expm1(forecast["yhat"]).tolist(),
+            "lower_bounds": np.expm1(forecast["yhat_lower"]).tolist(),
+            "upper_bounds": np.expm1(forecast["yhat_upper"]).tolist()
+        }
+        
+        # Ajouter les composantes si demandées
+        if request.return_components:
+            response["components"] = {
+                "trend": forecast["trend"].tolist() if "trend" in forecast else None,
+                "weekly": forecast["weekly"].tolist() if "weekly" in forecast else None,
+                "yearly": forecast["yearly"].tolist() if "yearly" in forecast else None
+            }
+        
+        logger.info("Réponse préparée avec succès")
+        return response
+    except Exception as e:
+        logger.error(f"Erreur lors de la préparation de la réponse: {str(e)}")
+        logger.error(f"Type d'erreur: {type(e)}")
+        logger.error(f"Stack trace:", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de la préparation de la réponse: {str(e)}"
         )
-    return model
 
 @app.post(f"{API_PREFIX}/predict", response_model=PredictionResponse)
-async def predict_prices(request: PredictionRequest, model: BitcoinProphetModel = Depends(get_prophet_model)):
+async def predict_prices(
+    request: PredictionRequest = Depends(valid_prediction_request),
+    loaded: LoadedModel = Depends(get_loaded_model),
+    model: BitcoinProphetModel = Depends(get_prophet_model),
+    conn: sqlite3.Connection = Depends(get_db)
+):
     """
     Prédit les prix futurs du Bitcoin.
     
-    - horizon: Nombre de jours à prédire (entre 1 et 30)
+    Les prévisions sont servies depuis le cache tant que ni le modèle ni la
+    dernière bougie stockée n'ont changé.
+    
+    - horizon: Nombre de jours à prédire (entre 1 et 30), au pas des bougies du modèle
     - return_components: Retourner les composantes de la prédiction
     """
     try:
         logger.info(f"Début de la prédiction avec horizon={request.horizon}, return_components={request.return_components}")
-        logger.debug(f"Modèle reçu: {model}")
-        
-        # Validation de l'horizon
-        if request.horizon <= 0:
-            logger.warning(f"Horizon invalide: {request.horizon}")
-            raise HTTPException(
-                status_code=400,
-                detail="L'horizon de prédiction doit être supérieur à 0"
-            )
-        if request.horizon > 30:
-            logger.warning(f"Horizon trop grand: {request.horizon}")
-            raise HTTPException(
-                status_code=400,
-                detail="L'horizon de prédiction ne peut pas dépasser 30 jours"
-            )
         
-        # Récupérer les données historiques
+        # Filigrane des données : dernière bougie (timestamp, id), l'id changeant si elle est remplacée
         try:
-            conn = get_db_connection()
-            logger.info("Récupération des données historiques...")
-            df = pd.read_sql_query("""
-                SELECT timestamp, open_price, high_price, low_price, close_price, volume
+            watermark = await run_db(_fetchone, conn, """
+                SELECT timestamp, id
                 FROM bitcoin_prices
-                ORDER BY timestamp ASC;
-            """, conn)
-            
-            if df.empty:
-                logger.warning("Aucune donnée historique trouvée")
-                raise HTTPException(
-                    status_code=404,
-                    detail="Aucune donnée historique disponible"
-                )
-                
-            logger.info(f"Données récupérées: {len(df)} entrées")
-            logger.debug(f"Colonnes disponibles: {df.columns.tolist()}")
-            logger.debug(f"Premières lignes:\n{df.head()}")
-            
-            # Faire la prédiction
-            logger.info(f"Génération des prédictions pour {request.horizon} jours...")
-            try:
-                forecast = model.predict(df, request.horizon)
-                logger.info("Prédictions générées avec succès")
-                logger.debug(f"Colonnes du forecast: {forecast.columns.tolist()}")
-                logger.debug(f"Premières lignes du forecast:\n{forecast.head()}")
-            except Exception as e:
-                logger.error(f"Erreur lors de la génération des prédictions: {str(e)}")
-                logger.error(f"Type d'erreur: {type(e)}")
-                logger.error(f"Stack trace:", exc_info=True)
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Erreur lors de la génération des prédictions: {str(e)}"
-                )
-            
-            # Préparer la réponse
-            try:
-                response = {
-                    "dates": forecast["ds"].dt.strftime("%Y-%m-%d %H:%M:%S").tolist(),
-                    "predictions": np.expm1(forecast["yhat"]).tolist(),
-                    "lower_bounds": np.expm1(forecast["yhat_lower"]).tolist(),
-                    "upper_bounds": np.expm1(forecast["yhat_upper"]).tolist()
-                }
-                
-                # Ajouter les composantes si demandées
-                if request.return_components:
-                    response["components"] = {
-                        "trend": forecast["trend"].tolist() if "trend" in forecast else None,
-                        "weekly": forecast["weekly"].tolist() if "weekly" in forecast else None,
-                        "yearly": forecast["yearly"].tolist() if "yearly" in forecast else None
-                    }
-                
-                logger.info("Réponse préparée avec succès")
-                logger.debug(f"Réponse: {response}")
-                return response
-            except Exception as e:
-                logger.error(f"Erreur lors de la préparation de la réponse: {str(e)}")
-                logger.error(f"Type d'erreur: {type(e)}")
-                logger.error(f"Stack trace:", exc_info=True)
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Erreur lors de la préparation de la réponse: {str(e)}"
-                )
-            
+                WHERE symbol = ? AND interval = ?
+                ORDER BY timestamp DESC
+                LIMIT 1
+            """, (DEFAULT_SYMBOL, DEFAULT_INTERVAL))
         except sqlite3.Error as e:
             logger.error(f"Erreur de base de données: {str(e)}")
             raise HTTPException(
                 status_code=500,
                 detail=f"Erreur lors de l'accès à la base de données: {str(e)}"
             )
-        except Exception as e:
-            logger.error(f"Erreur lors de la prédiction: {str(e)}")
-            logger.error(f"Type d'erreur: {type(e)}")
-            logger.error(f"Stack trace:", exc_info=True)
+        if watermark is None:
+            logger.warning("Aucune donnée historique trouvée")
             raise HTTPException(
-                status_code=500,
-                detail=f"Erreur lors de la prédiction: {str(e)}"
+                status_code=404,
+                detail="Aucune donnée historique disponible"
             )
+        
+        watermark = tuple(watermark)
+        forecast_cache.set_watermark(watermark)
+        key = (loaded.version, watermark, request.horizon, request.return_components)
+        return await forecast_cache.get_or_compute(key, lambda: _compute_forecast(model, conn, request, watermark[0], loaded))
             
     except HTTPException as e:
         raise e
@@ -452,25 +988,17 @@ async def predict_prices(request: PredictionRequest, model: BitcoinProphetModel
             status_code=500,
             detail=f"Erreur inattendue: {str(e)}"
         )
-    finally:
-        if 'conn' in locals():
-            conn.close()
-            logger.info("Connexion à la base de données fermée")
+
+@app.get(f"{API_PREFIX}/cache/stats")
+async def get_cache_stats():
+    """Compteurs des caches de l'API (succès, échecs, évictions), ceux du cache HTTP par route."""
+    return {"forecast": forecast_cache.stats(), "http": http_cache.stats()}
 
 @app.get(f"{API_PREFIX}/model/info")
-async def get_model_info():
-    """Récupère les informations sur le modèle."""
+async def get_model_info(loaded: LoadedModel = Depends(get_loaded_model)):
+    """Récupère les informations sur le modèle servi (version, chargement, paramètres)."""
     try:
-        # Charger le modèle
-        model = BitcoinProphetModel()
-        try:
-            model.load(MODEL_PATHS["PROPHET"])
-        except Exception as e:
-            logger.error(f"Erreur lors du chargement du modèle: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Erreur lors du chargement du modèle: {str(e)}"
-            )
+        model = loaded.model
         
         # Récupérer les paramètres du modèle
         params = {
@@ -482,19 +1010,32 @@ async def get_model_info():
             "yearly_seasonality": model.model.yearly_seasonality
         }
         
-        # Récupérer les métriques (à implémenter)
+        # Métriques du dernier backtest walk-forward (python -m src.models.backtest)
+        report = load_backtest_report()
+        scores = (report or {}).get("metrics") or {}
         metrics = {
-            "rmse": None,
-            "mae": None,
-            "mape": None
+            "rmse": scores.get("RMSE"),
+            "mae": scores.get("MAE"),
+            "mape": scores.get("MAPE")
         }
         
         return {
             "name": "Prophet",
-            "version": "1.0.0",
+            "version": loaded.version,
+            "sha256": loaded.sha256,
+            "loaded_at": loaded.loaded_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "load_seconds": round(loaded.load_seconds, 4),
             "parameters": params,
             "metrics": metrics,
-            "last_training": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "backtest": {
+                "generated_at": report["generated_at"],
+                "data_end": report["data_end"],
+                "horizon": report["horizon"],
+                "folds": len(report["folds"]),
+                "wall_seconds": report["wall_seconds"]
+            } if report else None,
+            "last_training": datetime.fromtimestamp(loaded.file_mtime).strftime("%Y-%m-%d %H:%M:%S"),
+            "data_watermark": model.data_watermark,
             "features": ["close_price", "timestamp"]
         }
         
@@ -0,0 +1,190 @@
+"""
+Cache HTTP des réponses des endpoints de lecture.
+
+Une réponse de /prices/* ne dépend que des bougies stockées et de la
+requête. Elle est donc mise en cache sous la clé (route, paramètres de
+requête triés, en-tête Accept), avec le filigrane d'écriture de la base :
+le plus grand id de bitcoin_prices, qui augmente à chaque insertion ou
+remplacement de bougie. Un nouveau filigrane vide le cache ; les entrées
+expirent en outre après `ttl` secondes, pour les périodes relatives à
+l'heure courante (stats sur 24h).
+
+Chaque réponse porte un ETag fort (empreinte SHA-256 du corps) et un
+Last-Modified (moment où le corps a été calculé, y compris après expiration
+du TTL) ; les requêtes conditionnelles If-None-Match (comparaison faible,
+les validateurs W/"..." des caches intermédiaires sont acceptés) et
+If-Modified-Since dont la représentation n'a pas changé sont répondues en
+304 sans corps.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Réponse mise en cache, avec ses validateurs HTTP."""
+    body: bytes
+    status_code: int
+    headers: Dict[str, str]
+    etag: str
+    last_modified: float
+    stored_at: float
+
+
+def strong_etag(body: bytes) -> str:
+    """ETag fort d'un corps de réponse."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def http_date(timestamp: float) -> str:
+    """Date HTTP (RFC 7231) d'un timestamp Unix."""
+    return formatdate(timestamp, usegmt=True)
+
+
+def _opaque_tag(tag: str) -> str:
+    """Valeur d'un ETag sans le préfixe faible W/ (comparaison faible, RFC 7232)."""
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def not_modified(entry: CachedResponse, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """
+    Indique si une requête conditionnelle peut être répondue en 304.
+
+    If-None-Match est prioritaire sur If-Modified-Since (RFC 7232, section 6).
+
+    Args:
+        entry: Réponse courante
+        if_none_match: En-tête If-None-Match
+        if_modified_since: En-tête If-Modified-Since
+
+    Returns:
+        bool: True si la représentation du client est à jour
+    """
+    if if_none_match is not None:
+        tags = {_opaque_tag(tag.strip()) for tag in if_none_match.split(",")}
+        return "*" in tags or _opaque_tag(entry.etag) in tags
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(entry.last_modified) <= since
+    return False
+
+
+class _RouteStats:
+    __slots__ = ("hits", "misses", "not_modified")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+
+class ResponseCache:
+    """Cache LRU des réponses HTTP, invalidé par le filigrane d'écriture de la base."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60):
+        """
+        Initialise le cache.
+
+        Args:
+            maxsize (int): Nombre maximal de réponses conservées
+            ttl (float): Durée de vie d'une réponse en secondes
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._routes = {}
+        self._watermark = None
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.invalidations = 0
+
+    def set_watermark(self, watermark):
+        """
+        Enregistre le filigrane courant, en vidant le cache s'il a changé.
+
+        Args:
+            watermark: Plus grand id de bitcoin_prices
+        """
+        with self._lock:
+            if watermark != self._watermark:
+                if self._entries:
+                    logger.info(f"Nouvelles données (filigrane {watermark}) : cache HTTP invalidé")
+                    self.invalidations += 1
+                self._entries.clear()
+                self._watermark = watermark
+
+    def _route(self, route: str) -> _RouteStats:
+        return self._routes.setdefault(route, _RouteStats())
+
+    def get(self, route: str, key) -> Optional[CachedResponse]:
+        """Retourne la réponse en cache et non expirée (et la marque récente), ou None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.stored_at > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._route(route).misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._route(route).hits += 1
+            return entry
+
+    def put(self, key, entry: CachedResponse, watermark):
+        """Ajoute une réponse, sauf si le filigrane a changé pendant son calcul."""
+        with self._lock:
+            if watermark != self._watermark:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record_not_modified(self, route: str):
+        """Compte une réponse 304."""
+        with self._lock:
+            self._route(route).not_modified += 1
+
+    def clear(self):
+        """Vide le cache et remet les compteurs à zéro."""
+        with self._lock:
+            self._entries.clear()
+            self._routes.clear()
+            self._watermark = None
+            self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict:
+        """Compteurs du cache, globaux et par route."""
+        with self._lock:
+            routes = {
+                route: {
+                    "hits": s.hits,
+                    "misses": s.misses,
+                    "not_modified": s.not_modified,
+                    "hit_rate": round(s.hits / (s.hits + s.misses), 4) if s.hits + s.misses else None
+                }
+                for route, s in sorted(self._routes.items())
+            }
+            hits = sum(s.hits for s in self._routes.values())
+            lookups = hits + sum(s.misses for s in self._routes.values())
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(hits / lookups, 4) if lookups else None,
+                "routes": routes
+            }
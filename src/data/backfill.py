@@ -0,0 +1,394 @@
+"""
+Moteur de rattrapage (backfill) concurrent des données historiques.
+
+Les fenêtres de temps sont planifiées à l'avance, récupérées par un pool
+de workers limité par un seau à jetons (token bucket), puis transmises via
+une file à un unique étage d'écriture afin que le réseau et le disque
+travaillent en parallèle.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+logger = logging.getLogger(__name__)
+
+# Marqueur de fin de flux pour l'étage d'écriture
+_END_OF_STREAM = object()
+
+
+class TokenBucket:
+    """Limiteur de débit à seau de jetons, partagé entre plusieurs threads."""
+
+    def __init__(self, rate, capacity=None):
+        """
+        Initialise le seau.
+
+        Args:
+            rate (float): Nombre de jetons ajoutés par seconde
+            capacity (float): Taille maximale du seau (rafale autorisée)
+        """
+        if rate <= 0:
+            raise ValueError("Le débit du seau de jetons doit être positif")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens=1.0):
+        """Bloque jusqu'à ce que `tokens` jetons soient disponibles puis les consomme."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def drain(self):
+        """Vide le seau (utilisé après un 429 pour ralentir tous les workers)."""
+        with self._lock:
+            self._refill()
+            self._tokens = 0.0
+
+
+def plan_windows(start_dt, end_dt, batch_size):
+    """
+    Découpe l'intervalle [start_dt, end_dt] en fenêtres de `batch_size` jours.
+
+    Args:
+        start_dt (datetime): Début de la période
+        end_dt (datetime): Fin de la période
+        batch_size (float): Nombre de jours par fenêtre
+
+    Returns:
+        list: Liste de tuples (début, fin)
+    """
+    windows = []
+    step = timedelta(days=batch_size)
+    current_start = start_dt
+    while current_start <= end_dt:
+        current_end = min(current_start + step, end_dt)
+        windows.append((current_start, current_end))
+        current_start = current_end + timedelta(seconds=1)
+    return windows
+
+
+def subtract_ranges(ranges, covered):
+    """
+    Retire des plages `ranges` les portions couvertes par `covered`.
+
+    Args:
+        ranges (list): Plages (début, fin) à récupérer, triées
+        covered (list): Plages (début, fin) déjà traitées
+
+    Returns:
+        list: Plages restantes, triées
+    """
+    covered = sorted(covered)
+    remaining = []
+    one_second = timedelta(seconds=1)
+    for start, end in ranges:
+        for c_start, c_end in covered:
+            if c_end < start or c_start > end:
+                continue
+            if c_start > start:
+                remaining.append((start, c_start - one_second))
+            start = c_end + one_second
+            if start > end:
+                break
+        if start <= end:
+            remaining.append((start, end))
+    return remaining
+
+
+def merge_ranges(ranges):
+    """
+    Fusionne des plages qui se chevauchent ou se touchent.
+
+    Args:
+        ranges (list): Plages (début, fin) dans un ordre quelconque
+
+    Returns:
+        list: Plages disjointes, triées
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(seconds=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class AdaptiveWindowSizer:
+    """
+    Dimensionne les fenêtres de requêtes à partir de l'intervalle et du
+    nombre maximal de points renvoyés par l'endpoint.
+
+    La taille part de la capacité théorique d'une réponse, grandit quand
+    les réponses sont peu remplies (périodes creuses) et rétrécit en cas
+    de troncature ou de 429. Partagé entre les workers (thread-safe).
+    """
+
+    def __init__(self, interval_seconds, max_points, fill_ratio=0.9, min_points=24, max_growth=16):
+        """
+        Initialise le dimensionneur.
+
+        Args:
+            interval_seconds (int): Durée d'une bougie en secondes
+            max_points (int): Nombre maximal de bougies par réponse
+            fill_ratio (float): Remplissage visé d'une réponse
+            min_points (int): Taille minimale d'une fenêtre, en bougies
+            max_growth (int): Facteur max au-delà de la capacité théorique
+        """
+        self.interval_seconds = interval_seconds
+        self.max_points = max_points
+        self.fill_ratio = fill_ratio
+        self.min_seconds = interval_seconds * min_points
+        self.max_seconds = interval_seconds * max_points * max_growth
+        self.size_seconds = interval_seconds * max_points * fill_ratio
+        self.round_trips = 0
+        self.truncations = 0
+        self.rate_limited = 0
+        self._sizes = []
+        self._lock = threading.Lock()
+
+    def _clamp(self, seconds):
+        return min(self.max_seconds, max(self.min_seconds, seconds))
+
+    def iter_windows(self, ranges):
+        """
+        Génère paresseusement les fenêtres couvrant les plages données,
+        avec la taille courante au moment de la génération.
+
+        Args:
+            ranges (list): Plages (début, fin) à couvrir
+
+        Yields:
+            tuple: Fenêtre (début, fin)
+        """
+        for start, end in ranges:
+            current_start = start
+            while current_start <= end:
+                with self._lock:
+                    size = self.size_seconds
+                    self._sizes.append(size)
+                current_end = min(current_start + timedelta(seconds=size), end)
+                yield (current_start, current_end)
+                current_start = current_end + timedelta(seconds=1)
+
+    def record(self, start, end, points):
+        """
+        Ajuste la taille après une réponse.
+
+        Args:
+            start (datetime): Début de la fenêtre demandée
+            end (datetime): Fin de la fenêtre demandée
+            points (int): Nombre de bougies reçues
+
+        Returns:
+            bool: True si la réponse est tronquée (le reste doit être redemandé)
+        """
+        with self._lock:
+            self.round_trips += 1
+            if points > self.max_points:
+                # L'endpoint renvoie plus que prévu : on apprend sa vraie capacité
+                self.max_points = points
+            if points >= self.max_points:
+                self.truncations += 1
+                self.size_seconds = self._clamp(self.size_seconds / 2)
+                return True
+            span = max((end - start).total_seconds(), self.interval_seconds)
+            target = self.max_points * self.fill_ratio
+            if points == 0:
+                self.size_seconds = self._clamp(self.size_seconds * 2)
+            elif points < target / 2:
+                ideal = target * span / points
+                self.size_seconds = self._clamp(min(ideal, self.size_seconds * 2))
+            return False
+
+    def record_rate_limited(self):
+        """Réduit la taille après un 429."""
+        with self._lock:
+            self.round_trips += 1
+            self.rate_limited += 1
+            self.size_seconds = self._clamp(self.size_seconds / 2)
+
+    def summary(self):
+        """
+        Résumé des fenêtres choisies et des allers-retours HTTP.
+
+        Returns:
+            dict: round_trips, truncations, rate_limited et tailles en heures
+        """
+        with self._lock:
+            hours = [size / 3600 for size in self._sizes] or [self.size_seconds / 3600]
+            return {
+                "round_trips": self.round_trips,
+                "truncations": self.truncations,
+                "rate_limited": self.rate_limited,
+                "windows": len(self._sizes),
+                "window_hours_min": min(hours),
+                "window_hours_max": max(hours),
+                "window_hours_mean": sum(hours) / len(hours),
+            }
+
+    @staticmethod
+    def merge_summaries(summaries):
+        """
+        Agrège les résumés de plusieurs dimensionneurs (un par intervalle).
+
+        Args:
+            summaries (list): Résumés retournés par summary()
+
+        Returns:
+            dict: Résumé global
+        """
+        windows = sum(s["windows"] for s in summaries)
+        return {
+            "round_trips": sum(s["round_trips"] for s in summaries),
+            "truncations": sum(s["truncations"] for s in summaries),
+            "rate_limited": sum(s["rate_limited"] for s in summaries),
+            "windows": windows,
+            "window_hours_min": min(s["window_hours_min"] for s in summaries),
+            "window_hours_max": max(s["window_hours_max"] for s in summaries),
+            "window_hours_mean": (
+                sum(s["window_hours_mean"] * s["windows"] for s in summaries) / windows
+                if windows else summaries[0]["window_hours_mean"]
+            ),
+        }
+
+
+class BackfillEngine:
+    """
+    Pipeline fetch → parse → write.
+
+    Les fenêtres sont récupérées par `workers` threads ; les lots parsés sont
+    déposés dans une file bornée et écrits par le thread appelant, ce qui
+    permet de conserver une connexion SQLite mono-thread côté écriture.
+    """
+
+    def __init__(self, fetch_window, write_batch, workers=4, rate_limiter=None, queue_size=16):
+        """
+        Initialise le moteur.
+
+        Args:
+            fetch_window (callable): fetch_window(start, end) -> liste de lignes
+            write_batch (callable): write_batch(window, rows) appelé par l'écrivain
+            workers (int): Nombre de requêtes HTTP simultanées
+            rate_limiter (TokenBucket): Limiteur partagé par les workers
+            queue_size (int): Nombre maximal de lots en attente d'écriture
+        """
+        self.fetch_window = fetch_window
+        self.write_batch = write_batch
+        self.workers = max(1, int(workers))
+        self.rate_limiter = rate_limiter
+        self.queue_size = queue_size
+
+    def _worker(self, window, results):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        try:
+            rows = self.fetch_window(*window)
+            results.put((window, rows, None))
+        except Exception as e:
+            results.put((window, None, e))
+
+    @staticmethod
+    def _abort(executor, results, in_flight, stop, submit_lock):
+        """
+        Arrête le pipeline après une erreur d'écriture.
+
+        Le producteur est arrêté, les fenêtres pas encore démarrées sont
+        annulées et les lots déjà récupérés sont jetés (en libérant leur
+        place en vol) jusqu'à la fin du flux, pour qu'aucun worker ne reste
+        bloqué sur la file pleine.
+        """
+        with submit_lock:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+        while results.get() is not _END_OF_STREAM:
+            in_flight.release()
+
+    def run(self, windows):
+        """
+        Exécute le backfill sur les fenêtres données.
+
+        Args:
+            windows (iterable): Fenêtres (début, fin) à récupérer
+
+        Returns:
+            dict: Statistiques d'exécution (lots, lignes, échecs, débits)
+        """
+        results = queue.Queue(maxsize=self.queue_size)
+        # Limite le nombre de fenêtres en vol pour que la file reste bornée
+        in_flight = threading.BoundedSemaphore(self.workers + self.queue_size)
+        # Arrêt demandé par l'écrivain en cas d'erreur d'écriture
+        stop = threading.Event()
+        submit_lock = threading.Lock()
+        stats = {"batches": 0, "rows": 0, "failed_windows": [], "elapsed": 0.0}
+        started = time.perf_counter()
+
+        def release_if_cancelled(future):
+            if future.cancelled():
+                in_flight.release()
+
+        def producer(executor):
+            try:
+                for window in windows:
+                    in_flight.acquire()
+                    with submit_lock:
+                        if stop.is_set():
+                            break
+                        future = executor.submit(self._worker, window, results)
+                    future.add_done_callback(release_if_cancelled)
+            finally:
+                executor.shutdown(wait=True)
+                results.put(_END_OF_STREAM)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backfill") as executor:
+            feeder = threading.Thread(target=producer, args=(executor,), daemon=True)
+            feeder.start()
+
+            while True:
+                item = results.get()
+                if item is _END_OF_STREAM:
+                    break
+                window, rows, error = item
+                in_flight.release()
+                if error is not None:
+                    logger.error(f"❌ Échec de la fenêtre {window[0]} - {window[1]}: {str(error)}")
+                    stats["failed_windows"].append(window)
+                    continue
+                try:
+                    self.write_batch(window, rows)
+                except Exception as e:
+                    logger.error(f"❌ Échec de l'écriture de la fenêtre {window[0]} - {window[1]}: {str(e)}")
+                    self._abort(executor, results, in_flight, stop, submit_lock)
+                    feeder.join()
+                    raise
+                stats["batches"] += 1
+                stats["rows"] += len(rows)
+
+            feeder.join()
+
+        elapsed = time.perf_counter() - started
+        stats["elapsed"] = elapsed
+        stats["batches_per_sec"] = stats["batches"] / elapsed if elapsed > 0 else 0.0
+        stats["rows_per_sec"] = stats["rows"] / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            f"📊 Backfill terminé: {stats['batches']} lots, {stats['rows']} lignes en "
+            f"{elapsed:.2f}s ({stats['batches_per_sec']:.2f} lots/s, "
+            f"{stats['rows_per_sec']:.1f} lignes/s, {len(stats['failed_windows'])} échecs)"
+        )
+        return stats
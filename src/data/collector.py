@@ -3,8 +3,8 @@ Script de collecte des données Bitcoin depuis Coinalyze.
 """
 import logging
 import os
-import sqlite3
 import time
+from collections import defaultdict
 from datetime import datetime, timezone, timedelta
 import requests
 from src.data.config import (
@@ -14,19 +14,45 @@ from src.data.config import (
     DEFAULT_INTERVAL,
     DEFAULT_START_DATE,
     RATE_LIMIT_WAIT,
-    DB_FILE,
-    PRICE_TABLE_SCHEMA,
-    PRICE_TABLE_INDEXES,
+    RATE_LIMIT_PER_MINUTE,
+    BACKFILL_WORKERS,
+    BACKFILL_QUEUE_SIZE,
+    BACKFILL_MAX_RETRIES,
+    COINALYZE_MAX_POINTS,
+    WINDOW_FILL_RATIO,
+    MIN_WINDOW_POINTS,
+    MAX_WINDOW_GROWTH,
+    COLLECTOR_SYMBOLS,
+    COLLECTOR_INTERVALS,
+    MAX_SYMBOLS_PER_REQUEST,
+    INTERVAL_SECONDS,
     LOG_LEVEL,
     LOG_FORMAT,
     LOG_FILE,
     DEFAULT_EXCHANGE
 )
+from src.data import config as data_config
+from src.data import feature_store, rollups
+from src.data.storage import (
+    connect_writer,
+    load_indicator_state,
+    read_recent_candles,
+    save_indicator_state
+)
+from src.models.indicator_state import IndicatorState, PREDICT_HISTORY
+from src.data.backfill import (
+    AdaptiveWindowSizer,
+    BackfillEngine,
+    TokenBucket,
+    merge_ranges,
+    plan_windows,
+    subtract_ranges
+)
 
 # Configuration du logging
 os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
 # Création du répertoire data s'il n'existe pas
-os.makedirs(os.path.dirname(DB_FILE), exist_ok=True)
+os.makedirs(os.path.dirname(data_config.DB_FILE), exist_ok=True)
 
 logging.basicConfig(
     level=LOG_LEVEL,
@@ -41,8 +67,18 @@ logger = logging.getLogger(__name__)
 class BitcoinDataCollector:
     """Classe pour la collecte des données Bitcoin."""
     
-    def __init__(self):
-        """Initialisation du collecteur."""
+    def __init__(self, base_url=COINALYZE_BASE_URL, symbols=None, intervals=None):
+        """
+        Initialisation du collecteur.
+        
+        Args:
+            base_url (str): URL de base de l'API Coinalyze
+            symbols (list): Symboles Coinalyze suivis (défaut : COLLECTOR_SYMBOLS)
+            intervals (list): Intervalles suivis (défaut : COLLECTOR_INTERVALS)
+        """
+        self.base_url = base_url
+        self.symbols = list(symbols or COLLECTOR_SYMBOLS)
+        self.intervals = list(intervals or COLLECTOR_INTERVALS)
         self.session = requests.Session()
         self.session.headers.update({
             "Accept": "application/json",
@@ -50,130 +86,421 @@ class BitcoinDataCollector:
         })
         self.db_conn = None
         self.db_cursor = None
+        self.indicator_states = {}  # (symbol, interval) -> IndicatorState
+        
+    def connect_db(self, check_same_thread=True):
+        """
+        Établit la connexion d'écriture à la base de données SQLite.
         
-    def connect_db(self):
-        """Établit la connexion à la base de données SQLite."""
+        Args:
+            check_same_thread (bool): Restreindre la connexion au thread créateur
+        """
         try:
-            self.db_conn = sqlite3.connect(DB_FILE)
+            self.db_conn = connect_writer(data_config.DB_FILE, check_same_thread=check_same_thread)
+            feature_store.ensure_feature_table(self.db_conn)
+            rollups.ensure_rollup_table(self.db_conn)
             self.db_cursor = self.db_conn.cursor()
-            
-            # Création de la table si elle n'existe pas
-            self.db_cursor.execute(PRICE_TABLE_SCHEMA)
-            
-            # Création des index
-            for index_sql in PRICE_TABLE_INDEXES:
-                self.db_cursor.execute(index_sql)
-            
-            self.db_conn.commit()
             logging.info("Connexion à la base de données établie avec succès")
             
         except Exception as e:
             logging.error(f"Erreur de connexion à la base de données: {str(e)}")
             raise
 
-    def fetch_historical_data(self, start_date=DEFAULT_START_DATE, batch_size=3):
+    @staticmethod
+    def _to_price_row(entry):
+        """
+        Convertit une bougie Coinalyze en tuple prêt pour la base.
+        
+        Args:
+            entry (dict): Bougie au format Coinalyze (t, o, h, l, c, v, vb, n, nb)
+            
+        Returns:
+            tuple: Ligne au format de la table bitcoin_prices
+        """
+        timestamp = entry["t"]
+        if len(str(timestamp)) == 10:  # Si le timestamp est en secondes
+            timestamp = timestamp * 1000
+            
+        return (
+            datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+            float(entry["o"]),
+            float(entry["h"]),
+            float(entry["l"]),
+            float(entry["c"]),
+            float(entry["v"]),
+            float(entry.get("vb", 0)),
+            int(entry.get("n", 0)),
+            int(entry.get("nb", 0))
+        )
+
+    def _request_history(self, start, end, rate_limiter=None, sizer=None,
+                         interval=DEFAULT_INTERVAL, symbols=(DEFAULT_SYMBOL,)):
+        """
+        Effectue un aller-retour ohlcv-history et parse la réponse.
+        
+        Plusieurs symboles sont demandés dans la même requête ; les 429 et
+        erreurs réseau sont retentés avec attente, les erreurs persistantes
+        sont remontées au moteur de backfill.
+        
+        Args:
+            start (datetime): Début de la fenêtre
+            end (datetime): Fin de la fenêtre
+            rate_limiter (TokenBucket): Limiteur à consulter avant chaque nouvelle tentative
+            sizer (AdaptiveWindowSizer): Dimensionneur à informer des 429
+            interval (str): Intervalle Coinalyze
+            symbols (tuple): Symboles à récupérer
+            
+        Returns:
+            list: Tuples prêts pour save_price_data, suffixés par (symbol, interval)
+        """
+        url = f"{self.base_url}/ohlcv-history"
+        params = {
+            "api_key": COINALYZE_API_KEY,
+            "symbols": ",".join(symbols),
+            "interval": interval,
+            "from": int(start.timestamp()),
+            "to": int(end.timestamp())
+        }
+        
+        logger.info(f"Récupération des données du {start} au {end}")
+        
+        for attempt in range(BACKFILL_MAX_RETRIES):
+            if attempt and rate_limiter is not None:
+                rate_limiter.acquire()
+            try:
+                response = self.session.get(url, params=params)
+                
+                if response.status_code == 429:  # Rate limit
+                    retry_after = float(response.headers.get('Retry-After', RATE_LIMIT_WAIT))
+                    logger.warning(f"Rate limit atteint, attente de {retry_after} secondes")
+                    if rate_limiter is not None:
+                        rate_limiter.drain()
+                    if sizer is not None:
+                        sizer.record_rate_limited()
+                    time.sleep(retry_after)
+                    continue
+                    
+                response.raise_for_status()
+                data = response.json()
+                
+                rows = [
+                    self._to_price_row(entry) + (market.get("symbol", symbols[0]), interval)
+                    for market in data or []
+                    for entry in market.get("history") or []
+                ]
+                if not rows:
+                    logger.warning(f"Aucune donnée reçue pour la période {start} - {end}")
+                return rows
+                
+            except requests.exceptions.RequestException as e:
+                logger.error(f"❌ Erreur lors de la requête: {str(e)}")
+                time.sleep(RATE_LIMIT_WAIT * 2 ** attempt / 4)  # Attente croissante en cas d'erreur
+        
+        raise RuntimeError(f"Abandon après {BACKFILL_MAX_RETRIES} tentatives")
+
+    def _fetch_window(self, start, end, rate_limiter=None, sizer=None,
+                      interval=DEFAULT_INTERVAL, symbols=(DEFAULT_SYMBOL,)):
+        """
+        Récupère une fenêtre complète de l'historique OHLCV.
+        
+        Si le dimensionneur détecte une réponse tronquée, la suite de la
+        fenêtre est redemandée pour les seuls symboles tronqués, à partir
+        de leur dernière bougie reçue.
+        
+        Args:
+            start (datetime): Début de la fenêtre
+            end (datetime): Fin de la fenêtre
+            rate_limiter (TokenBucket): Limiteur partagé par les workers
+            sizer (AdaptiveWindowSizer): Dimensionneur adaptatif (optionnel)
+            interval (str): Intervalle Coinalyze
+            symbols (tuple): Symboles à récupérer
+            
+        Returns:
+            list: Tuples prêts pour save_price_data, suffixés par (symbol, interval)
+        """
+        if sizer is None:
+            return self._request_history(start, end, rate_limiter, None, interval, symbols)
+        
+        rows = []
+        cursor = start
+        while cursor <= end:
+            chunk = self._request_history(cursor, end, rate_limiter, sizer, interval, symbols)
+            rows.extend(chunk)
+            
+            last_by_symbol, count_by_symbol = {}, {}
+            for row in chunk:
+                symbol = row[9]
+                count_by_symbol[symbol] = count_by_symbol.get(symbol, 0) + 1
+                last_by_symbol[symbol] = max(last_by_symbol.get(symbol, row[0]), row[0])
+            
+            if not sizer.record(cursor, end, max(count_by_symbol.values(), default=0)):
+                break
+            symbols = tuple(s for s, n in count_by_symbol.items() if n >= sizer.max_points)
+            last = min(last_by_symbol[s] for s in symbols)
+            last = datetime.strptime(last, '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+            cursor = last + timedelta(seconds=sizer.interval_seconds)
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+        return rows
+
+    def find_missing_ranges(self, start_dt, end_dt, interval=DEFAULT_INTERVAL, symbol=DEFAULT_SYMBOL):
+        """
+        Calcule les trous de la série stockée entre deux dates.
+        
+        La détection s'appuie sur l'index timestamp : seules les paires de
+        bougies consécutives séparées de plus d'un intervalle sont remontées.
+        
+        Args:
+            start_dt (datetime): Début de la période (UTC)
+            end_dt (datetime): Fin de la période (UTC)
+            interval (str): Intervalle Coinalyze de la série
+            symbol (str): Symbole de la série
+            
+        Returns:
+            list: Plages (début, fin) sans données, triées
+        """
+        step = timedelta(seconds=INTERVAL_SECONDS[interval])
+        fmt = '%Y-%m-%d %H:%M:%S'
+        bounds = (symbol, interval, start_dt.strftime(fmt), end_dt.strftime(fmt))
+        
+        def parse(value):
+            return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+        
+        self.db_cursor.execute("""
+            SELECT MIN(timestamp), MAX(timestamp)
+            FROM bitcoin_prices
+            WHERE symbol = ? AND interval = ? AND timestamp >= ? AND timestamp <= ?
+        """, bounds)
+        first, last = self.db_cursor.fetchone()
+        if first is None:
+            return [(start_dt, end_dt)]
+        
+        ranges = []
+        if parse(first) - start_dt >= step:
+            ranges.append((start_dt, parse(first) - step))
+        
+        self.db_cursor.execute("""
+            SELECT prev_ts, timestamp FROM (
+                SELECT timestamp, LAG(timestamp) OVER (ORDER BY timestamp) AS prev_ts
+                FROM bitcoin_prices
+                WHERE symbol = ? AND interval = ? AND timestamp >= ? AND timestamp <= ?
+            )
+            WHERE prev_ts IS NOT NULL
+              AND (julianday(timestamp) - julianday(prev_ts)) * 86400 > ?
+        """, bounds + (step.total_seconds() * 1.5,))
+        for prev_ts, ts in self.db_cursor.fetchall():
+            ranges.append((parse(prev_ts) + step, parse(ts) - step))
+        
+        if end_dt - parse(last) >= step:
+            ranges.append((parse(last) + step, end_dt))
+        
+        return ranges
+
+    def _load_checkpoints(self, symbol=DEFAULT_SYMBOL, interval=DEFAULT_INTERVAL):
+        """Retourne les fenêtres déjà récupérées et validées pour un marché."""
+        fmt = '%Y-%m-%d %H:%M:%S'
+        self.db_cursor.execute("""
+            SELECT window_start, window_end FROM backfill_checkpoints
+            WHERE symbol = ? AND interval = ?
+        """, (symbol, interval))
+        return [
+            (datetime.strptime(start, fmt).replace(tzinfo=timezone.utc),
+             datetime.strptime(end, fmt).replace(tzinfo=timezone.utc))
+            for start, end in self.db_cursor.fetchall()
+        ]
+
+    def _record_checkpoint(self, window, rows, symbol=DEFAULT_SYMBOL, interval=DEFAULT_INTERVAL):
+        """Enregistre une fenêtre comme validée après écriture de ses données."""
+        fmt = '%Y-%m-%d %H:%M:%S'
+        self.db_cursor.execute("""
+            INSERT OR REPLACE INTO backfill_checkpoints
+            (symbol, interval, window_start, window_end, rows, completed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (
+            symbol,
+            interval,
+            window[0].strftime(fmt),
+            window[1].strftime(fmt),
+            rows,
+            datetime.now(timezone.utc).strftime(fmt)
+        ))
+        self.db_conn.commit()
+
+    def missing_ranges(self, start_dt, end_dt, symbol=DEFAULT_SYMBOL, interval=DEFAULT_INTERVAL):
+        """
+        Plages à récupérer pour combler une série : trous de la table non
+        couverts par un point de reprise.
+        
+        Args:
+            start_dt (datetime): Début de la période (UTC)
+            end_dt (datetime): Fin de la période (UTC)
+            symbol (str): Symbole de la série
+            interval (str): Intervalle de la série
+            
+        Returns:
+            list: Plages (début, fin) à récupérer
+        """
+        missing = self.find_missing_ranges(start_dt, end_dt, interval, symbol)
+        return subtract_ranges(missing, self._load_checkpoints(symbol, interval))
+
+    def fetch_historical_data(self, start_date=DEFAULT_START_DATE, batch_size=None,
+                              workers=BACKFILL_WORKERS, rate_per_minute=RATE_LIMIT_PER_MINUTE,
+                              resume=True):
         """
         Récupère les données historiques depuis Coinalyze par lots.
         
+        Les fenêtres sont planifiées puis récupérées en parallèle ; l'écriture
+        en base se fait au fil de l'eau dans le thread appelant. Les symboles
+        suivis sont regroupés par MAX_SYMBOLS_PER_REQUEST dans chaque requête,
+        pour chaque intervalle. En mode reprise, seuls les trous des séries non
+        couverts par un point de reprise sont récupérés. Sans batch_size, la
+        taille des fenêtres est ajustée à la capacité de l'endpoint pour
+        minimiser les allers-retours.
+        
         Args:
             start_date (str): Date de début au format YYYY-MM-DD
-            batch_size (int): Nombre de jours par lot
+            batch_size (int): Nombre de jours par lot (None : taille adaptative)
+            workers (int): Nombre de requêtes simultanées
+            rate_per_minute (float): Nombre maximal de requêtes par minute
+            resume (bool): Ne récupérer que les plages manquantes
+            
+        Returns:
+            dict: Statistiques du backfill (lots, lignes, lots/s, lignes/s)
         """
         try:
             start_dt = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
             end_dt = datetime.now(timezone.utc)
-            current_start = start_dt
             
-            while current_start < end_dt:
-                current_end = min(current_start + timedelta(days=batch_size), end_dt)
-                
-                # Construction de l'URL avec les paramètres exacts
-                url = f"{COINALYZE_BASE_URL}/ohlcv-history"
-                params = {
-                    "api_key": COINALYZE_API_KEY,
-                    "symbols": DEFAULT_SYMBOL,
-                    "interval": DEFAULT_INTERVAL,
-                    "from": int(current_start.timestamp()),
-                    "to": int(current_end.timestamp())
+            rate_limiter = TokenBucket(rate_per_minute / 60.0, capacity=workers)
+            sizers = {}
+            if batch_size is None:
+                sizers = {
+                    interval: AdaptiveWindowSizer(
+                        INTERVAL_SECONDS[interval],
+                        COINALYZE_MAX_POINTS,
+                        fill_ratio=WINDOW_FILL_RATIO,
+                        min_points=MIN_WINDOW_POINTS,
+                        max_growth=MAX_WINDOW_GROWTH
+                    )
+                    for interval in self.intervals
                 }
-                
-                logger.info(f"Récupération des données du {current_start.date()} au {current_end.date()}")
-                
-                try:
-                    response = self.session.get(url, params=params)
-                    
-                    if response.status_code == 429:  # Rate limit
-                        retry_after = float(response.headers.get('Retry-After', RATE_LIMIT_WAIT))
-                        logger.warning(f"Rate limit atteint, attente de {retry_after} secondes")
-                        time.sleep(retry_after)
-                        continue
-                        
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    if not data or not data[0].get("history"):
-                        logger.warning(f"Aucune donnée reçue pour la période {current_start.date()} - {current_end.date()}")
-                        current_start = current_end + timedelta(seconds=1)
-                        time.sleep(5)  # Petite pause avant de continuer
-                        continue
-                    
-                    # Préparation des données pour la base
-                    price_data = []
-                    for entry in data[0]["history"]:
-                        timestamp = entry["t"]
-                        if len(str(timestamp)) == 10:  # Si le timestamp est en secondes
-                            timestamp = timestamp * 1000
-                        
-                        price_data.append((
-                            datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
-                            float(entry["o"]),
-                            float(entry["h"]),
-                            float(entry["l"]),
-                            float(entry["c"]),
-                            float(entry["v"]),
-                            float(entry.get("vb", 0)),
-                            int(entry.get("n", 0)),
-                            int(entry.get("nb", 0))
-                        ))
-                    
-                    # Sauvegarde du lot
-                    if price_data:
-                        self.save_price_data(price_data)
-                        logger.info(f"✅ {len(price_data)} entrées sauvegardées pour la période")
-                    
-                    # Attente entre chaque lot pour respecter le rate limit
-                    time.sleep(RATE_LIMIT_WAIT)
-                    
-                except requests.exceptions.RequestException as e:
-                    logger.error(f"❌ Erreur lors de la requête: {str(e)}")
-                    time.sleep(RATE_LIMIT_WAIT * 2)  # Attente plus longue en cas d'erreur
-                    continue
-                
-                # Passage au lot suivant
-                current_start = current_end + timedelta(seconds=1)
+            
+            groups = [
+                tuple(self.symbols[i:i + MAX_SYMBOLS_PER_REQUEST])
+                for i in range(0, len(self.symbols), MAX_SYMBOLS_PER_REQUEST)
+            ]
+            plan = []
+            for interval in self.intervals:
+                for group in groups:
+                    if resume:
+                        ranges = merge_ranges([
+                            r for symbol in group
+                            for r in self.missing_ranges(start_dt, end_dt, symbol, interval)
+                        ])
+                    else:
+                        ranges = [(start_dt, end_dt)]
+                    plan.append((interval, group, ranges))
+            logger.info(
+                f"{sum(len(r) for _, _, r in plan)} plages à récupérer du {start_dt.date()} au "
+                f"{end_dt.date()} ({len(self.symbols)} symboles, {len(self.intervals)} intervalles, "
+                f"{'fenêtres adaptatives' if sizers else f'lots de {batch_size} jours'})"
+            )
+            
+            def windows():
+                for interval, group, ranges in plan:
+                    if sizers:
+                        market_windows = sizers[interval].iter_windows(ranges)
+                    else:
+                        market_windows = (w for r in ranges for w in plan_windows(r[0], r[1], batch_size))
+                    for start, end in market_windows:
+                        yield (start, end, interval, group)
+            
+            # Features et agrégats recalculés une seule fois en fin de backfill,
+            # depuis la plus ancienne bougie écrite de chaque marché
+            touched = {}
+            
+            def write_batch(window, price_data):
+                if price_data:
+                    self.save_price_data(price_data, update_features=False)
+                    for row in price_data:
+                        key = (row[9], row[10])
+                        touched[key] = min(touched.get(key, row[0]), row[0])
+                    logger.info(f"✅ {len(price_data)} entrées sauvegardées pour la période")
+                _, _, interval, group = window
+                for symbol in group:
+                    rows = sum(1 for row in price_data if row[9] == symbol)
+                    self._record_checkpoint(window, rows, symbol, interval)
+            
+            engine = BackfillEngine(
+                fetch_window=lambda start, end, interval, group: self._fetch_window(
+                    start, end, rate_limiter, sizers.get(interval), interval, group
+                ),
+                write_batch=write_batch,
+                workers=workers,
+                rate_limiter=rate_limiter,
+                queue_size=BACKFILL_QUEUE_SIZE
+            )
+            stats = engine.run(windows())
+            for (symbol, interval), since in touched.items():
+                rows = feature_store.update_features(self.db_conn, symbol, interval, since)
+                logger.info(f"📐 {rows} lignes de features recalculées pour {symbol} {interval}")
+                buckets = rollups.update_rollups(self.db_conn, symbol, interval, since)
+                logger.info(f"🧮 {buckets} tranches OHLCV recalculées pour {symbol} {interval}")
+            self.db_conn.commit()
+            if sizers:
+                stats.update(AdaptiveWindowSizer.merge_summaries([s.summary() for s in sizers.values()]))
+                logger.info(
+                    f"📏 Fenêtres: {stats['windows']} ({stats['window_hours_min']:.0f}h à "
+                    f"{stats['window_hours_max']:.0f}h, moyenne {stats['window_hours_mean']:.0f}h), "
+                    f"{stats['round_trips']} allers-retours HTTP, {stats['truncations']} troncatures, "
+                    f"{stats['rate_limited']} 429"
+                )
+            else:
+                stats["round_trips"] = stats["batches"] + len(stats["failed_windows"])
             
             logger.info("✅ Collecte de l'historique terminée avec succès")
+            return stats
             
         except Exception as e:
             logger.error(f"❌ Erreur lors de la récupération des données historiques: {str(e)}")
             raise
             
-    def save_price_data(self, price_data):
+    def save_price_data(self, price_data, symbol=DEFAULT_SYMBOL, interval=DEFAULT_INTERVAL,
+                        update_features=True):
         """
         Sauvegarde les données de prix dans la base de données.
         
+        L'état des indicateurs et, sauf demande contraire, les tables
+        bitcoin_features et bitcoin_ohlcv_rollups sont mis à jour dans la
+        même transaction.
+        
         Args:
-            price_data (list): Liste de tuples contenant les données à sauvegarder
+            price_data (list): Liste de tuples contenant les données à sauvegarder ;
+                les tuples à 9 champs sont rattachés au marché (symbol, interval),
+                ceux à 11 champs portent déjà leur symbole et leur intervalle
+            symbol (str): Symbole par défaut des lignes
+            interval (str): Intervalle par défaut des lignes
+            update_features (bool): Recalculer les features et les agrégats OHLCV des bougies écrites
         """
         try:
             sql = """
                 INSERT OR REPLACE INTO bitcoin_prices
                 (timestamp, open_price, high_price, low_price, close_price,
-                 volume, volume_buy, transactions, transactions_buy)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 volume, volume_buy, transactions, transactions_buy, symbol, interval)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """
             
-            self.db_cursor.executemany(sql, price_data)
+            rows = [row if len(row) == 11 else tuple(row) + (symbol, interval) for row in price_data]
+            self.db_cursor.executemany(sql, rows)
+            self._advance_indicator_states(rows)
+            if update_features:
+                markets = {}
+                for row in rows:
+                    key = (row[9], row[10])
+                    markets[key] = min(markets.get(key, row[0]), row[0])
+                for (market_symbol, market_interval), since in markets.items():
+                    feature_store.update_features(self.db_conn, market_symbol, market_interval, since)
+                    rollups.update_rollups(self.db_conn, market_symbol, market_interval, since)
             self.db_conn.commit()
             logger.info(f"Sauvegarde de {len(price_data)} entrées réussie")
             
@@ -182,8 +509,44 @@ class BitcoinDataCollector:
             self.db_conn.rollback()
             raise
             
+    def _advance_indicator_states(self, rows):
+        """
+        Avance l'état des indicateurs de chaque marché touché par une écriture.
+        
+        Les bougies nouvelles (ou la révision de la dernière) avancent l'état
+        en O(1) ; une bougie insérée dans le passé (backfill) impose de le
+        reconstruire depuis les PREDICT_HISTORY dernières bougies en base.
+        L'état est écrit dans la même transaction que les prix.
+        
+        Args:
+            rows (list): Tuples à 11 champs venant d'être insérés
+        """
+        by_market = defaultdict(list)
+        for row in rows:
+            by_market[(row[9], row[10])].append(row)
+        
+        for (symbol, interval), market_rows in by_market.items():
+            state = self.indicator_states.get((symbol, interval))
+            if state is None:
+                stored = load_indicator_state(self.db_conn, symbol, interval)
+                state = IndicatorState.from_dict(stored) if stored else None
+            
+            market_rows.sort(key=lambda row: row[0])
+            try:
+                if state is None or state.last_timestamp is None:
+                    raise ValueError("Aucun état pour ce marché")
+                for row in market_rows:
+                    state.update(row[0], row[4], row[5])
+            except ValueError:
+                state = IndicatorState.from_frame(
+                    read_recent_candles(self.db_conn, symbol, interval, PREDICT_HISTORY)
+                )
+            
+            self.indicator_states[(symbol, interval)] = state
+            save_indicator_state(self.db_conn, symbol, interval, state.to_dict())
+            
     def collect_full_history(self):
-        """Collecte l'historique complet des données."""
+        """Collecte l'historique complet des données, en ne récupérant que les plages manquantes."""
         try:
             if not self.db_conn:
                 self.connect_db()
@@ -205,14 +568,20 @@ class BitcoinDataCollector:
             self.db_conn.close()
         logger.info("Connexions fermées")
 
-    def fetch_current_price(self):
-        """Récupère le prix actuel du Bitcoin."""
+    def fetch_current_price(self, symbol=DEFAULT_SYMBOL, interval=DEFAULT_INTERVAL):
+        """
+        Récupère le prix actuel d'un marché.
+        
+        Args:
+            symbol (str): Symbole Coinalyze
+            interval (str): Intervalle de la bougie
+        """
         try:
-            url = f"{COINALYZE_BASE_URL}/futures/ohlcv/latest"
+            url = f"{self.base_url}/futures/ohlcv/latest"
             params = {
-                "symbol": DEFAULT_SYMBOL,
+                "symbol": symbol,
                 "exchange": DEFAULT_EXCHANGE,
-                "interval": DEFAULT_INTERVAL
+                "interval": interval
             }
             
             response = self.session.get(url, params=params)
@@ -224,21 +593,7 @@ class BitcoinDataCollector:
                 return None
                 
             entry = data[0]  # Premier élément du tableau
-            timestamp = entry["t"]
-            if len(str(timestamp)) == 10:  # Si le timestamp est en secondes
-                timestamp = timestamp * 1000
-                
-            price_data = (
-                datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
-                float(entry["o"]),
-                float(entry["h"]),
-                float(entry["l"]),
-                float(entry["c"]),
-                float(entry["v"]),
-                float(entry.get("vb", 0)),
-                int(entry.get("n", 0)),
-                int(entry.get("nb", 0))
-            )
+            price_data = self._to_price_row(entry)
             
             return price_data
             
@@ -247,15 +602,17 @@ class BitcoinDataCollector:
             raise
             
     def collect_data(self):
-        """Collecte les données actuelles et les sauvegarde."""
+        """Collecte les données actuelles de chaque marché suivi et les sauvegarde."""
         try:
             if not self.db_conn:
                 self.connect_db()
                 
-            price_data = self.fetch_current_price()
-            if price_data:
-                self.save_price_data([price_data])
-                logger.info("Données actuelles collectées et sauvegardées avec succès")
+            for interval in self.intervals:
+                for symbol in self.symbols:
+                    price_data = self.fetch_current_price(symbol, interval)
+                    if price_data:
+                        self.save_price_data([price_data], symbol, interval)
+            logger.info("Données actuelles collectées et sauvegardées avec succès")
             
         except Exception as e:
             logger.error(f"Erreur lors de la collecte des données: {str(e)}")
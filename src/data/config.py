@@ -15,14 +15,60 @@ DEFAULT_SYMBOL = "BTCUSDC.A"  # BTC/USDC sur Binance
 DEFAULT_INTERVAL = "1hour"     # Intervalle horaire
 DEFAULT_EXCHANGE = "binance"  # Exchange par défaut
 
+# Marchés suivis par le collecteur (listes séparées par des virgules)
+COLLECTOR_SYMBOLS = [s.strip() for s in os.getenv("COLLECTOR_SYMBOLS", DEFAULT_SYMBOL).split(",") if s.strip()]
+COLLECTOR_INTERVALS = [i.strip() for i in os.getenv("COLLECTOR_INTERVALS", DEFAULT_INTERVAL).split(",") if i.strip()]
+MAX_SYMBOLS_PER_REQUEST = 20  # Nombre max de symboles par requête Coinalyze
+
+# Durée en secondes des intervalles supportés par Coinalyze
+INTERVAL_SECONDS = {
+    "1min": 60,
+    "5min": 300,
+    "15min": 900,
+    "30min": 1800,
+    "1hour": 3600,
+    "2hour": 7200,
+    "4hour": 14400,
+    "6hour": 21600,
+    "12hour": 43200,
+    "daily": 86400,
+}
+
 # Configuration de la collecte
 # Calcul de la date de début (3 mois avant aujourd'hui)
 DEFAULT_START_DATE = (datetime.now() - timedelta(days=90)).strftime("%Y-%m-%d")
 UPDATE_INTERVAL = 3600  # Mise à jour toutes les heures
 RATE_LIMIT_WAIT = 10   # Attente de 10 secondes entre les requêtes
 
+# Configuration du backfill concurrent
+RATE_LIMIT_PER_MINUTE = int(os.getenv("COINALYZE_RATE_LIMIT", "40"))  # Quota Coinalyze par clé
+BACKFILL_WORKERS = int(os.getenv("BACKFILL_WORKERS", "4"))  # Requêtes HTTP simultanées
+BACKFILL_QUEUE_SIZE = 16  # Lots parsés en attente d'écriture
+BACKFILL_MAX_RETRIES = 5  # Tentatives par fenêtre avant abandon
+
+# Collecte temps réel (asyncio)
+LIVE_POLL_DELAY = 5  # Secondes d'attente après la clôture d'une bougie avant interrogation
+LIVE_MAX_RETRIES = 6  # Tentatives par clôture de bougie
+LIVE_BACKOFF_BASE = 1.0  # Délai de base du backoff exponentiel (secondes)
+LIVE_BACKOFF_CAP = 60.0  # Délai maximal entre deux tentatives (secondes)
+LIVE_HTTP_TIMEOUT = 30.0  # Timeout des requêtes HTTP (secondes)
+METRICS_PORT = int(os.getenv("COLLECTOR_METRICS_PORT", "9108"))  # Port d'exposition Prometheus
+
+# Dimensionnement adaptatif des fenêtres ohlcv-history
+COINALYZE_MAX_POINTS = int(os.getenv("COINALYZE_MAX_POINTS", "1000"))  # Bougies max par réponse
+WINDOW_FILL_RATIO = 0.9  # Remplissage visé d'une réponse (marge avant troncature)
+MIN_WINDOW_POINTS = 24  # Taille minimale d'une fenêtre, en bougies
+MAX_WINDOW_GROWTH = 16  # Facteur max au-delà de la capacité théorique (périodes creuses)
+
 # Configuration de la base de données SQLite
 DB_FILE = "data/bitcoin_trends.db"
+SQLITE_BUSY_TIMEOUT = 5000  # Attente max sur un verrou (ms)
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024  # Lecture par mmap (256 Mo)
+SQLITE_CACHE_SIZE = -64000  # Cache de pages par connexion (valeur négative : Kio, soit 64 Mo)
+FETCH_CHUNK_ROWS = 10000  # Lignes converties par bloc lors des lectures typées
+
+# Agrégats OHLCV précalculés (table bitcoin_ohlcv_rollups), tenus à jour à l'ingestion
+ROLLUP_RESOLUTIONS = ["1hour", "4hour", "daily"]  # Seules les tranches plus larges que l'intervalle sont gardées
 
 # Configuration du logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -30,7 +76,7 @@ LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_FILE = "logs/data_collection.log"
 
 # Schéma de la base de données
-PRICE_TABLE_SCHEMA = """
+PRICE_TABLE_SCHEMA = f"""
 CREATE TABLE IF NOT EXISTS bitcoin_prices (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     timestamp TIMESTAMP NOT NULL,
@@ -42,7 +88,33 @@ CREATE TABLE IF NOT EXISTS bitcoin_prices (
     volume_buy REAL,
     transactions INTEGER,
     transactions_buy INTEGER,
-    UNIQUE(timestamp)
+    symbol TEXT NOT NULL DEFAULT '{DEFAULT_SYMBOL}',
+    interval TEXT NOT NULL DEFAULT '{DEFAULT_INTERVAL}',
+    UNIQUE(symbol, interval, timestamp)
+);
+"""
+
+# Points de reprise du backfill (fenêtres déjà récupérées et validées)
+CHECKPOINT_TABLE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    window_start TIMESTAMP NOT NULL,
+    window_end TIMESTAMP NOT NULL,
+    rows INTEGER NOT NULL,
+    completed_at TIMESTAMP NOT NULL,
+    PRIMARY KEY(symbol, interval, window_start, window_end)
+);
+"""
+
+# État incrémental des indicateurs de prédiction, avancé à l'ingestion (JSON)
+INDICATOR_STATE_TABLE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS indicator_state (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    state TEXT NOT NULL,
+    updated_at TIMESTAMP NOT NULL,
+    PRIMARY KEY(symbol, interval)
 );
 """
 
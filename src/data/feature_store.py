@@ -0,0 +1,242 @@
+"""
+Table matérialisée des features (bitcoin_features).
+
+Le collecteur tient la table à jour après chaque écriture de prix : seules
+les bougies à partir de la plus ancienne bougie écrite sont recalculées, à
+partir d'une fenêtre de chauffe de feature_warmup() bougies. L'entraînement
+et la prédiction lisent ensuite les colonnes précalculées.
+
+Usage :
+    python -m src.data.feature_store rebuild [--symbol BTCUSDC.A] [--interval 1hour]
+    python -m src.data.feature_store check [--symbol BTCUSDC.A] [--interval 1hour]
+"""
+import logging
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.data.config import DEFAULT_SYMBOL, DEFAULT_INTERVAL
+from src.data.storage import maintenance_main, read_recent_candles
+from src.models.features import FEATURE_COLUMNS, compute_features, feature_warmup
+
+logger = logging.getLogger(__name__)
+
+# Bougies relues avant la première bougie modifiée
+FEATURE_WARMUP = feature_warmup()
+
+FEATURE_TABLE_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS bitcoin_features (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    {', '.join(f'{col} REAL' for col in FEATURE_COLUMNS)},
+    PRIMARY KEY(symbol, interval, timestamp)
+);
+"""
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def ensure_feature_table(conn):
+    """Crée la table bitcoin_features si besoin."""
+    conn.execute(FEATURE_TABLE_SCHEMA)
+
+
+def _read_candles(conn, symbol, interval, start=None):
+    """Bougies d'un marché à partir de `start` (inclus), en colonnes typées."""
+    query = """
+        SELECT timestamp, close_price, volume
+        FROM bitcoin_prices
+        WHERE symbol = ? AND interval = ?
+    """
+    params = [symbol, interval]
+    if start is not None:
+        query += " AND timestamp >= ?"
+        params.append(start)
+    df = pd.read_sql_query(query + " ORDER BY timestamp ASC", conn, params=params)
+    return df.astype({"close_price": np.float64, "volume": np.float64})
+
+
+def update_features(conn, symbol=DEFAULT_SYMBOL, interval=DEFAULT_INTERVAL, since=None):
+    """
+    Recalcule les features d'un marché à partir de la bougie `since` (sans commit).
+
+    Args:
+        conn (sqlite3.Connection): Connexion d'écriture
+        symbol (str): Symbole Coinalyze
+        interval (str): Intervalle des bougies
+        since (str): Plus ancienne bougie modifiée (None : tout l'historique)
+
+    Returns:
+        int: Nombre de lignes de features écrites
+    """
+    ensure_feature_table(conn)
+    start = None
+    if since is None:
+        conn.execute("DELETE FROM bitcoin_features WHERE symbol = ? AND interval = ?", (symbol, interval))
+    else:
+        row = conn.execute("""
+            SELECT timestamp FROM bitcoin_prices
+            WHERE symbol = ? AND interval = ? AND timestamp < ?
+            ORDER BY timestamp DESC
+            LIMIT 1 OFFSET ?
+        """, (symbol, interval, since, FEATURE_WARMUP - 1)).fetchone()
+        start = row[0] if row else None
+
+    features = compute_features(_read_candles(conn, symbol, interval, start))
+    if since is not None:
+        features = features[features["timestamp"] >= pd.Timestamp(since)]
+    if features.empty:
+        return 0
+
+    timestamps = features["timestamp"].dt.strftime(TIMESTAMP_FORMAT)
+    values = features[FEATURE_COLUMNS].astype(object).where(features[FEATURE_COLUMNS].notna(), None)
+    conn.executemany(f"""
+        INSERT OR REPLACE INTO bitcoin_features
+        (symbol, interval, timestamp, {', '.join(FEATURE_COLUMNS)})
+        VALUES (?, ?, ?, {', '.join('?' for _ in FEATURE_COLUMNS)})
+    """, [
+        (symbol, interval, ts, *row)
+        for ts, row in zip(timestamps, values.itertuples(index=False, name=None))
+    ])
+    return len(features)
+
+
+def read_features(conn, symbol=DEFAULT_SYMBOL, interval=DEFAULT_INTERVAL, limit=None):
+    """
+    Lit les prix et les features précalculées d'un marché.
+
+    Args:
+        conn (sqlite3.Connection): Connexion
+        symbol (str): Symbole Coinalyze
+        interval (str): Intervalle des bougies
+        limit (int): Nombre de dernières bougies (None : tout l'historique)
+
+    Returns:
+        pd.DataFrame: timestamp, OHLCV et colonnes de FEATURE_COLUMNS, par ordre chronologique
+    """
+    query = f"""
+        SELECT p.timestamp, p.open_price, p.high_price, p.low_price, p.close_price, p.volume,
+               {', '.join(f'f.{col}' for col in FEATURE_COLUMNS)}
+        FROM bitcoin_prices p
+        JOIN bitcoin_features f
+          ON f.symbol = p.symbol AND f.interval = p.interval AND f.timestamp = p.timestamp
+        WHERE p.symbol = ? AND p.interval = ?
+        ORDER BY p.timestamp DESC
+    """
+    params = [symbol, interval]
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(int(limit))
+    df = pd.read_sql_query(query, conn, params=params)
+    df = df.iloc[::-1].reset_index(drop=True)
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    return df.astype({col: np.float64 for col in df.columns if col != "timestamp"})
+
+
+def read_training_data(conn, symbol=DEFAULT_SYMBOL, interval=DEFAULT_INTERVAL, limit=None):
+    """
+    Lit les dernières bougies d'un marché pour l'entraînement.
+
+    Source commune de l'API, du réentraînement, du backtest et de la
+    recherche d'hyperparamètres : les features précalculées sont lues si
+    bitcoin_features couvre toutes les bougies demandées (aucun trou, dernière
+    bougie comprise) ; sinon (table absente ou en retard) les prix bruts sont
+    lus et le modèle recalcule les features.
+
+    Args:
+        conn (sqlite3.Connection): Connexion
+        symbol (str): Symbole Coinalyze
+        interval (str): Intervalle des bougies
+        limit (int): Nombre de dernières bougies (None : tout l'historique)
+
+    Returns:
+        pd.DataFrame: timestamp, OHLCV et, si la table est à jour, colonnes de FEATURE_COLUMNS
+    """
+    try:
+        df = read_features(conn, symbol, interval, limit)
+    except sqlite3.OperationalError:
+        df = None  # Base antérieure à la table bitcoin_features
+    if df is not None and len(df):
+        first, last = (ts.strftime(TIMESTAMP_FORMAT) for ts in df["timestamp"].iloc[[0, -1]])
+        candles, latest = conn.execute("""
+            SELECT COUNT(*), MAX(timestamp) FROM bitcoin_prices
+            WHERE symbol = ? AND interval = ? AND timestamp >= ?
+        """, (symbol, interval, first)).fetchone()
+        window_complete = (limit is not None and len(df) == limit) or conn.execute("""
+            SELECT 1 FROM bitcoin_prices WHERE symbol = ? AND interval = ? AND timestamp < ? LIMIT 1
+        """, (symbol, interval, first)).fetchone() is None
+        if candles == len(df) and latest == last and window_complete:
+            return df
+        logger.info(f"Features de {symbol} {interval} incomplètes, lecture des prix bruts")
+    return read_recent_candles(conn, symbol, interval, limit)
+
+
+def check_features(conn, symbol=DEFAULT_SYMBOL, interval=DEFAULT_INTERVAL, rtol=1e-6, atol=1e-9):
+    """
+    Compare la table aux features recalculées sur tout l'historique.
+
+    Args:
+        conn (sqlite3.Connection): Connexion
+        symbol (str): Symbole Coinalyze
+        interval (str): Intervalle des bougies
+        rtol (float): Tolérance relative
+        atol (float): Tolérance absolue
+
+    Returns:
+        dict: candles, rows, missing (bougies sans features), orphans (features
+            sans bougie), mismatched (colonne -> nombre d'écarts) et ok
+    """
+    ensure_feature_table(conn)
+    expected = compute_features(_read_candles(conn, symbol, interval))
+    expected["timestamp"] = expected["timestamp"].dt.strftime(TIMESTAMP_FORMAT)
+    stored = pd.read_sql_query(f"""
+        SELECT timestamp, {', '.join(FEATURE_COLUMNS)}
+        FROM bitcoin_features
+        WHERE symbol = ? AND interval = ?
+    """, conn, params=(symbol, interval))
+
+    merged = expected.merge(stored, on="timestamp", how="outer", suffixes=("", "_stored"), indicator=True)
+    both = merged[merged["_merge"] == "both"]
+    mismatched = {}
+    for col in FEATURE_COLUMNS:
+        a = both[col].to_numpy(dtype=np.float64)
+        b = both[f"{col}_stored"].to_numpy(dtype=np.float64)
+        bad = int((~np.isclose(a, b, rtol=rtol, atol=atol, equal_nan=True)).sum())
+        if bad:
+            mismatched[col] = bad
+
+    report = {
+        "symbol": symbol,
+        "interval": interval,
+        "candles": len(expected),
+        "rows": len(stored),
+        "missing": int((merged["_merge"] == "left_only").sum()),
+        "orphans": int((merged["_merge"] == "right_only").sum()),
+        "mismatched": mismatched
+    }
+    report["ok"] = not (report["missing"] or report["orphans"] or mismatched)
+    return report
+
+
+def _rebuild(conn, symbol, interval):
+    rows = update_features(conn, symbol, interval)
+    return f"{symbol} {interval}: {rows} lignes de features recalculées"
+
+
+def _check(conn, symbol, interval):
+    report = check_features(conn, symbol, interval)
+    return [(report["ok"], f"{symbol} {interval}: {report['rows']}/{report['candles']} lignes, "
+                           f"{report['missing']} manquantes, {report['orphans']} orphelines, "
+                           f"écarts: {report['mismatched'] or 'aucun'}")]
+
+
+def main(argv=None):
+    """Point d'entrée en ligne de commande (rebuild, check)."""
+    return maintenance_main(argv, "Maintenance de la table bitcoin_features", _rebuild, _check)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+Collecte temps réel asynchrone des bougies Coinalyze.
+
+Les interrogations sont alignées sur les clôtures de bougies de chaque
+intervalle, les marchés sont interrogés en parallèle via un client HTTP
+asynchrone à connexions persistantes, et le retard entre la clôture d'une
+bougie et son enregistrement est exposé comme métrique Prometheus.
+"""
+import asyncio
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+from prometheus_client import Counter, Gauge
+
+from src.data.collector import BitcoinDataCollector
+from src.data.config import (
+    COINALYZE_BASE_URL,
+    COINALYZE_API_KEY,
+    INTERVAL_SECONDS,
+    MAX_SYMBOLS_PER_REQUEST,
+    LIVE_POLL_DELAY,
+    LIVE_MAX_RETRIES,
+    LIVE_BACKOFF_BASE,
+    LIVE_BACKOFF_CAP,
+    LIVE_HTTP_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+# Métriques de fraîcheur des données
+CANDLE_LAG = Gauge(
+    "collector_candle_lag_seconds",
+    "Délai entre la clôture de la dernière bougie et son enregistrement",
+    ["symbol", "interval"]
+)
+POLL_ERRORS = Counter(
+    "collector_poll_errors_total",
+    "Nombre d'échecs d'interrogation de l'API",
+    ["interval"]
+)
+
+
+def next_candle_close(now, interval_seconds):
+    """
+    Calcule la prochaine clôture de bougie strictement après `now`.
+
+    Args:
+        now (float): Timestamp Unix courant
+        interval_seconds (int): Durée d'une bougie
+
+    Returns:
+        int: Timestamp Unix de la prochaine clôture
+    """
+    return (int(now) // interval_seconds + 1) * interval_seconds
+
+
+def backoff_delay(attempt, base=LIVE_BACKOFF_BASE, cap=LIVE_BACKOFF_CAP):
+    """Délai de backoff exponentiel avec jitter complet."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_delay(response):
+    """
+    Délai demandé par l'en-tête Retry-After d'une réponse 429.
+
+    Args:
+        response (httpx.Response): Réponse de l'API
+
+    Returns:
+        float: Attente en secondes, ou None si l'en-tête est absent ou invalide
+    """
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LiveCollector:
+    """Planificateur asyncio de la collecte continue."""
+
+    def __init__(self, collector: BitcoinDataCollector, base_url=COINALYZE_BASE_URL,
+                 poll_delay=LIVE_POLL_DELAY, max_retries=LIVE_MAX_RETRIES):
+        """
+        Initialise le planificateur.
+
+        Args:
+            collector (BitcoinDataCollector): Collecteur portant les marchés suivis et la base
+            base_url (str): URL de base de l'API Coinalyze
+            poll_delay (float): Attente après la clôture avant interrogation
+            max_retries (int): Tentatives par clôture de bougie
+        """
+        self.collector = collector
+        self.base_url = base_url
+        self.poll_delay = poll_delay
+        self.max_retries = max_retries
+        self.lag = {}  # (symbol, interval) -> retard en secondes de la dernière bougie
+        # Thread d'écriture unique : les écritures SQLite ne bloquent pas la boucle
+        # d'événements et restent sérialisées sur la connexion du collecteur
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="live-writer")
+
+    async def save(self, rows):
+        """Enregistre des bougies depuis le thread d'écriture."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._writer, self.collector.save_price_data, rows)
+
+    async def fetch_closed_candles(self, client, interval, symbols, close_ts):
+        """
+        Récupère les deux dernières bougies clôturées à `close_ts`.
+
+        Args:
+            client (httpx.AsyncClient): Client HTTP partagé
+            interval (str): Intervalle Coinalyze
+            symbols (tuple): Symboles regroupés dans la requête
+            close_ts (int): Timestamp Unix de la clôture attendue
+
+        Returns:
+            list: Tuples prêts pour save_price_data, suffixés par (symbol, interval)
+        """
+        step = INTERVAL_SECONDS[interval]
+        response = await client.get(f"{self.base_url}/ohlcv-history", params={
+            "api_key": COINALYZE_API_KEY,
+            "symbols": ",".join(symbols),
+            "interval": interval,
+            "from": close_ts - 2 * step,
+            "to": close_ts - 1
+        })
+        if response.status_code == 429:
+            raise httpx.HTTPStatusError("Rate limit atteint", request=response.request, response=response)
+        response.raise_for_status()
+        return [
+            BitcoinDataCollector._to_price_row(entry) + (market["symbol"], interval)
+            for market in response.json() or []
+            for entry in market.get("history") or []
+        ]
+
+    async def poll_once(self, client, interval, symbols, close_ts):
+        """
+        Interroge l'API pour une clôture donnée, avec retries et backoff jitteré.
+
+        Les symboles dont la bougie clôturée n'est pas encore publiée sont
+        redemandés lors de la tentative suivante. Après un 429, l'attente
+        suit l'en-tête Retry-After s'il est fourni. Les erreurs d'une
+        tentative (réseau, réponse invalide, écriture) sont journalisées
+        sans interrompre la collecte.
+
+        Args:
+            client (httpx.AsyncClient): Client HTTP partagé
+            interval (str): Intervalle Coinalyze
+            symbols (tuple): Symboles à interroger
+            close_ts (int): Timestamp Unix de la clôture attendue
+
+        Returns:
+            int: Nombre de bougies enregistrées
+        """
+        step = INTERVAL_SECONDS[interval]
+        expected = datetime.fromtimestamp(close_ts - step, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        pending = tuple(symbols)
+        saved = 0
+
+        for attempt in range(self.max_retries):
+            delay = None
+            try:
+                rows = await self.fetch_closed_candles(client, interval, pending, close_ts)
+                if rows:
+                    await self.save(rows)
+                    saved += len(rows)
+                received = {row[9] for row in rows if row[0] == expected}
+                lag = time.time() - close_ts
+                for symbol in received:
+                    self.lag[(symbol, interval)] = lag
+                    CANDLE_LAG.labels(symbol=symbol, interval=interval).set(lag)
+                pending = tuple(s for s in pending if s not in received)
+                if not pending:
+                    return saved
+                logger.warning(f"Bougie {expected} ({interval}) pas encore publiée pour {', '.join(pending)}")
+            except Exception as e:
+                POLL_ERRORS.labels(interval=interval).inc()
+                logger.error(f"❌ Erreur lors de l'interrogation {interval} ({attempt + 1}/{self.max_retries}): {str(e)}")
+                if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 429:
+                    delay = retry_after_delay(e.response)
+                    if delay is not None:
+                        logger.warning(f"Rate limit atteint, attente de {delay:.0f} secondes")
+            await asyncio.sleep(backoff_delay(attempt) if delay is None else delay)
+
+        logger.error(f"❌ Abandon de la bougie {expected} ({interval}) pour {', '.join(pending)}")
+        return saved
+
+    async def run_market(self, client, interval, symbols, stop_event):
+        """
+        Boucle d'un groupe de marchés : attend chaque clôture puis interroge.
+
+        Args:
+            client (httpx.AsyncClient): Client HTTP partagé
+            interval (str): Intervalle Coinalyze
+            symbols (tuple): Symboles du groupe
+            stop_event (asyncio.Event): Événement d'arrêt
+        """
+        step = INTERVAL_SECONDS[interval]
+        while not stop_event.is_set():
+            close_ts = next_candle_close(time.time(), step)
+            wait = close_ts + self.poll_delay - time.time()
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=max(0.0, wait))
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.poll_once(client, interval, symbols, close_ts)
+            except Exception as e:
+                POLL_ERRORS.labels(interval=interval).inc()
+                logger.error(f"❌ Erreur inattendue de la collecte {interval} ({', '.join(symbols)}): {str(e)}")
+
+    async def run(self, stop_event=None):
+        """
+        Lance une tâche par intervalle et groupe de symboles jusqu'à l'arrêt.
+
+        Args:
+            stop_event (asyncio.Event): Événement d'arrêt (optionnel)
+        """
+        stop_event = stop_event or asyncio.Event()
+        if not self.collector.db_conn:
+            # La connexion est utilisée depuis le thread d'écriture
+            self.collector.connect_db(check_same_thread=False)
+
+        symbols = self.collector.symbols
+        groups = [
+            tuple(symbols[i:i + MAX_SYMBOLS_PER_REQUEST])
+            for i in range(0, len(symbols), MAX_SYMBOLS_PER_REQUEST)
+        ]
+        limits = httpx.Limits(max_keepalive_connections=len(groups) * len(self.collector.intervals))
+        async with httpx.AsyncClient(
+            headers={"Accept": "application/json", "api-key": COINALYZE_API_KEY},
+            timeout=LIVE_HTTP_TIMEOUT,
+            limits=limits
+        ) as client:
+            tasks = [
+                asyncio.create_task(self.run_market(client, interval, group, stop_event))
+                for interval in self.collector.intervals
+                for group in groups
+            ]
+            logger.info(f"Collecte temps réel démarrée ({len(tasks)} tâches)")
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                self._writer.shutdown(wait=True)
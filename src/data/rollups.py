@@ -0,0 +1,491 @@
+"""
+Agrégation OHLCV par tranches de temps (bitcoin_ohlcv_rollups).
+
+Les bougies sont regroupées en SQL par tranches de `bucket` secondes
+alignées sur l'époque Unix : open de la première bougie, plus haut des
+high, plus bas des low, close de la dernière bougie, volumes et
+transactions sommés. Les résolutions de ROLLUP_RESOLUTIONS sont
+précalculées dans la table bitcoin_ohlcv_rollups, que le collecteur tient à
+jour après chaque écriture de prix (seules les tranches à partir de la plus
+ancienne bougie écrite sont recalculées) ; les autres tranches sont agrégées
+à la demande avec la même requête.
+
+La table bitcoin_ohlcv_rollup_state retient, par marché, le plus grand id de
+bitcoin_prices pris en compte. Une bougie écrite hors collecteur reçoit un
+id supérieur : les tranches du marché sont alors ignorées (agrégation à la
+demande) jusqu'au calcul suivant, qui la rattrape. Ce contrôle ne lit que
+les bougies écrites depuis le dernier calcul, quelle que soit la période
+demandée ; une suppression de bougies hors collecteur demande un `rebuild`.
+
+Les statistiques d'une période quelconque combinent les tranches entières
+les plus larges qu'elle contient (jours, puis tranches de 4 heures aux
+bords...) et les seules bougies brutes des extrémités : quelques centaines
+de lignes au plus pour une année, quelle que soit la profondeur de la base.
+
+Usage :
+    python -m src.data.rollups rebuild [--symbol BTCUSDC.A] [--interval 1hour]
+    python -m src.data.rollups check [--symbol BTCUSDC.A] [--interval 1hour]
+"""
+import logging
+import re
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+
+from src.data.config import DEFAULT_SYMBOL, DEFAULT_INTERVAL, INTERVAL_SECONDS, ROLLUP_RESOLUTIONS
+from src.data.storage import maintenance_main
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bitcoin_ohlcv_rollups (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    resolution TEXT NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    open_price REAL NOT NULL,
+    high_price REAL NOT NULL,
+    low_price REAL NOT NULL,
+    close_price REAL NOT NULL,
+    volume REAL,
+    volume_buy REAL,
+    transactions INTEGER,
+    transactions_buy INTEGER,
+    candles INTEGER NOT NULL,
+    close_sum REAL NOT NULL,
+    price_volume REAL,
+    PRIMARY KEY(symbol, interval, resolution, bucket)
+);
+"""
+
+# Filigrane des tranches : plus grand id de bitcoin_prices pris en compte, par marché
+ROLLUP_STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bitcoin_ohlcv_rollup_state (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    price_id INTEGER NOT NULL,
+    PRIMARY KEY(symbol, interval)
+);
+"""
+
+# Colonnes d'une tranche, dans l'ordre des requêtes (après bucket)
+OHLCV_COLUMNS = [
+    "open_price", "high_price", "low_price", "close_price",
+    "volume", "volume_buy", "transactions", "transactions_buy", "candles"
+]
+
+# Colonnes stockées : tranche puis sommes des statistiques (moyenne des close, VWAP)
+ROLLUP_COLUMNS = OHLCV_COLUMNS + ["close_sum", "price_volume"]
+
+# Sommes d'une période, lues sur les bougies brutes ou sur les tranches
+_RAW_STATS = """MIN(low_price), MAX(high_price), SUM(close_price), COUNT(*), SUM(volume), SUM(volume_buy),
+               SUM((high_price + low_price + close_price) / 3 * volume)"""
+_ROLLUP_STATS = """MIN(low_price), MAX(high_price), SUM(close_sum), SUM(candles), SUM(volume), SUM(volume_buy),
+               SUM(price_volume)"""
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_EPOCH = datetime(1970, 1, 1)
+_BUCKET_PATTERN = re.compile(r"^(\d+)(min|h|d)$")
+_UNIT_SECONDS = {"min": 60, "h": 3600, "d": 86400}
+
+
+def ensure_rollup_table(conn):
+    """Crée les tables bitcoin_ohlcv_rollups et bitcoin_ohlcv_rollup_state si besoin."""
+    conn.execute(ROLLUP_TABLE_SCHEMA)
+    conn.execute(ROLLUP_STATE_SCHEMA)
+
+
+def parse_bucket(bucket: str) -> int:
+    """
+    Durée d'une tranche en secondes.
+
+    Args:
+        bucket (str): Nom d'intervalle Coinalyze (4hour, daily...) ou durée
+            libre : nombre suivi de min, h ou d (15min, 3h, 7d)
+
+    Returns:
+        int: Durée en secondes
+
+    Raises:
+        ValueError: Si la tranche n'est pas reconnue
+    """
+    if bucket in INTERVAL_SECONDS:
+        return INTERVAL_SECONDS[bucket]
+    match = _BUCKET_PATTERN.match(bucket or "")
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Tranche invalide : {bucket}")
+    return int(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+
+
+def rollup_resolutions(interval=DEFAULT_INTERVAL):
+    """Résolutions précalculées pour un intervalle (multiples stricts de celui-ci)."""
+    seconds = INTERVAL_SECONDS.get(interval)
+    if not seconds:
+        return []
+    return [
+        resolution for resolution in ROLLUP_RESOLUTIONS
+        if INTERVAL_SECONDS[resolution] > seconds and INTERVAL_SECONDS[resolution] % seconds == 0
+    ]
+
+
+def _epoch(timestamp) -> int:
+    return int((datetime.fromisoformat(str(timestamp)) - _EPOCH).total_seconds())
+
+
+def _format(epoch: int) -> str:
+    return (_EPOCH + timedelta(seconds=epoch)).strftime(TIMESTAMP_FORMAT)
+
+
+def _aggregate_query(start=None, end=None):
+    """
+    Requête d'agrégation des bougies d'un marché par tranches de :seconds secondes.
+
+    Paramètres nommés : symbol, interval, seconds, et start/end (bornes
+    [start, end[ des bougies) lorsque demandés. Colonnes : bucket puis ROLLUP_COLUMNS.
+    """
+    bounds = ""
+    if start is not None:
+        bounds += " AND timestamp >= :start"
+    if end is not None:
+        bounds += " AND timestamp < :end"
+    return f"""
+        SELECT datetime(b.bucket, 'unixepoch') AS bucket,
+               o.open_price, b.high_price, b.low_price, c.close_price,
+               b.volume, b.volume_buy, b.transactions, b.transactions_buy, b.candles,
+               b.close_sum, b.price_volume
+        FROM (
+            SELECT (CAST(strftime('%s', timestamp) AS INTEGER) / :seconds) * :seconds AS bucket,
+                   MIN(timestamp) AS first_ts, MAX(timestamp) AS last_ts,
+                   MAX(high_price) AS high_price, MIN(low_price) AS low_price,
+                   SUM(volume) AS volume, SUM(volume_buy) AS volume_buy,
+                   SUM(transactions) AS transactions, SUM(transactions_buy) AS transactions_buy,
+                   COUNT(*) AS candles, SUM(close_price) AS close_sum,
+                   SUM((high_price + low_price + close_price) / 3 * volume) AS price_volume
+            FROM bitcoin_prices
+            WHERE symbol = :symbol AND interval = :interval{bounds}
+            GROUP BY 1
+        ) b
+        JOIN bitcoin_prices o
+          ON o.symbol = :symbol AND o.interval = :interval AND o.timestamp = b.first_ts
+        JOIN bitcoin_prices c
+          ON c.symbol = :symbol AND c.interval = :interval AND c.timestamp = b.last_ts
+    """
+
+
+def update_rollups(conn, symbol=DEFAULT_SYMBOL, interval=DEFAULT_INTERVAL, since=None):
+    """
+    Recalcule les tranches précalculées d'un marché à partir de la bougie `since` (sans commit).
+
+    Args:
+        conn (sqlite3.Connection): Connexion d'écriture
+        symbol (str): Symbole Coinalyze
+        interval (str): Intervalle des bougies
+        since (str): Plus ancienne bougie modifiée (None : tout l'historique)
+
+    Returns:
+        int: Nombre de tranches écrites
+    """
+    ensure_rollup_table(conn)
+    return _refresh_rollups(conn, symbol, interval, since)
+
+
+def _refresh_rollups(conn, symbol, interval, since=None):
+    watermark = conn.execute("SELECT MAX(id) FROM bitcoin_prices").fetchone()[0] or 0
+    if since is not None:
+        state = conn.execute(
+            "SELECT price_id FROM bitcoin_ohlcv_rollup_state WHERE symbol = ? AND interval = ?",
+            (symbol, interval)
+        ).fetchone()
+        # Sans filigrane, tout est recalculé ; sinon les bougies écrites hors
+        # collecteur depuis le dernier calcul sont rattrapées
+        earliest = None
+        if state is not None:
+            earliest = conn.execute(
+                "SELECT MIN(timestamp) FROM bitcoin_prices NOT INDEXED WHERE id > ? AND symbol = ? AND interval = ?",
+                (state[0], symbol, interval)
+            ).fetchone()[0]
+        if state is None:
+            since = None
+        elif earliest is not None and str(earliest) < str(since):
+            since = earliest
+
+    written = 0
+    for resolution in rollup_resolutions(interval):
+        seconds = INTERVAL_SECONDS[resolution]
+        params = {"symbol": symbol, "interval": interval, "resolution": resolution, "seconds": seconds}
+        if since is None:
+            conn.execute(
+                "DELETE FROM bitcoin_ohlcv_rollups WHERE symbol = ? AND interval = ? AND resolution = ?",
+                (symbol, interval, resolution)
+            )
+        else:
+            # La tranche de `since` est recalculée en entier
+            params["start"] = _format(_epoch(since) // seconds * seconds)
+        cursor = conn.execute(f"""
+            INSERT OR REPLACE INTO bitcoin_ohlcv_rollups
+            (symbol, interval, resolution, bucket, {', '.join(ROLLUP_COLUMNS)})
+            SELECT :symbol, :interval, :resolution, * FROM ({_aggregate_query(params.get("start"))})
+        """, params)
+        written += cursor.rowcount
+    conn.execute(
+        "INSERT OR REPLACE INTO bitcoin_ohlcv_rollup_state (symbol, interval, price_id) VALUES (?, ?, ?)",
+        (symbol, interval, watermark)
+    )
+    return written
+
+
+def _rollups_current(conn, symbol, interval):
+    """Vrai si les tranches du marché tiennent compte de toutes ses bougies (filigrane à jour)."""
+    try:
+        state = conn.execute(
+            "SELECT price_id FROM bitcoin_ohlcv_rollup_state WHERE symbol = ? AND interval = ?",
+            (symbol, interval)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return False
+    if state is None:
+        return False
+    # NOT INDEXED : parcours par id des seules bougies écrites depuis le calcul,
+    # plutôt que de toutes les bougies du marché par l'index (symbol, interval)
+    newer = conn.execute(
+        "SELECT 1 FROM bitcoin_prices NOT INDEXED WHERE id > ? AND symbol = ? AND interval = ? LIMIT 1",
+        (state[0], symbol, interval)
+    ).fetchone()
+    return newer is None
+
+
+def _read_rollup(conn, params, resolution, limit):
+    """Tranches précalculées, ou None si la table est absente ou en retard sur bitcoin_prices."""
+    if not _rollups_current(conn, params["symbol"], params["interval"]):
+        return None
+    query = f"""
+        SELECT bucket, {', '.join(OHLCV_COLUMNS)}
+        FROM bitcoin_ohlcv_rollups
+        WHERE symbol = :symbol AND interval = :interval AND resolution = :resolution
+    """
+    if "start" in params:
+        query += " AND bucket >= :start"
+    if "end" in params:
+        query += " AND bucket < :end"
+    query += " ORDER BY bucket DESC"
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+    return conn.execute(query, {**params, "resolution": resolution}).fetchall()
+
+
+def read_ohlcv(conn, symbol=DEFAULT_SYMBOL, interval=DEFAULT_INTERVAL, bucket_seconds=86400,
+               start=None, end=None, limit=None, use_rollups=True):
+    """
+    Agrège les bougies d'un marché par tranches de `bucket_seconds` secondes.
+
+    Les bornes sont étendues aux tranches entières qui les contiennent. Les
+    résolutions précalculées sont lues dans bitcoin_ohlcv_rollups si la table
+    tient compte de toutes les bougies du marché, sinon agrégées à la demande.
+
+    Args:
+        conn (sqlite3.Connection): Connexion
+        symbol (str): Symbole Coinalyze
+        interval (str): Intervalle des bougies
+        bucket_seconds (int): Durée d'une tranche en secondes
+        start (str): Première bougie (incluse)
+        end (str): Dernière bougie (exclue)
+        limit (int): Nombre de dernières tranches (None : toutes)
+        use_rollups (bool): Lire la table d'agrégats si la résolution y est précalculée
+
+    Returns:
+        Tuple[list, str]: Tranches (bucket puis OHLCV_COLUMNS) par ordre
+            chronologique, et leur source ("rollup" ou "aggregate")
+    """
+    params = {"symbol": symbol, "interval": interval, "seconds": int(bucket_seconds)}
+    if start is not None:
+        params["start"] = _format(_epoch(start) // bucket_seconds * bucket_seconds)
+    if end is not None:
+        params["end"] = _format(-(-_epoch(end) // bucket_seconds) * bucket_seconds)
+
+    resolution = next(
+        (r for r in rollup_resolutions(interval) if INTERVAL_SECONDS[r] == bucket_seconds), None
+    )
+    if use_rollups and resolution is not None:
+        rows = _read_rollup(conn, params, resolution, limit)
+        if rows is not None:
+            return rows[::-1], "rollup"
+
+    query = f"""
+        SELECT bucket, {', '.join(OHLCV_COLUMNS)}
+        FROM ({_aggregate_query(params.get("start"), params.get("end"))})
+        ORDER BY bucket DESC
+    """
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+    return conn.execute(query, params).fetchall()[::-1], "aggregate"
+
+
+def _plan_segments(start: int, end: int, levels):
+    """
+    Découpe [start, end[ en tranches entières, les plus larges au centre.
+
+    Args:
+        start (int): Début (secondes depuis l'époque)
+        end (int): Fin exclue (secondes depuis l'époque)
+        levels (list): (résolution, secondes) par durée décroissante
+
+    Returns:
+        list: Segments contigus (résolution ou None pour les bougies brutes, début, fin)
+    """
+    if start >= end:
+        return []
+    if not levels:
+        return [(None, start, end)]
+    (resolution, seconds), finer = levels[0], levels[1:]
+    inner_start = -(-start // seconds) * seconds
+    inner_end = end // seconds * seconds
+    if inner_start >= inner_end:
+        return _plan_segments(start, end, finer)
+    return (
+        _plan_segments(start, inner_start, finer)
+        + [(resolution, inner_start, inner_end)]
+        + _plan_segments(inner_end, end, finer)
+    )
+
+
+def _stats_sums(conn, symbol, interval, segments):
+    """Sommes partielles des segments, ou None si la table d'agrégats est absente ou en retard."""
+    if any(resolution for resolution, _, _ in segments) and not _rollups_current(conn, symbol, interval):
+        return None
+    sums = []
+    for resolution, start, end in segments:
+        if resolution is None:
+            sums.append(conn.execute(f"""
+                SELECT {_RAW_STATS} FROM bitcoin_prices
+                WHERE symbol = ? AND interval = ? AND timestamp >= ? AND timestamp < ?
+            """, (symbol, interval, _format(start), _format(end))).fetchone())
+            continue
+        sums.append(conn.execute(f"""
+            SELECT {_ROLLUP_STATS} FROM bitcoin_ohlcv_rollups
+            WHERE symbol = ? AND interval = ? AND resolution = ? AND bucket >= ? AND bucket < ?
+        """, (symbol, interval, resolution, _format(start), _format(end))).fetchone())
+    return sums
+
+
+def read_stats(conn, symbol=DEFAULT_SYMBOL, interval=DEFAULT_INTERVAL, start=None, end=None, use_rollups=True):
+    """
+    Statistiques des bougies d'un marché sur [start, end[.
+
+    Args:
+        conn (sqlite3.Connection): Connexion
+        symbol (str): Symbole Coinalyze
+        interval (str): Intervalle des bougies
+        start (str): Première bougie (incluse), en UTC comme les bougies stockées
+        end (str): Dernière bougie (exclue), en UTC ; None : jusqu'à maintenant
+        use_rollups (bool): Combiner les tranches précalculées plutôt que parcourir les bougies
+
+    Returns:
+        Tuple[dict, str]: min_price, max_price, avg_price (moyenne des close),
+            total_volume, data_points, vwap (prix typique pondéré par le volume)
+            et buy_sell_ratio (volume acheteur / volume vendeur) ; puis la
+            source ("rollup" ou "aggregate")
+    """
+    bounds = (
+        _epoch(start) if start is not None else 0,
+        _epoch(end) if end is not None else _epoch(datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)) + 1
+    )
+    sums, source = None, "aggregate"
+    if use_rollups:
+        levels = sorted(
+            ((r, INTERVAL_SECONDS[r]) for r in rollup_resolutions(interval)), key=lambda level: -level[1]
+        )
+        segments = _plan_segments(*bounds, levels)
+        if any(resolution for resolution, _, _ in segments):
+            sums = _stats_sums(conn, symbol, interval, segments)
+            source = "rollup"
+    if sums is None:
+        sums, source = _stats_sums(conn, symbol, interval, _plan_segments(*bounds, [])), "aggregate"
+
+    def total(i):
+        values = [row[i] for row in sums if row[i] is not None]
+        return sum(values) if values else None
+
+    lows = [row[0] for row in sums if row[0] is not None]
+    highs = [row[1] for row in sums if row[1] is not None]
+    close_sum, candles, volume, volume_buy, price_volume = (total(i) for i in range(2, 7))
+    volume_sell = volume - volume_buy if volume is not None and volume_buy is not None else None
+    return {
+        "min_price": min(lows) if lows else None,
+        "max_price": max(highs) if highs else None,
+        "avg_price": close_sum / candles if candles else None,
+        "total_volume": volume,
+        "data_points": candles or 0,
+        "vwap": price_volume / volume if volume and price_volume is not None else None,
+        "buy_sell_ratio": volume_buy / volume_sell if volume_sell else None
+    }, source
+
+
+def check_rollups(conn, symbol=DEFAULT_SYMBOL, interval=DEFAULT_INTERVAL, rtol=1e-9):
+    """
+    Compare les tranches précalculées à l'agrégation de tout l'historique.
+
+    Args:
+        conn (sqlite3.Connection): Connexion
+        symbol (str): Symbole Coinalyze
+        interval (str): Intervalle des bougies
+        rtol (float): Tolérance relative sur les valeurs
+
+    Returns:
+        dict: resolutions (résolution -> buckets, rows, missing, orphans,
+            mismatched) et ok
+    """
+    ensure_rollup_table(conn)
+    resolutions = {}
+    for resolution in rollup_resolutions(interval):
+        params = {"symbol": symbol, "interval": interval, "seconds": INTERVAL_SECONDS[resolution]}
+        expected = {row[0]: row[1:] for row in conn.execute(_aggregate_query(), params)}
+        stored = {row[0]: row[1:] for row in conn.execute(f"""
+            SELECT bucket, {', '.join(ROLLUP_COLUMNS)}
+            FROM bitcoin_ohlcv_rollups
+            WHERE symbol = ? AND interval = ? AND resolution = ?
+        """, (symbol, interval, resolution))}
+        mismatched = sum(
+            1 for bucket in expected.keys() & stored.keys()
+            if any(
+                (a is None) != (b is None) or (a is not None and abs(a - b) > rtol * max(abs(a), abs(b)))
+                for a, b in zip(expected[bucket], stored[bucket])
+            )
+        )
+        resolutions[resolution] = {
+            "buckets": len(expected),
+            "rows": len(stored),
+            "missing": len(expected.keys() - stored.keys()),
+            "orphans": len(stored.keys() - expected.keys()),
+            "mismatched": mismatched
+        }
+    return {
+        "symbol": symbol,
+        "interval": interval,
+        "resolutions": resolutions,
+        "ok": not any(r["missing"] or r["orphans"] or r["mismatched"] for r in resolutions.values())
+    }
+
+
+def _rebuild(conn, symbol, interval):
+    rows = update_rollups(conn, symbol, interval)
+    return (f"{symbol} {interval}: {rows} tranches recalculées "
+            f"({', '.join(rollup_resolutions(interval)) or 'aucune résolution'})")
+
+
+def _check(conn, symbol, interval):
+    return [
+        (not (r["missing"] or r["orphans"] or r["mismatched"]),
+         f"{symbol} {interval} {resolution}: {r['rows']}/{r['buckets']} tranches, "
+         f"{r['missing']} manquantes, {r['orphans']} orphelines, {r['mismatched']} écarts")
+        for resolution, r in check_rollups(conn, symbol, interval)["resolutions"].items()
+    ]
+
+
+def main(argv=None):
+    """Point d'entrée en ligne de commande (rebuild, check)."""
+    return maintenance_main(argv, "Maintenance de la table bitcoin_ohlcv_rollups", _rebuild, _check)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,36 +1,34 @@
 """
 Script d'exécution de la collecte des données en continu.
 """
-import time
+import asyncio
 import signal
-import sys
-from collector import BitcoinDataCollector
-from config import UPDATE_INTERVAL
+from prometheus_client import start_http_server
+from src.data.collector import BitcoinDataCollector
+from src.data.live_collector import LiveCollector
+from src.data.config import METRICS_PORT
 
-def signal_handler(signum, frame):
-    """Gestionnaire de signal pour arrêter proprement le script."""
-    print("\nArrêt du collecteur...")
-    sys.exit(0)
+async def run():
+    """Lance la collecte temps réel jusqu'à réception d'un signal d'arrêt."""
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop_event.set)
 
-def main():
-    """Fonction principale d'exécution."""
-    # Configuration du gestionnaire de signal pour Ctrl+C
-    signal.signal(signal.SIGINT, signal_handler)
-    
     collector = BitcoinDataCollector()
-    print(f"Démarrage de la collecte (intervalle: {UPDATE_INTERVAL} secondes)")
-    
+    print(f"Démarrage de la collecte ({', '.join(collector.symbols)} / {', '.join(collector.intervals)})")
+
     try:
-        while True:
-            try:
-                collector.collect_data()
-            except Exception as e:
-                print(f"Erreur lors de la collecte: {str(e)}")
-            
-            # Attente avant la prochaine collecte
-            time.sleep(UPDATE_INTERVAL)
+        await LiveCollector(collector).run(stop_event)
     finally:
+        print("\nArrêt du collecteur...")
         collector.close()
 
+def main():
+    """Fonction principale d'exécution."""
+    # Exposition des métriques (retard depuis la clôture des bougies)
+    start_http_server(METRICS_PORT)
+    asyncio.run(run())
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
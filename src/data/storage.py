@@ -0,0 +1,425 @@
+"""
+Couche de stockage SQLite partagée par le collecteur et l'API.
+
+Le collecteur utilise une unique connexion d'écriture (WAL,
+synchronous=NORMAL) ; l'API ouvre des connexions en lecture seule qui ne
+sont pas bloquées par les commits du collecteur.
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.data import config as data_config
+from src.data.config import (
+    DEFAULT_SYMBOL,
+    DEFAULT_INTERVAL,
+    PRICE_TABLE_SCHEMA,
+    PRICE_TABLE_INDEXES,
+    CHECKPOINT_TABLE_SCHEMA,
+    INDICATOR_STATE_TABLE_SCHEMA,
+    SQLITE_BUSY_TIMEOUT,
+    SQLITE_CACHE_SIZE,
+    SQLITE_MMAP_SIZE,
+    FETCH_CHUNK_ROWS
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _apply_read_pragmas(conn):
+    """Pragmas de performance communs aux lectures et aux écritures."""
+    conn.execute(f"PRAGMA busy_timeout = {int(SQLITE_BUSY_TIMEOUT)}")
+    conn.execute(f"PRAGMA mmap_size = {int(SQLITE_MMAP_SIZE)}")
+    conn.execute(f"PRAGMA cache_size = {int(SQLITE_CACHE_SIZE)}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+
+
+def _table_columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def needs_migration(conn) -> bool:
+    """
+    Indique si la base contient des tables au schéma d'avant le support multi-marchés.
+
+    N'écrit rien : utilisable depuis une connexion en lecture seule.
+
+    Args:
+        conn (sqlite3.Connection): Connexion
+
+    Returns:
+        bool: True si migrate_legacy_schema a du travail (y compris une migration interrompue à reprendre)
+    """
+    if conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bitcoin_prices_legacy'"
+    ).fetchone():
+        return True
+    return any(
+        columns and "symbol" not in columns
+        for columns in (_table_columns(conn, "bitcoin_prices"), _table_columns(conn, "backfill_checkpoints"))
+    )
+
+
+def migrate_legacy_schema(conn):
+    """
+    Migre les tables créées avant le support multi-marchés.
+
+    L'ancienne table bitcoin_prices (unicité sur timestamp seul) est
+    reconstruite avec les colonnes symbol/interval, les lignes existantes
+    étant rattachées au marché par défaut. Les anciens points de reprise,
+    sans marché associé, sont abandonnés.
+
+    La migration s'exécute dans une seule transaction BEGIN IMMEDIATE (le
+    module sqlite3 n'en ouvre pas avant les DDL) : une erreur la défait
+    entièrement et un second processus attend le verrou d'écriture puis
+    constate que la base est déjà migrée. Une table bitcoin_prices_legacy
+    restée d'une migration interrompue est reprise : ses lignes absentes de
+    la nouvelle table y sont recopiées.
+
+    Args:
+        conn (sqlite3.Connection): Connexion d'écriture
+    """
+    if not needs_migration(conn):
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        resume = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bitcoin_prices_legacy'"
+        ).fetchone() is not None
+        columns = _table_columns(conn, "bitcoin_prices")
+        if resume:
+            logger.warning("Reprise d'une migration interrompue de bitcoin_prices (table bitcoin_prices_legacy)")
+        elif columns and "symbol" not in columns:
+            logger.info("Migration de bitcoin_prices vers le schéma multi-marchés")
+            conn.execute("ALTER TABLE bitcoin_prices RENAME TO bitcoin_prices_legacy")
+            resume = True
+        if resume:
+            conn.execute(PRICE_TABLE_SCHEMA)
+            conn.execute("""
+                INSERT OR IGNORE INTO bitcoin_prices
+                (timestamp, open_price, high_price, low_price, close_price,
+                 volume, volume_buy, transactions, transactions_buy, symbol, interval)
+                SELECT timestamp, open_price, high_price, low_price, close_price,
+                       volume, volume_buy, transactions, transactions_buy, ?, ?
+                FROM bitcoin_prices_legacy
+            """, (DEFAULT_SYMBOL, DEFAULT_INTERVAL))
+            conn.execute("DROP TABLE bitcoin_prices_legacy")
+
+        columns = _table_columns(conn, "backfill_checkpoints")
+        if columns and "symbol" not in columns:
+            conn.execute("DROP TABLE backfill_checkpoints")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def ensure_schema(conn):
+    """
+    Crée ou migre les tables et index du stockage.
+
+    Args:
+        conn (sqlite3.Connection): Connexion d'écriture
+    """
+    migrate_legacy_schema(conn)
+    conn.execute(PRICE_TABLE_SCHEMA)
+    conn.execute(CHECKPOINT_TABLE_SCHEMA)
+    conn.execute(INDICATOR_STATE_TABLE_SCHEMA)
+    for index_sql in PRICE_TABLE_INDEXES:
+        conn.execute(index_sql)
+    conn.commit()
+
+
+def connect_writer(db_file=None, check_same_thread=True):
+    """
+    Ouvre la connexion d'écriture du collecteur.
+
+    Active le journal WAL (persistant dans le fichier) pour que les lecteurs
+    ne soient pas bloqués pendant les écritures, avec synchronous=NORMAL,
+    sûr en mode WAL et bien moins coûteux qu'un fsync par commit.
+
+    Args:
+        db_file (str): Chemin de la base (défaut : DB_FILE)
+        check_same_thread (bool): Restreindre la connexion au thread créateur
+
+    Returns:
+        sqlite3.Connection: Connexion d'écriture avec le schéma à jour
+    """
+    db_file = db_file or data_config.DB_FILE
+    directory = os.path.dirname(db_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(
+        db_file,
+        timeout=SQLITE_BUSY_TIMEOUT / 1000,
+        check_same_thread=check_same_thread
+    )
+    mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+    if mode.lower() != "wal":
+        logger.warning(f"Mode WAL indisponible, journal en mode {mode}")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    _apply_read_pragmas(conn)
+    ensure_schema(conn)
+    return conn
+
+
+def connect_reader(db_file=None, check_same_thread=True):
+    """
+    Ouvre une connexion en lecture seule (API, benchmarks).
+
+    Args:
+        db_file (str): Chemin de la base (défaut : DB_FILE)
+        check_same_thread (bool): Restreindre la connexion au thread créateur
+
+    Returns:
+        sqlite3.Connection: Connexion en lecture seule
+    """
+    db_file = db_file or data_config.DB_FILE
+    uri = f"file:{os.path.abspath(db_file)}?mode=ro"
+    conn = sqlite3.connect(
+        uri,
+        uri=True,
+        timeout=SQLITE_BUSY_TIMEOUT / 1000,
+        check_same_thread=check_same_thread
+    )
+    conn.execute("PRAGMA query_only = ON")
+    _apply_read_pragmas(conn)
+    return conn
+
+
+def read_recent_candles(conn, symbol=DEFAULT_SYMBOL, interval=DEFAULT_INTERVAL, limit=None):
+    """
+    Lit les dernières bougies d'un marché en colonnes typées.
+
+    La requête parcourt l'index (symbol, interval, timestamp) à rebours et
+    s'arrête après `limit` lignes ; les lignes sont converties par blocs en
+    tableaux float64, sans DataFrame intermédiaire de type object.
+
+    Args:
+        conn (sqlite3.Connection): Connexion en lecture
+        symbol (str): Symbole Coinalyze
+        interval (str): Intervalle des bougies
+        limit (int): Nombre de bougies à lire (None : tout l'historique)
+
+    Returns:
+        pd.DataFrame: timestamp (datetime64) et prix/volume (float64), par ordre chronologique
+    """
+    query = """
+        SELECT timestamp, open_price, high_price, low_price, close_price, volume
+        FROM bitcoin_prices
+        WHERE symbol = ? AND interval = ?
+        ORDER BY timestamp DESC
+    """
+    params = [symbol, interval]
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(int(limit))
+
+    cursor = conn.execute(query, params)
+    timestamps, blocks = [], []
+    while True:
+        rows = cursor.fetchmany(FETCH_CHUNK_ROWS)
+        if not rows:
+            break
+        timestamps.extend(row[0] for row in rows)
+        blocks.append(np.array([row[1:] for row in rows], dtype=np.float64))
+
+    values = np.concatenate(blocks)[::-1] if blocks else np.empty((0, 5))
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(timestamps[::-1]),
+        "open_price": values[:, 0],
+        "high_price": values[:, 1],
+        "low_price": values[:, 2],
+        "close_price": values[:, 3],
+        "volume": values[:, 4]
+    })
+
+
+def load_indicator_state(conn, symbol=DEFAULT_SYMBOL, interval=DEFAULT_INTERVAL):
+    """
+    Lit l'état des indicateurs persisté pour un marché.
+
+    Args:
+        conn (sqlite3.Connection): Connexion
+        symbol (str): Symbole Coinalyze
+        interval (str): Intervalle des bougies
+
+    Returns:
+        dict: État sérialisé (IndicatorState.to_dict), ou None s'il n'existe pas
+    """
+    try:
+        row = conn.execute(
+            "SELECT state FROM indicator_state WHERE symbol = ? AND interval = ?",
+            (symbol, interval)
+        ).fetchone()
+    except sqlite3.OperationalError as e:
+        # Base antérieure à la table d'état
+        if "no such table" in str(e):
+            return None
+        raise
+    return json.loads(row[0]) if row else None
+
+
+def save_indicator_state(conn, symbol, interval, state):
+    """
+    Enregistre l'état des indicateurs d'un marché (sans commit).
+
+    Args:
+        conn (sqlite3.Connection): Connexion d'écriture
+        symbol (str): Symbole Coinalyze
+        interval (str): Intervalle des bougies
+        state (dict): État sérialisé (IndicatorState.to_dict)
+    """
+    conn.execute("""
+        INSERT OR REPLACE INTO indicator_state (symbol, interval, state, updated_at)
+        VALUES (?, ?, ?, ?)
+    """, (symbol, interval, json.dumps(state), datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+
+
+def list_markets(conn, symbol=None, interval=None):
+    """
+    Marchés (symbole, intervalle) présents dans bitcoin_prices.
+
+    Args:
+        conn (sqlite3.Connection): Connexion
+        symbol (str): Ne garder que ce symbole (optionnel)
+        interval (str): Ne garder que cet intervalle (optionnel)
+
+    Returns:
+        list: Tuples (symbol, interval) triés
+    """
+    query = "SELECT DISTINCT symbol, interval FROM bitcoin_prices WHERE 1 = 1"
+    params = []
+    if symbol:
+        query += " AND symbol = ?"
+        params.append(symbol)
+    if interval:
+        query += " AND interval = ?"
+        params.append(interval)
+    return conn.execute(query + " ORDER BY symbol, interval", params).fetchall()
+
+
+def maintenance_main(argv, description, rebuild, check):
+    """
+    Ligne de commande commune des tables dérivées de bitcoin_prices (rebuild, check).
+
+    Args:
+        argv (list): Arguments (None : sys.argv)
+        description (str): Description affichée par --help
+        rebuild (callable): rebuild(conn, symbol, interval) -> ligne de compte rendu
+        check (callable): check(conn, symbol, interval) -> liste de (ok, ligne de compte rendu)
+
+    Returns:
+        int: 0 si toutes les vérifications passent, 1 sinon
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--symbol")
+    parser.add_argument("--interval")
+    args = parser.parse_args(argv)
+
+    conn = connect_writer()
+    ok = True
+    try:
+        for symbol, interval in list_markets(conn, args.symbol, args.interval):
+            if args.command == "rebuild":
+                line = rebuild(conn, symbol, interval)
+                conn.commit()
+                print(f"✅ {line}")
+            else:
+                for passed, line in check(conn, symbol, interval):
+                    ok = ok and passed
+                    print(f"{'✅' if passed else '❌'} {line}")
+    finally:
+        conn.close()
+    return 0 if ok else 1
+
+
+class ConnectionPool:
+    """
+    Pool thread-safe de connexions en lecture seule.
+
+    Les connexions sont créées à la demande jusqu'à `size`, puis réutilisées ;
+    chacune n'est utilisée que par une requête à la fois, d'où
+    check_same_thread=False.
+    """
+
+    def __init__(self, db_file=None, size=8, timeout=5.0):
+        """
+        Initialise le pool.
+
+        Args:
+            db_file (str): Chemin de la base (défaut : DB_FILE)
+            size (int): Nombre maximal de connexions ouvertes
+            timeout (float): Attente max d'une connexion libre (secondes)
+        """
+        self.db_file = db_file or data_config.DB_FILE
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._all = []
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def acquire(self):
+        """
+        Emprunte une connexion, en l'ouvrant si aucune n'est libre.
+
+        Returns:
+            sqlite3.Connection: Connexion en lecture seule
+
+        Raises:
+            TimeoutError: Si aucune connexion ne se libère à temps
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError("Aucune connexion disponible dans le pool")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                conn = connect_reader(self.db_file, check_same_thread=False)
+            except Exception:
+                self._slots.release()
+                raise
+            with self._lock:
+                self._all.append(conn)
+            return conn
+
+    def release(self, conn):
+        """Rend une connexion au pool."""
+        if self.closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Contexte empruntant puis rendant une connexion."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Ferme toutes les connexions ouvertes par le pool."""
+        self.closed = True
+        with self._lock:
+            for conn in self._all:
+                try:
+                    conn.close()
+                except sqlite3.ProgrammingError:
+                    pass
+            self._all.clear()
@@ -0,0 +1,254 @@
+"""
+Format compact de l'artefact du modèle Prophet.
+
+Le fichier est en JSON Lines sur deux lignes :
+
+1. le manifeste : version du format, filigrane des données d'entraînement
+   (première et dernière bougie, nombre de lignes), empreinte SHA-256 et
+   taille de la charge utile, paramètres, régresseurs et fit_info ;
+2. la charge utile : le modèle Prophet sérialisé par prophet.serialize
+   (Series et DataFrames en colonnes typées) et l'état des indicateurs
+   après la dernière bougie d'entraînement.
+
+Seuls les paramètres ajustés sont conservés : l'historique d'entraînement
+du modèle Prophet est réduit à sa dernière ligne et la tendance ajustée
+point par point est omise (predict ne s'en sert pas lorsqu'un DataFrame
+futur est fourni), si bien que la taille de l'artefact
+ne dépend plus de la profondeur de l'historique. Le manifeste se lit sans
+décoder la charge utile et l'empreinte détecte un fichier tronqué ou
+modifié.
+
+Le chargement du modèle n'accepte que ce format ; un ancien pickle (dont
+la lecture peut exécuter du code) ne se lit plus que par la commande
+explicite `convert`, sur un fichier de confiance.
+
+Usage :
+    python -m src.models.artifact inspect models/prophet_model.jsonl
+    python -m src.models.artifact convert models/prophet_model.pkl models/prophet_model.jsonl
+"""
+import argparse
+import copy
+import hashlib
+import json
+import os
+import pickle
+import sys
+from datetime import datetime
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import prophet
+from prophet import Prophet
+from prophet.serialize import PD_DATAFRAME, PD_SERIES, model_from_dict, model_to_dict
+
+# Identifiant et version du format (à incrémenter à chaque changement incompatible)
+ARTIFACT_FORMAT = 'bitcoin-prophet'
+ARTIFACT_VERSION = 1
+
+
+class ArtifactError(ValueError):
+    """Artefact illisible : format inconnu, version non gérée ou empreinte invalide."""
+
+
+def is_artifact(data: bytes) -> bool:
+    """Indique si `data` ressemble à un artefact compact (premier octet du manifeste JSON)."""
+    return data.lstrip()[:1] == b'{'
+
+
+def _encode_values(values: pd.Series) -> dict:
+    dtype = values.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind == 'M':
+        values = values.astype('int64')
+    return {'dtype': str(dtype), 'values': values.tolist()}
+
+
+def _decode_values(item: dict):
+    dtype = pd.api.types.pandas_dtype(item['dtype'])
+    if not isinstance(dtype, np.dtype):
+        return pd.array(item['values'], dtype=dtype)
+    if dtype.kind == 'M':
+        return np.array(item['values'], dtype=np.int64).view(dtype)
+    return np.array(item['values'], dtype=dtype)
+
+
+def _encode_pandas(value):
+    """Series ou DataFrame en colonnes typées (relues sans pd.read_json)."""
+    if value is None:
+        return None
+    encoded = {'index': _encode_values(value.index.to_series()), 'index_name': value.index.name}
+    if isinstance(value, pd.Series):
+        return {**encoded, 'name': value.name, 'series': _encode_values(value)}
+    return {
+        **encoded,
+        'columns_name': value.columns.name,
+        'columns': [[name, _encode_values(value[name])] for name in value.columns]
+    }
+
+
+def _decode_pandas(data: Optional[dict]):
+    if data is None:
+        return None
+    index = pd.Index(_decode_values(data['index']), name=data['index_name'])
+    if 'series' in data:
+        return pd.Series(_decode_values(data['series']), index=index, name=data['name'])
+    frame = pd.DataFrame({name: _decode_values(item) for name, item in data['columns']}, index=index)
+    frame.columns.name = data['columns_name']
+    return frame
+
+
+def encode_prophet(model: Prophet) -> Optional[dict]:
+    """
+    Sérialise un modèle Prophet ajusté, historique réduit à sa dernière ligne.
+
+    Les Series et DataFrames du modèle sont stockés en colonnes typées plutôt
+    qu'au format de prophet.serialize, dont la relecture par pd.read_json
+    domine sinon le temps de chargement.
+
+    Args:
+        model: Modèle Prophet
+
+    Returns:
+        dict: Modèle sérialisé, ou None si le modèle n'est pas ajusté
+    """
+    if model.history is None:
+        return None
+    trimmed = copy.copy(model)
+    trimmed.history = model.history.tail(1)
+    trimmed.history_dates = model.history_dates.tail(1)
+    data = model_to_dict(trimmed)
+    # Tendance ajustée point par point : sortie de Stan, inutilisée par predict
+    data['params'] = {name: value for name, value in data['params'].items() if name != 'trend'}
+    for attribute in PD_SERIES + PD_DATAFRAME:
+        data[attribute] = _encode_pandas(getattr(trimmed, attribute))
+    return data
+
+
+def decode_prophet(data: Optional[dict]) -> Optional[Prophet]:
+    """Reconstruit un modèle Prophet sérialisé par encode_prophet."""
+    if data is None:
+        return None
+    pandas_attributes = PD_SERIES + PD_DATAFRAME
+    model = model_from_dict({**data, **dict.fromkeys(pandas_attributes)})
+    for attribute in pandas_attributes:
+        setattr(model, attribute, _decode_pandas(data[attribute]))
+    return model
+
+
+def encode(payload: dict, watermark: dict, params: dict, regressors: list,
+           is_trained: bool, fit_info: dict = None) -> bytes:
+    """
+    Construit le contenu d'un artefact.
+
+    Args:
+        payload: Charge utile (prophet, indicator_state)
+        watermark: Données d'entraînement (first, last, rows)
+        params: Paramètres Prophet
+        regressors: Régresseurs du modèle
+        is_trained: Modèle entraîné
+        fit_info: Informations du dernier entraînement
+
+    Returns:
+        bytes: Manifeste puis charge utile, une ligne JSON chacun
+    """
+    body = json.dumps(payload, separators=(',', ':')).encode()
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'version': ARTIFACT_VERSION,
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'prophet_version': prophet.__version__,
+        'data_watermark': watermark,
+        'is_trained': is_trained,
+        'params': params,
+        'regressors': regressors,
+        'fit_info': fit_info,
+        'payload_bytes': len(body),
+        'payload_sha256': hashlib.sha256(body).hexdigest()
+    }
+    return json.dumps(manifest, separators=(',', ':')).encode() + b'\n' + body + b'\n'
+
+
+def _check_manifest(manifest: dict) -> dict:
+    if manifest.get('format') != ARTIFACT_FORMAT:
+        raise ArtifactError(f"Format d'artefact inconnu : {manifest.get('format')}")
+    if manifest.get('version') != ARTIFACT_VERSION:
+        raise ArtifactError(f"Version d'artefact non gérée : {manifest.get('version')}")
+    return manifest
+
+
+def decode(data: bytes) -> Tuple[dict, dict]:
+    """
+    Lit un artefact après vérification de son manifeste et de son empreinte.
+
+    Args:
+        data: Contenu du fichier
+
+    Returns:
+        Tuple[dict, dict]: Manifeste et charge utile
+
+    Raises:
+        ArtifactError: Si le format, la version ou l'empreinte ne correspondent pas
+    """
+    header, _, body = data.partition(b'\n')
+    try:
+        manifest = _check_manifest(json.loads(header))
+    except json.JSONDecodeError as e:
+        raise ArtifactError(f"Manifeste illisible : {str(e)}")
+    body = body.rstrip(b'\n')
+    if len(body) != manifest['payload_bytes'] or hashlib.sha256(body).hexdigest() != manifest['payload_sha256']:
+        raise ArtifactError("Empreinte de la charge utile invalide (artefact tronqué ou modifié)")
+    return manifest, json.loads(body)
+
+
+def read_manifest(path: str) -> dict:
+    """
+    Lit le manifeste d'un artefact sans décoder la charge utile.
+
+    Args:
+        path: Fichier de l'artefact
+
+    Returns:
+        dict: Manifeste
+    """
+    with open(path, 'rb') as f:
+        header = f.readline()
+    try:
+        return _check_manifest(json.loads(header))
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ArtifactError(f"Manifeste illisible ({path}) : {str(e)}")
+
+
+def main(argv=None):
+    """Point d'entrée en ligne de commande."""
+    from src.models.prophet_model import BitcoinProphetModel
+
+    parser = argparse.ArgumentParser(description="Artefact compact du modèle Prophet")
+    commands = parser.add_subparsers(dest="command", required=True)
+    inspect = commands.add_parser("inspect", help="Affiche le manifeste d'un artefact")
+    inspect.add_argument("path")
+    convert = commands.add_parser("convert", help="Convertit un modèle (ancien pickle de confiance compris) en artefact")
+    convert.add_argument("source")
+    convert.add_argument("target")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "inspect":
+            print(json.dumps(read_manifest(args.path), indent=2, ensure_ascii=False))
+            return 0
+        with open(args.source, 'rb') as f:
+            data = f.read()
+        if is_artifact(data):
+            model = BitcoinProphetModel.from_bytes(data)
+        else:
+            model = BitcoinProphetModel.from_pickle(data)
+        model.save(args.target)
+    except (OSError, ArtifactError, pickle.UnpicklingError) as e:
+        print(f"❌ {str(e)}")
+        return 1
+    print(f"✅ {args.source} ({os.path.getsize(args.source) / 1e3:.0f} Ko) converti en "
+          f"{args.target} ({os.path.getsize(args.target) / 1e3:.0f} Ko)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
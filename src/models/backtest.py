@@ -0,0 +1,237 @@
+"""
+Backtest walk-forward du modèle Prophet.
+
+L'historique local, lu avec les features précalculées de bitcoin_features
+lorsque la table est à jour, est découpé en origines glissantes : pour
+chaque pli, le modèle est entraîné sur les bougies antérieures à l'origine
+(fenêtre croissante ou de `train_days` jours) puis prédit `horizon` jours,
+comparés aux bougies réelles aux mêmes dates. Les features n'utilisant que
+les bougies passées, les lire précalculées n'introduit pas de fuite. Les plis sont entraînés en parallèle
+dans un pool de processus ; le rapport (métriques par pli et moyennes) est
+écrit dans MODEL_PATHS['BACKTEST'] et servi par /model/info.
+
+Usage :
+    python -m src.models.backtest [--folds 5] [--horizon 7] [--step 7] [--train-days 90] [--workers 4]
+"""
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data.config import DEFAULT_SYMBOL, DEFAULT_INTERVAL
+from src.data.feature_store import read_training_data
+from src.data.storage import connect_writer
+from src.models.config import BACKTEST_CONFIG, MODEL_PATHS
+from src.models.prophet_model import BitcoinProphetModel
+from src.models.utils import evaluate_predictions
+
+logger = logging.getLogger(__name__)
+
+
+def make_folds(df: pd.DataFrame, folds: int, horizon: int, step: int,
+               train_days: Optional[int] = None) -> List[dict]:
+    """
+    Découpe l'historique en plis walk-forward.
+
+    La dernière origine laisse `horizon` jours de bougies à prédire ; les
+    précédentes reculent de `step` jours.
+
+    Args:
+        df: Bougies (timestamp, close_price, volume), par ordre chronologique
+        folds: Nombre de plis
+        horizon: Jours prédits par pli
+        step: Jours entre deux origines
+        train_days: Jours d'entraînement par pli (None : tout l'historique antérieur)
+
+    Returns:
+        List[dict]: Plis (fold, origin, train, test), du plus ancien au plus récent
+    """
+    timestamps = pd.to_datetime(df['timestamp'])
+    last_origin = timestamps.iloc[-1] - pd.Timedelta(days=horizon)
+    result = []
+    for k in range(folds):
+        origin = last_origin - pd.Timedelta(days=step * (folds - 1 - k))
+        train_mask = timestamps <= origin
+        if train_days is not None:
+            train_mask &= timestamps > origin - pd.Timedelta(days=train_days)
+        test_mask = (timestamps > origin) & (timestamps <= origin + pd.Timedelta(days=horizon))
+        if train_mask.sum() < 2 or not test_mask.any():
+            logger.warning(f"Pli {k} ignoré : historique insuffisant avant {origin}")
+            continue
+        result.append({
+            'fold': k,
+            'origin': origin,
+            'train': df[train_mask.to_numpy()],
+            'test': df[test_mask.to_numpy()]
+        })
+    return result
+
+
+def _clean(value):
+    value = float(value)
+    return None if math.isnan(value) or math.isinf(value) else value
+
+
+def run_fold(fold: dict, horizon: int, params: dict = None, regressors: list = None) -> dict:
+    """
+    Entraîne et évalue un pli (exécuté dans un processus du pool).
+
+    Args:
+        fold: Pli produit par make_folds
+        horizon: Jours prédits
+        params: Paramètres Prophet (défaut : ceux de BitcoinProphetModel)
+        regressors: Régresseurs utilisés (défaut : ceux de BitcoinProphetModel)
+
+    Returns:
+        dict: Origine, tailles, métriques et durée du pli
+    """
+    started = time.perf_counter()
+    model = BitcoinProphetModel(params, regressors)
+    model.train(fold['train'], save=False)
+    forecast = model.predict(fold['train'], horizon)
+
+    actual = fold['test'].assign(ds=pd.to_datetime(fold['test']['timestamp']))
+    matched = forecast[['ds', 'yhat']].merge(actual[['ds', 'close_price']], on='ds')
+    metrics = None
+    if len(matched):
+        metrics = {
+            name: _clean(value)
+            for name, value in evaluate_predictions(
+                matched['close_price'].to_numpy(), np.expm1(matched['yhat'].to_numpy())
+            ).items()
+        }
+    return {
+        'fold': fold['fold'],
+        'origin': fold['origin'].strftime('%Y-%m-%d %H:%M:%S'),
+        'train_start': pd.Timestamp(fold['train']['timestamp'].iloc[0]).strftime('%Y-%m-%d %H:%M:%S'),
+        'train_rows': len(fold['train']),
+        'test_rows': len(matched),
+        'metrics': metrics,
+        'seconds': round(time.perf_counter() - started, 3)
+    }
+
+
+def run_backtest(df: pd.DataFrame, folds: int = BACKTEST_CONFIG['FOLDS'],
+                 horizon: int = BACKTEST_CONFIG['HORIZON'], step: int = BACKTEST_CONFIG['STEP'],
+                 train_days: Optional[int] = BACKTEST_CONFIG['TRAIN_DAYS'],
+                 workers: Optional[int] = BACKTEST_CONFIG['WORKERS']) -> dict:
+    """
+    Exécute le backtest walk-forward.
+
+    Args:
+        df: Bougies (timestamp, close_price, volume), par ordre chronologique
+        folds: Nombre de plis
+        horizon: Jours prédits par pli
+        step: Jours entre deux origines
+        train_days: Jours d'entraînement par pli (None : fenêtre croissante)
+        workers: Processus parallèles (None : un par cœur, 1 : sans pool)
+
+    Returns:
+        dict: Rapport (paramètres, plis, métriques moyennes, durée totale)
+    """
+    started = time.perf_counter()
+    plan = make_folds(df, folds, horizon, step, train_days)
+    workers = min(workers or os.cpu_count() or 1, max(len(plan), 1))
+    logger.info(f"Backtest : {len(plan)} plis, horizon {horizon} jours, {workers} processus")
+
+    if workers == 1:
+        results = [run_fold(fold, horizon) for fold in plan]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(run_fold, plan, [horizon] * len(plan)))
+
+    for result in results:
+        logger.info(f"Pli {result['fold']} ({result['origin']}) : {result['seconds']:.1f} s, "
+                    f"métriques {result['metrics']}")
+
+    scored = [r['metrics'] for r in results if r['metrics']]
+    metrics = {}
+    for name in (scored[0] if scored else {}):
+        values = [m[name] for m in scored if m[name] is not None]
+        metrics[name] = _clean(np.mean(values)) if values else None
+
+    return {
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'data_end': pd.Timestamp(df['timestamp'].iloc[-1]).strftime('%Y-%m-%d %H:%M:%S') if len(df) else None,
+        'horizon': horizon,
+        'step': step,
+        'train_days': train_days,
+        'workers': workers,
+        'folds': results,
+        'metrics': metrics,
+        'wall_seconds': round(time.perf_counter() - started, 3)
+    }
+
+
+def save_report(report: dict, path: str = None):
+    """Écrit le rapport de backtest (écriture atomique)."""
+    path = path or MODEL_PATHS['BACKTEST']
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_report(path: str = None) -> Optional[Dict]:
+    """
+    Lit le dernier rapport de backtest.
+
+    Returns:
+        dict: Rapport, ou None si aucun backtest n'a été exécuté
+    """
+    path = path or MODEL_PATHS['BACKTEST']
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.error(f"❌ Rapport de backtest illisible ({path}): {str(e)}")
+        return None
+
+
+def main(argv=None):
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Backtest walk-forward du modèle Prophet")
+    parser.add_argument("--folds", type=int, default=BACKTEST_CONFIG['FOLDS'])
+    parser.add_argument("--horizon", type=int, default=BACKTEST_CONFIG['HORIZON'])
+    parser.add_argument("--step", type=int, default=BACKTEST_CONFIG['STEP'])
+    parser.add_argument("--train-days", type=int, default=BACKTEST_CONFIG['TRAIN_DAYS'])
+    parser.add_argument("--workers", type=int, default=BACKTEST_CONFIG['WORKERS'])
+    parser.add_argument("--symbol", default=DEFAULT_SYMBOL)
+    parser.add_argument("--interval", default=DEFAULT_INTERVAL)
+    parser.add_argument("--output", default=MODEL_PATHS['BACKTEST'])
+    args = parser.parse_args(argv)
+
+    conn = connect_writer()  # Migre au besoin une base au schéma historique
+    try:
+        df = read_training_data(conn, args.symbol, args.interval)
+    finally:
+        conn.close()
+    if df.empty:
+        print(f"❌ Aucune bougie pour {args.symbol} {args.interval}")
+        return 1
+
+    report = run_backtest(df, args.folds, args.horizon, args.step, args.train_days, args.workers)
+    save_report(report, args.output)
+    for result in report['folds']:
+        print(f"Pli {result['fold']} ({result['origin']}, {result['train_rows']} bougies) : "
+              f"{result['seconds']:.1f} s, {result['metrics']}")
+    print(f"✅ {len(report['folds'])} plis en {report['wall_seconds']:.1f} s : {report['metrics']}")
+    print(f"Rapport écrit dans {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,18 +12,19 @@ DATA_CONFIG = {
     'TARGET_COLUMN': 'close',  # Colonne cible pour la prédiction
 }
 
-# Configuration de Prophet
+# Configuration de Prophet (paramètres par défaut de BitcoinProphetModel ; remplacés
+# par MODEL_PATHS['PARAMS'] après une recherche d'hyperparamètres)
 PROPHET_CONFIG = {
-    'changepoint_prior_scale': 0.05,     # Augmenté pour plus de flexibilité
-    'seasonality_prior_scale': 10.0,     # Augmenté pour donner plus d'importance aux saisonnalités
-    'holidays_prior_scale': 10.0,        # Augmenté pour les effets des jours fériés
-    'seasonality_mode': 'multiplicative', # Meilleur pour les données financières
+    'changepoint_prior_scale': 0.1,      # Flexibilité de la tendance
+    'seasonality_prior_scale': 20.0,     # Importance des saisonnalités
+    'holidays_prior_scale': 10.0,        # Effets des jours fériés
+    'seasonality_mode': 'additive',
     'daily_seasonality': True,           # Activé explicitement
     'weekly_seasonality': True,          # Déjà activé par défaut
     'yearly_seasonality': True,          # Activé explicitement
     'interval_width': 0.95,
-    'changepoint_range': 0.9,            # Augmenté pour capturer plus de changements
-    'n_changepoints': 25,                # Augmenté pour plus de flexibilité
+    'changepoint_range': 0.95,           # Changements de tendance jusqu'à 95% de l'historique
+    'n_changepoints': 35,
     'growth': 'linear'
 }
 
@@ -33,6 +34,16 @@ TECHNICAL_INDICATORS = {
     'MACD': {'fast_period': 12, 'slow_period': 26, 'signal_period': 9},
     'BB': {'period': 20, 'std_dev': 2},
     'EMA': {'periods': [9, 21, 50, 200]},
+    'VOLATILITY': {'period': 30},  # Écart-type glissant des rendements
+    'VOLUME_SMA': {'period': 20},  # Volume moyen
+    'RETURNS': {'periods': [1, 7, 14, 30]},  # Retours sur plusieurs périodes
+}
+
+# Indicateurs du modèle Prophet (régresseurs calculés par prepare_data)
+PROPHET_FEATURES = {
+    'EMA_SPANS': [5, 8, 13, 21],  # EMAs du prix de clôture
+    'TREND_LAGS': [1, 3, 5],  # Variations relatives sur 1, 3 et 5 bougies
+    'EMA_TOLERANCE': 1e-9,  # Poids résiduel maximal de l'historique ignoré par une fenêtre bornée
 }
 
 # Métriques d'évaluation
@@ -45,11 +56,62 @@ METRICS = [
 
 # Chemins des fichiers
 MODEL_PATHS = {
-    'PROPHET': 'models/prophet_model.pkl',
+    'PROPHET': 'models/prophet_model.jsonl',  # Artefact compact (src.models.artifact)
     'LSTM': 'models/lstm_model.h5',
     'SCALER': 'models/scaler.pkl',
+    'BACKTEST': 'models/prophet_backtest.json',  # Rapport du dernier backtest
+    'PARAMS': 'models/prophet_params.json',  # Paramètres retenus par la recherche d'hyperparamètres
+    'PARAMS_HISTORY': 'models/prophet_params',  # Versions successives des paramètres retenus
+    'TUNING_CACHE': 'models/tuning_cache',  # Scores des candidats, par empreinte des paramètres
+}
+
+# Backtest walk-forward (python -m src.models.backtest)
+BACKTEST_CONFIG = {
+    'FOLDS': 5,  # Nombre d'origines
+    'HORIZON': 7,  # Jours prédits par pli
+    'STEP': 7,  # Jours entre deux origines
+    'TRAIN_DAYS': None,  # Fenêtre d'entraînement en jours (None : tout l'historique antérieur)
+    'WORKERS': None,  # Processus parallèles (None : un par cœur)
+}
+
+# Recherche d'hyperparamètres (python -m src.models.tuning)
+TUNING_CONFIG = {
+    'SEARCH_SPACE': {
+        'changepoint_prior_scale': [0.01, 0.05, 0.1, 0.5],
+        'seasonality_prior_scale': [1.0, 10.0, 20.0],
+        'changepoint_range': [0.8, 0.95],
+    },
+    # Groupes de régresseurs testés (préfixes des colonnes de REGRESSOR_COLUMNS)
+    'REGRESSOR_SETS': {
+        'all': ['ema', 'momentum', 'volume', 'trend'],
+        'prix': ['ema', 'momentum', 'trend'],
+        'ema': ['ema'],
+    },
+    'SEARCH': 'grid',  # grid ou random
+    'N_ITER': 20,  # Candidats tirés en recherche aléatoire
+    'METRIC': 'RMSE',  # Métrique minimisée (moyenne sur les plis)
+    'EARLY_STOP_FACTOR': 1.5,  # Abandon d'un candidat dont un pli dépasse ce multiple du meilleur score
+    'SEED': 42,
 }
 
+# Réentraînement planifié (python -m src.models.retrain)
+RETRAIN_CONFIG = {
+    'MIN_NEW_ROWS': 24,  # Bougies nouvelles nécessaires avant un réentraînement
+    'WINDOW_DAYS': 365,  # Fenêtre d'entraînement glissante (None : tout l'historique)
+    'MAX_ITER': 2000,  # Itérations maximales de l'optimiseur Stan (budget CPU)
+    'WARM_START': True,  # Démarre l'optimisation depuis l'entraînement précédent
+}
+
+# Prévisions (BitcoinProphetModel.predict)
+FORECAST_CONFIG = {
+    'MAX_HORIZON_DAYS': 30,  # Horizon maximal : matrices de Fourier précalculées jusqu'à cet horizon
+    'MAX_CACHED_ROWS': 10000,  # Au-delà, les saisonnalités sont calculées par Prophet sans cache
+    'CACHE_SIZE': 32,  # Matrices de Fourier conservées (période, ordre, pas)
+}
+
+# Rechargement à chaud du modèle servi par l'API
+MODEL_RELOAD_INTERVAL = 10  # Secondes entre deux vérifications du fichier
+
 # Configuration des logs
 LOGGING_CONFIG = {
     'level': 'INFO',
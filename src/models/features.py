@@ -1,10 +1,111 @@
 """
 Module de calcul des indicateurs techniques pour le Bitcoin.
 """
+import math
 import pandas as pd
 import numpy as np
-import ta
-from src.models.config import TECHNICAL_INDICATORS
+from src.models.config import TECHNICAL_INDICATORS, PROPHET_FEATURES
+from src.models.indicator_state import REGRESSOR_COLUMNS
+from src.models.indicators import compute_indicators, ema
+
+# Indicateurs techniques bruts (valeurs `ta`, NaN pendant la période de chauffe)
+TECHNICAL_COLUMNS = (
+    (['rsi'] if 'RSI' in TECHNICAL_INDICATORS else [])
+    + (['macd', 'macd_signal', 'macd_diff'] if 'MACD' in TECHNICAL_INDICATORS else [])
+    + (['bb_high', 'bb_mid', 'bb_low'] if 'BB' in TECHNICAL_INDICATORS else [])
+    + [f'ta_ema_{p}' for p in TECHNICAL_INDICATORS.get('EMA', {}).get('periods', [])]
+)
+
+# Colonnes de la table bitcoin_features
+FEATURE_COLUMNS = ['y'] + REGRESSOR_COLUMNS + TECHNICAL_COLUMNS
+
+
+def feature_warmup(tolerance: float = PROPHET_FEATURES['EMA_TOLERANCE']) -> int:
+    """
+    Nombre de bougies précédentes nécessaires pour recalculer une bougie.
+    
+    Toutes les moyennes exponentielles (EMAs, MACD, RSI de Wilder) oublient
+    l'historique au rythme (1 - alpha)^n : au-delà de ce nombre de bougies,
+    le poids de l'historique ignoré est inférieur à `tolerance`. On y ajoute
+    la plus longue fenêtre glissante (min_periods, Bollinger).
+    
+    Args:
+        tolerance: Poids résiduel maximal de l'historique ignoré
+    
+    Returns:
+        int: Nombre de bougies de chauffe
+    """
+    alphas = [2 / (span + 1) for span in PROPHET_FEATURES['EMA_SPANS']]
+    windows = list(PROPHET_FEATURES['TREND_LAGS'])
+    if 'RSI' in TECHNICAL_INDICATORS:
+        alphas.append(1 / TECHNICAL_INDICATORS['RSI']['period'])
+        windows.append(TECHNICAL_INDICATORS['RSI']['period'])
+    if 'MACD' in TECHNICAL_INDICATORS:
+        macd = TECHNICAL_INDICATORS['MACD']
+        alphas += [2 / (macd[k] + 1) for k in ('fast_period', 'slow_period', 'signal_period')]
+        windows.append(macd['slow_period'] + macd['signal_period'])
+    if 'BB' in TECHNICAL_INDICATORS:
+        windows.append(TECHNICAL_INDICATORS['BB']['period'])
+    for period in TECHNICAL_INDICATORS.get('EMA', {}).get('periods', []):
+        alphas.append(2 / (period + 1))
+        windows.append(period)
+    return max(math.ceil(math.log(tolerance) / math.log(1 - a)) for a in alphas) + max(windows)
+
+
+def compute_prophet_regressors(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calcule la cible et les régresseurs du modèle Prophet (sans remplissage des NaN).
+    
+    Args:
+        df: DataFrame trié avec close_price et volume
+    
+    Returns:
+        DataFrame avec y et les colonnes de REGRESSOR_COLUMNS, même index que df
+    """
+    close = df['close_price']
+    out = pd.DataFrame(index=df.index)
+    out['y'] = np.log1p(close)
+    for span in PROPHET_FEATURES['EMA_SPANS']:
+        out[f'ema_{span}'] = np.log1p(ema(close.to_numpy(), span))
+    out['momentum'] = close.pct_change()
+    out['volume_norm'] = np.log1p(df['volume'])
+    for lag in PROPHET_FEATURES['TREND_LAGS']:
+        out[f'trend_{lag}d'] = close.diff(lag) / close.shift(1)
+    return out[['y'] + REGRESSOR_COLUMNS]
+
+
+def compute_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calcule les indicateurs de TECHNICAL_COLUMNS (sans remplissage des NaN).
+    
+    Args:
+        df: DataFrame trié avec close_price
+    
+    Returns:
+        DataFrame avec les colonnes de TECHNICAL_COLUMNS, même index que df
+    """
+    config = {k: v for k, v in TECHNICAL_INDICATORS.items() if k in ('RSI', 'MACD', 'BB', 'EMA')}
+    indicators = compute_indicators(df['close_price'].to_numpy(), config=config)
+    return pd.DataFrame(indicators, index=df.index)[TECHNICAL_COLUMNS]
+
+
+def compute_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calcule toutes les colonnes de la table bitcoin_features.
+    
+    Args:
+        df: DataFrame avec timestamp, close_price et volume
+    
+    Returns:
+        DataFrame trié avec timestamp et les colonnes de FEATURE_COLUMNS
+    """
+    df = df.assign(timestamp=pd.to_datetime(df['timestamp'])).sort_values('timestamp', kind='stable')
+    df = df.reset_index(drop=True)
+    return pd.concat(
+        [df[['timestamp']], compute_prophet_regressors(df), compute_technical_indicators(df)],
+        axis=1
+    )
+
 
 def calculate_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -19,53 +120,10 @@ def calculate_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
     # Copie pour ne pas modifier l'original
     df = df.copy()
     
-    # RSI
-    if 'RSI' in TECHNICAL_INDICATORS:
-        df['rsi'] = ta.momentum.RSIIndicator(
-            close=df['close_price'],
-            window=TECHNICAL_INDICATORS['RSI']['period']
-        ).rsi()
-    
-    # MACD
-    if 'MACD' in TECHNICAL_INDICATORS:
-        macd = ta.trend.MACD(
-            close=df['close_price'],
-            window_fast=TECHNICAL_INDICATORS['MACD']['fast_period'],
-            window_slow=TECHNICAL_INDICATORS['MACD']['slow_period'],
-            window_sign=TECHNICAL_INDICATORS['MACD']['signal_period']
-        )
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        df['macd_diff'] = macd.macd_diff()
-    
-    # Bollinger Bands
-    if 'BB' in TECHNICAL_INDICATORS:
-        bollinger = ta.volatility.BollingerBands(
-            close=df['close_price'],
-            window=TECHNICAL_INDICATORS['BB']['period'],
-            window_dev=TECHNICAL_INDICATORS['BB']['std_dev']
-        )
-        df['bb_high'] = bollinger.bollinger_hband()
-        df['bb_mid'] = bollinger.bollinger_mavg()
-        df['bb_low'] = bollinger.bollinger_lband()
-    
-    # EMA
-    if 'EMA' in TECHNICAL_INDICATORS:
-        for period in TECHNICAL_INDICATORS['EMA']['periods']:
-            df[f'ema_{period}'] = ta.trend.EMAIndicator(
-                close=df['close_price'],
-                window=period
-            ).ema_indicator()
-    
-    # Volatilité
-    df['volatility'] = df['close_price'].pct_change().rolling(window=30).std()
-    
-    # Volume moyen
-    df['volume_sma'] = df['volume'].rolling(window=20).mean()
-    
-    # Retours sur différentes périodes
-    for period in [1, 7, 14, 30]:
-        df[f'return_{period}d'] = df['close_price'].pct_change(periods=period)
+    # RSI, MACD, Bollinger Bands, EMAs, volatilité, volume moyen et retours
+    indicators = compute_indicators(df['close_price'].to_numpy(), df['volume'].to_numpy())
+    for name, values in indicators.items():
+        df[name.replace('ta_ema_', 'ema_')] = values
     
     # Gestion des valeurs NaN
     # Pour les indicateurs techniques, on remplace par la moyenne
@@ -78,7 +136,7 @@ def calculate_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
             df[col] = df[col].fillna(df[col].mean())
     
     # Pour les retours, on remplace par 0
-    return_columns = [f'return_{p}d' for p in [1, 7, 14, 30]]
+    return_columns = [f'return_{p}d' for p in TECHNICAL_INDICATORS['RETURNS']['periods']]
     for col in return_columns:
         if col in df.columns:
             df[col] = df[col].fillna(0)
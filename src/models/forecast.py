@@ -0,0 +1,149 @@
+"""
+Construction vectorisée des prévisions Prophet.
+
+Une prévision avance au pas natif des données depuis la dernière bougie :
+les dates futures forment une grille régulière, construite en un seul
+tableau avec des régresseurs constants. Sur une telle grille, les termes de
+Fourier des saisonnalités s'obtiennent par rotation de matrices de
+décalage (angles j·pas pour j jusqu'à l'horizon maximal), calculées une
+fois par (période, ordre, pas) puis tournées de la phase de l'origine :
+sin(a + b) = sin a·cos b + cos a·sin b. La matrice des composantes, qui ne
+dépend pas des dates et que Prophet reconstruit deux fois par appel à
+predict, est mise en cache par modèle.
+"""
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from prophet import Prophet
+
+from src.models.config import FORECAST_CONFIG
+
+NS_PER_DAY = 86400 * 10**9
+
+_offsets = OrderedDict()
+_offsets_lock = threading.Lock()
+
+
+def horizon_steps(horizon: float, interval_seconds: int) -> int:
+    """
+    Nombre de pas de `interval_seconds` couvrant `horizon` jours (au moins un).
+
+    Args:
+        horizon: Horizon en jours
+        interval_seconds: Pas des données en secondes
+
+    Returns:
+        int: Nombre de dates futures
+    """
+    return max(1, math.ceil(horizon * 86400 / interval_seconds))
+
+
+def _offset_matrices(period: float, order: int, step_ns: int, rows: int):
+    """sin et cos des angles 2π·k·j·pas/période, pour j < capacité et k ≤ ordre (en cache)."""
+    key = (period, order, step_ns)
+    with _offsets_lock:
+        cached = _offsets.get(key)
+        if cached is not None and len(cached[0]) >= rows:
+            _offsets.move_to_end(key)
+            return cached
+    capacity = max(rows, horizon_steps(FORECAST_CONFIG['MAX_HORIZON_DAYS'], step_ns / 10**9) + 1)
+    capacity = min(capacity, max(rows, FORECAST_CONFIG['MAX_CACHED_ROWS']))
+    angles = np.outer(
+        np.arange(capacity) * (step_ns / NS_PER_DAY),
+        2 * np.pi * np.arange(1, order + 1) / period
+    )
+    cached = (np.sin(angles), np.cos(angles))
+    with _offsets_lock:
+        _offsets[key] = cached
+        _offsets.move_to_end(key)
+        while len(_offsets) > FORECAST_CONFIG['CACHE_SIZE']:
+            _offsets.popitem(last=False)
+    return cached
+
+
+def fourier_grid(dates: pd.Series, period: float, order: int) -> Optional[np.ndarray]:
+    """
+    Termes de Fourier d'une grille régulière de dates, identiques à Prophet.fourier_series.
+
+    Args:
+        dates: Dates (sans fuseau horaire)
+        period: Période en jours
+        order: Ordre de la série
+
+    Returns:
+        np.ndarray: Matrice (n, 2·ordre) sin/cos alternés, ou None si les dates ne
+            forment pas une grille régulière d'au plus MAX_CACHED_ROWS lignes
+    """
+    if order < 1 or not 2 <= len(dates) <= FORECAST_CONFIG['MAX_CACHED_ROWS'] or dates.dt.tz is not None:
+        return None
+    ns = dates.to_numpy(dtype='datetime64[ns]').view(np.int64)
+    step = int(ns[1] - ns[0])
+    if step <= 0 or np.any(np.diff(ns) != step):
+        return None
+    sin_offset, cos_offset = (m[:len(ns)] for m in _offset_matrices(period, order, step, len(ns)))
+    phase = 2 * np.pi * np.arange(1, order + 1) / period * (ns[0] / NS_PER_DAY)
+    sin_origin, cos_origin = np.sin(phase), np.cos(phase)
+    features = np.empty((len(ns), 2 * order))
+    features[:, 0::2] = sin_offset * cos_origin + cos_offset * sin_origin
+    features[:, 1::2] = cos_offset * cos_origin - sin_offset * sin_origin
+    return features
+
+
+class ForecastProphet(Prophet):
+    """Prophet dont les matrices de saisonnalité et de composantes sont mises en cache."""
+
+    def make_seasonality_features(self, dates, period, series_order, prefix):
+        """Termes de Fourier par rotation des matrices en cache (grille régulière), sinon Prophet."""
+        features = fourier_grid(dates, period, series_order)
+        if features is None:
+            return super().make_seasonality_features(dates, period, series_order, prefix)
+        return pd.DataFrame(features, columns=[f'{prefix}_delim_{i + 1}' for i in range(2 * series_order)])
+
+    def regressor_column_matrix(self, seasonal_features, modes):
+        """Matrice des composantes, calculée une fois par jeu de colonnes."""
+        key = (
+            tuple(seasonal_features.columns),
+            tuple(modes['additive']),
+            tuple(modes['multiplicative']),
+            self.train_component_cols is None
+        )
+        cache = self.__dict__.setdefault('_component_cache', {})
+        if key not in cache:
+            cache[key] = super().regressor_column_matrix(
+                seasonal_features, {mode: list(names) for mode, names in modes.items()}
+            )
+        component_cols, cached_modes = cache[key]
+        for mode, names in cached_modes.items():
+            modes[mode] = list(names)
+        return component_cols.copy(), modes
+
+
+def as_forecast_model(model: Optional[Prophet]) -> Optional[Prophet]:
+    """Active les caches de ForecastProphet sur un modèle Prophet (désérialisé ou ancien pickle)."""
+    if model is not None and type(model) is Prophet:
+        model.__class__ = ForecastProphet
+    return model
+
+
+def future_frame(origin, steps: int, interval_seconds: int, regressors: Dict[str, float]) -> pd.DataFrame:
+    """
+    Dates futures au pas natif et régresseurs constants, construits en une fois.
+
+    Args:
+        origin: Dernière bougie connue
+        steps: Nombre de dates futures
+        interval_seconds: Pas des données en secondes
+        regressors: Valeur de chaque régresseur sur tout l'horizon
+
+    Returns:
+        pd.DataFrame: ds et une colonne par régresseur
+    """
+    offsets = np.arange(1, steps + 1, dtype=np.int64) * (int(interval_seconds) * 10**9)
+    columns = {'ds': pd.to_datetime(pd.Timestamp(origin).value + offsets)}
+    for name, value in regressors.items():
+        columns[name] = np.full(steps, value, dtype=np.float64)
+    return pd.DataFrame(columns)
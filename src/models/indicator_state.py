@@ -0,0 +1,209 @@
+"""
+État incrémental des indicateurs du modèle Prophet.
+
+Les régresseurs de prédiction (EMAs, momentum, tendances, volume) ne
+dépendent que des dernières EMAs et des dernières clôtures : cet état est
+avancé d'une bougie en O(1) par le collecteur à l'ingestion, persisté en
+base, puis relu par l'API au lieu de recalculer prepare_data sur tout
+l'historique.
+"""
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from src.models.config import PROPHET_FEATURES
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Régresseurs du modèle, dans l'ordre où ils sont ajoutés à Prophet
+REGRESSOR_COLUMNS = (
+    [f'ema_{span}' for span in PROPHET_FEATURES['EMA_SPANS']]
+    + ['momentum', 'volume_norm']
+    + [f'trend_{lag}d' for lag in PROPHET_FEATURES['TREND_LAGS']]
+)
+
+
+def required_history(tolerance: float = PROPHET_FEATURES['EMA_TOLERANCE']) -> int:
+    """
+    Nombre de bougies nécessaires pour calculer les derniers régresseurs.
+
+    Une EMA (adjust=False) de span s oublie l'historique au rythme
+    (1 - alpha)^n avec alpha = 2 / (s + 1) : au-delà de n bougies, le poids
+    des valeurs plus anciennes est inférieur à `tolerance`. On y ajoute le
+    plus grand décalage des tendances.
+
+    Args:
+        tolerance: Poids résiduel maximal de l'historique ignoré
+
+    Returns:
+        int: Nombre de bougies à lire pour une prédiction
+    """
+    alpha = 2 / (max(PROPHET_FEATURES['EMA_SPANS']) + 1)
+    ema_rows = math.ceil(math.log(tolerance) / math.log(1 - alpha))
+    return ema_rows + max(PROPHET_FEATURES['TREND_LAGS']) + 1
+
+# Fenêtre lue pour reconstruire l'état depuis la base
+PREDICT_HISTORY = required_history()
+
+
+def _format_timestamp(timestamp) -> str:
+    if isinstance(timestamp, str):
+        return timestamp
+    return pd.Timestamp(timestamp).strftime(TIMESTAMP_FORMAT)
+
+
+class IndicatorState:
+    """Dernières EMAs et clôtures d'un marché, avançables bougie par bougie."""
+
+    def __init__(self):
+        """Initialise un état vide (aucune bougie vue)."""
+        self.emas = {span: None for span in PROPHET_FEATURES['EMA_SPANS']}
+        self.closes = deque(maxlen=max(PROPHET_FEATURES['TREND_LAGS']) + 1)
+        self.volume_norm = math.nan
+        self.last_timestamp = None
+        self.count = 0
+        # Instantané avant la dernière bougie, pour pouvoir la réviser
+        self._previous = None
+
+    def _snapshot(self):
+        return (dict(self.emas), list(self.closes), self.volume_norm, self.last_timestamp, self.count)
+
+    def _restore(self, snapshot):
+        emas, closes, self.volume_norm, self.last_timestamp, self.count = snapshot
+        self.emas = dict(emas)
+        self.closes = deque(closes, maxlen=self.closes.maxlen)
+
+    def update(self, timestamp, close_price: float, volume: float = None) -> dict:
+        """
+        Avance l'état d'une bougie en O(1).
+
+        Une bougie de même timestamp que la dernière la remplace (révision
+        par le collecteur temps réel).
+
+        Args:
+            timestamp: Horodatage de la bougie (str ou datetime)
+            close_price: Prix de clôture
+            volume: Volume de la bougie (None : volume précédent conservé)
+
+        Returns:
+            dict: Régresseurs après cette bougie
+
+        Raises:
+            ValueError: Si la bougie est antérieure à la dernière bougie vue,
+                ou révise une bougie dont l'état précédent est inconnu
+        """
+        timestamp = _format_timestamp(timestamp)
+        if self.last_timestamp is not None:
+            if timestamp < self.last_timestamp:
+                raise ValueError(f"Bougie {timestamp} antérieure à l'état ({self.last_timestamp})")
+            if timestamp == self.last_timestamp:
+                if self._previous is None:
+                    raise ValueError(f"Révision de la bougie {timestamp} impossible sans état précédent")
+                self._restore(self._previous)
+
+        self._previous = self._snapshot()
+        for span, ema in self.emas.items():
+            alpha = 2 / (span + 1)
+            self.emas[span] = close_price if ema is None else alpha * close_price + (1 - alpha) * ema
+        self.closes.append(close_price)
+        if volume is not None and not math.isnan(volume):
+            self.volume_norm = math.log1p(volume)
+        self.last_timestamp = timestamp
+        self.count += 1
+        return self.features()
+
+    def features(self) -> dict:
+        """
+        Régresseurs de la dernière bougie, identiques à la dernière ligne de prepare_data.
+
+        Returns:
+            dict: ds, y et colonnes de REGRESSOR_COLUMNS (NaN tant que l'historique est insuffisant)
+        """
+        closes = list(self.closes)
+        close = closes[-1] if closes else math.nan
+        previous = closes[-2] if len(closes) >= 2 else math.nan
+        features = {
+            'ds': pd.Timestamp(self.last_timestamp) if self.last_timestamp else None,
+            'y': math.log1p(close),
+            'momentum': close / previous - 1,
+            'volume_norm': self.volume_norm
+        }
+        for span, ema in self.emas.items():
+            features[f'ema_{span}'] = math.log1p(ema) if ema is not None else math.nan
+        for lag in PROPHET_FEATURES['TREND_LAGS']:
+            lagged = closes[-1 - lag] if len(closes) > lag else math.nan
+            features[f'trend_{lag}d'] = (close - lagged) / previous
+        return features
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'IndicatorState':
+        """
+        Construit l'état à partir d'un historique (calcul vectorisé).
+
+        Args:
+            df: DataFrame avec timestamp, close_price et volume
+
+        Returns:
+            IndicatorState: État après la dernière bougie de `df`
+        """
+        state = cls()
+        if df.empty:
+            return state
+
+        df = df.assign(ds=pd.to_datetime(df['timestamp'])).sort_values('ds', kind='stable')
+        closes = df['close_price'].to_numpy(dtype=np.float64)
+        volumes = np.log1p(df['volume'].to_numpy(dtype=np.float64))
+        timestamps = df['ds']
+        emas = {
+            span: pd.Series(closes).ewm(span=span, adjust=False).mean().to_numpy()[-2:]
+            for span in state.emas
+        }
+
+        def last_valid(values):
+            valid = values[~np.isnan(values)]
+            return float(valid[-1]) if len(valid) else math.nan
+
+        # Instantané avant la dernière bougie, pour permettre sa révision
+        if len(df) >= 2:
+            state._previous = (
+                {span: float(values[0]) for span, values in emas.items()},
+                closes[-state.closes.maxlen - 1:-1].tolist(),
+                last_valid(volumes[:-1]),
+                _format_timestamp(timestamps.iloc[-2]),
+                len(df) - 1
+            )
+        state.emas = {span: float(values[-1]) for span, values in emas.items()}
+        state.closes.extend(closes[-state.closes.maxlen:].tolist())
+        state.volume_norm = last_valid(volumes)
+        state.last_timestamp = _format_timestamp(timestamps.iloc[-1])
+        state.count = len(df)
+        return state
+
+    def to_dict(self) -> dict:
+        """Sérialise l'état (JSON) pour sa persistance en base."""
+        def encode(snapshot):
+            emas, closes, volume_norm, last_timestamp, count = snapshot
+            return {
+                'emas': {str(span): ema for span, ema in emas.items()},
+                'closes': list(closes),
+                'volume_norm': None if math.isnan(volume_norm) else volume_norm,
+                'last_timestamp': last_timestamp,
+                'count': count
+            }
+        state = encode(self._snapshot())
+        state['previous'] = encode(self._previous) if self._previous else None
+        return state
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'IndicatorState':
+        """Reconstruit un état sérialisé par to_dict."""
+        def decode(item):
+            volume_norm = item['volume_norm'] if item['volume_norm'] is not None else math.nan
+            emas = {int(span): ema for span, ema in item['emas'].items()}
+            return (emas, item['closes'], volume_norm, item['last_timestamp'], item['count'])
+        state = cls()
+        state._restore(decode(data))
+        state._previous = decode(data['previous']) if data.get('previous') else None
+        return state
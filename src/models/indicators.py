@@ -0,0 +1,238 @@
+"""
+Moteur vectorisé des indicateurs techniques.
+
+Calcule RSI, MACD, Bandes de Bollinger, EMAs, volatilité glissante et
+retours multi-périodes directement sur des tableaux float64 contigus, sans
+objet `ta` ni Series pandas intermédiaires. Les résultats reproduisent ceux
+de `ta` (mêmes périodes de chauffe en NaN) à la précision numérique près.
+
+Les récurrences exponentielles passent par scipy.signal.lfilter (filtre
+IIR d'ordre 1 en C) et les fenêtres glissantes par des sommes cumulées
+calculées par blocs, en O(n) quelle que soit la taille de la fenêtre.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+from scipy.signal import lfilter
+
+from src.models.config import TECHNICAL_INDICATORS
+
+# Lignes par bloc de sommes cumulées dans les fenêtres glissantes
+ROLLING_CHUNK_ROWS = 65536
+
+
+def _as_array(values) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _output(n: int, out: Optional[np.ndarray]) -> np.ndarray:
+    return np.empty(n, dtype=np.float64) if out is None else out
+
+
+def _first_valid(values: np.ndarray) -> int:
+    nan = np.isnan(values)
+    first = int(np.argmin(nan))
+    return len(values) if nan[first] else first
+
+
+def ema(values, span: int = None, alpha: float = None, min_periods: int = 0,
+        out: np.ndarray = None) -> np.ndarray:
+    """
+    Moyenne exponentielle récursive, équivalente à Series.ewm(adjust=False).mean().
+
+    Les NaN de tête sont ignorés : la récurrence démarre à la première
+    valeur valide (les valeurs suivantes doivent être finies).
+
+    Args:
+        values: Valeurs d'entrée
+        span: Période de l'EMA (alpha = 2 / (span + 1))
+        alpha: Facteur de lissage (prioritaire sur span)
+        min_periods: Nombre de valeurs valides avant la première sortie
+        out: Tableau de sortie préalloué
+
+    Returns:
+        np.ndarray: EMA, NaN avant la période de chauffe
+    """
+    values = _as_array(values)
+    out = _output(len(values), out)
+    alpha = alpha if alpha is not None else 2 / (span + 1)
+    first = _first_valid(values)
+    out[:first] = np.nan
+    if first == len(values):
+        return out
+    out[first:] = lfilter([alpha], [1, alpha - 1], values[first:], zi=[(1 - alpha) * values[first]])[0]
+    out[first:first + max(min_periods - 1, 0)] = np.nan
+    return out
+
+
+def _rolling_moments(values, window: int, ddof: Optional[int], out: np.ndarray = None) -> np.ndarray:
+    """
+    Moyenne (ddof=None) ou écart-type glissant en O(n).
+
+    Les sommes glissantes sont obtenues par différences de sommes cumulées,
+    recalculées par blocs de ROLLING_CHUNK_ROWS autour d'une valeur de
+    référence propre au bloc : les sommes restent petites, ce qui évite la
+    perte de précision d'un cumul sur toute la série.
+    """
+    values = _as_array(values)
+    out = _output(len(values), out)
+    first = _first_valid(values)
+    start = first + window - 1
+    out[:min(start, len(values))] = np.nan
+    for begin in range(start, len(values), ROLLING_CHUNK_ROWS):
+        end = min(begin + ROLLING_CHUNK_ROWS, len(values))
+        segment = values[begin - window + 1:end]
+        anchor = segment[0]
+        centered = segment - anchor
+        sums = np.concatenate(([0.0], np.cumsum(centered)))
+        s1 = sums[window:] - sums[:-window]
+        if ddof is None:
+            np.divide(s1, window, out=out[begin:end])
+            out[begin:end] += anchor
+            continue
+        np.square(centered, out=centered)
+        squares = np.concatenate(([0.0], np.cumsum(centered)))
+        s2 = squares[window:] - squares[:-window]
+        variance = (s2 - s1 * s1 / window) / (window - ddof)
+        np.sqrt(np.maximum(variance, 0.0, out=variance), out=out[begin:end])
+    return out
+
+
+def rolling_mean(values, window: int, out: np.ndarray = None) -> np.ndarray:
+    """
+    Moyenne glissante, équivalente à Series.rolling(window).mean().
+
+    Les NaN de tête sont ignorés (les valeurs suivantes doivent être finies).
+
+    Args:
+        values: Valeurs d'entrée
+        window: Taille de la fenêtre
+        out: Tableau de sortie préalloué
+
+    Returns:
+        np.ndarray: Moyenne glissante, NaN avant la première fenêtre complète
+    """
+    return _rolling_moments(values, window, None, out)
+
+
+def rolling_std(values, window: int, ddof: int = 1, out: np.ndarray = None) -> np.ndarray:
+    """
+    Écart-type glissant, équivalent à Series.rolling(window).std(ddof=ddof).
+
+    Les NaN de tête sont ignorés (les valeurs suivantes doivent être finies).
+
+    Args:
+        values: Valeurs d'entrée
+        window: Taille de la fenêtre
+        ddof: Degrés de liberté retirés au dénominateur
+        out: Tableau de sortie préalloué
+
+    Returns:
+        np.ndarray: Écart-type glissant, NaN avant la première fenêtre complète
+    """
+    return _rolling_moments(values, window, ddof, out)
+
+
+def pct_change(values, periods: int = 1, out: np.ndarray = None) -> np.ndarray:
+    """
+    Variation relative sur `periods` valeurs, équivalente à Series.pct_change(periods).
+
+    Args:
+        values: Valeurs d'entrée
+        periods: Décalage
+        out: Tableau de sortie préalloué
+
+    Returns:
+        np.ndarray: Variations relatives, NaN sur les `periods` premières valeurs
+    """
+    values = _as_array(values)
+    out = _output(len(values), out)
+    out[:periods] = np.nan
+    np.divide(values[periods:], values[:-periods], out=out[periods:])
+    out[periods:] -= 1
+    return out
+
+
+def rsi(close, window: int, out: np.ndarray = None) -> np.ndarray:
+    """
+    RSI de Wilder, équivalent à ta.momentum.RSIIndicator(close, window).rsi().
+
+    Args:
+        close: Prix de clôture
+        window: Période du RSI
+        out: Tableau de sortie préalloué
+
+    Returns:
+        np.ndarray: RSI entre 0 et 100, NaN pendant la chauffe
+    """
+    close = _as_array(close)
+    out = _output(len(close), out)
+    if not len(close):
+        return out
+    diff = np.empty_like(close)
+    diff[0] = 0.0
+    np.subtract(close[1:], close[:-1], out=diff[1:])
+    up = ema(np.maximum(diff, 0.0), alpha=1 / window, min_periods=window)
+    down = ema(np.maximum(-diff, 0.0), alpha=1 / window, min_periods=window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(100.0, 1 + up / down, out=out)
+    np.subtract(100.0, out, out=out)
+    out[down == 0] = 100.0
+    return out
+
+
+def compute_indicators(close, volume=None, config: dict = TECHNICAL_INDICATORS) -> Dict[str, np.ndarray]:
+    """
+    Calcule tous les indicateurs de `config` en une passe.
+
+    Les sorties sont les lignes d'un unique bloc préalloué (une ligne
+    contiguë par indicateur).
+
+    Args:
+        close: Prix de clôture, par ordre chronologique
+        volume: Volumes (None : pas de volume_sma)
+        config: Configuration des indicateurs (TECHNICAL_INDICATORS)
+
+    Returns:
+        Dict[str, np.ndarray]: rsi, macd, macd_signal, macd_diff, bb_high,
+            bb_mid, bb_low, ta_ema_{p}, volatility, volume_sma et return_{p}d
+            selon les indicateurs configurés
+    """
+    close = _as_array(close)
+    names = (
+        (['rsi'] if 'RSI' in config else [])
+        + (['macd', 'macd_signal', 'macd_diff'] if 'MACD' in config else [])
+        + (['bb_high', 'bb_mid', 'bb_low'] if 'BB' in config else [])
+        + [f'ta_ema_{p}' for p in config.get('EMA', {}).get('periods', [])]
+        + (['volatility'] if 'VOLATILITY' in config else [])
+        + (['volume_sma'] if 'VOLUME_SMA' in config and volume is not None else [])
+        + [f'return_{p}d' for p in config.get('RETURNS', {}).get('periods', [])]
+    )
+    block = np.empty((len(names), len(close)), dtype=np.float64)
+    out = dict(zip(names, block))
+
+    if 'RSI' in config:
+        rsi(close, config['RSI']['period'], out=out['rsi'])
+    if 'MACD' in config:
+        fast, slow = config['MACD']['fast_period'], config['MACD']['slow_period']
+        ema(close, fast, min_periods=fast, out=out['macd'])
+        np.subtract(out['macd'], ema(close, slow, min_periods=slow), out=out['macd'])
+        signal = config['MACD']['signal_period']
+        ema(out['macd'], signal, min_periods=signal, out=out['macd_signal'])
+        np.subtract(out['macd'], out['macd_signal'], out=out['macd_diff'])
+    if 'BB' in config:
+        window, dev = config['BB']['period'], config['BB']['std_dev']
+        rolling_mean(close, window, out=out['bb_mid'])
+        rolling_std(close, window, ddof=0, out=out['bb_high'])
+        np.multiply(out['bb_high'], dev, out=out['bb_low'])
+        np.subtract(out['bb_mid'], out['bb_low'], out=out['bb_low'])
+        np.add(out['bb_mid'], dev * out['bb_high'], out=out['bb_high'])
+    for period in config.get('EMA', {}).get('periods', []):
+        ema(close, period, min_periods=period, out=out[f'ta_ema_{period}'])
+    if 'VOLATILITY' in config:
+        rolling_std(pct_change(close), config['VOLATILITY']['period'], out=out['volatility'])
+    if 'volume_sma' in out:
+        rolling_mean(volume, config['VOLUME_SMA']['period'], out=out['volume_sma'])
+    for period in config.get('RETURNS', {}).get('periods', []):
+        pct_change(close, period, out=out[f'return_{period}d'])
+    return out
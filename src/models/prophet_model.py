@@ -1,62 +1,122 @@
 """
 Module d'implémentation du modèle Prophet pour la prédiction du Bitcoin.
 """
+import json
 import logging
 import os
 import pickle
+import time
 from datetime import datetime
 import pandas as pd
 import numpy as np
 from prophet import Prophet
+from src.models import artifact
+from src.models.forecast import ForecastProphet, as_forecast_model, future_frame, horizon_steps
 from src.models.config import (
     PROPHET_CONFIG,
+    RETRAIN_CONFIG,
     MODEL_PATHS,
     LOGGING_CONFIG,
     TECHNICAL_INDICATORS
 )
-from src.models.features import calculate_technical_indicators, prepare_prophet_data
-import ta
+from src.models.features import calculate_technical_indicators, compute_prophet_regressors, prepare_prophet_data
+from src.models.indicator_state import IndicatorState, REGRESSOR_COLUMNS
+from src.data.config import DEFAULT_INTERVAL, INTERVAL_SECONDS
 
 # Configuration du logging
 os.makedirs(os.path.dirname(LOGGING_CONFIG['filename']), exist_ok=True)
 logging.basicConfig(**LOGGING_CONFIG)
 logger = logging.getLogger(__name__)
 
+def load_tuned_params(path: str = None) -> dict:
+    """
+    Lit les paramètres retenus par la recherche d'hyperparamètres.
+    
+    Args:
+        path: Fichier des paramètres (défaut : MODEL_PATHS['PARAMS'])
+    
+    Returns:
+        dict: version, params et regressors, ou None si aucune recherche n'a été publiée
+    """
+    path = path or MODEL_PATHS['PARAMS']
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.error(f"Paramètres optimisés illisibles ({path}) : {str(e)}")
+        return None
+
+def _stan_iterations(model: Prophet):
+    """Nombre d'itérations de la dernière optimisation Stan (lu dans la sortie de CmdStan)."""
+    try:
+        with open(model.stan_backend.stan_fit.runset.stdout_files[0]) as f:
+            rows = [line.split() for line in f]
+        return max(int(row[0]) for row in rows if row and row[0].isdigit())
+    except Exception:
+        return None
+
+def _data_watermark(df: pd.DataFrame) -> dict:
+    """Première et dernière bougie d'entraînement, nombre de lignes et pas médian en secondes."""
+    steps = np.diff(np.sort(df['ds'].to_numpy(dtype='datetime64[ns]').view(np.int64)))
+    return {
+        'first': df['ds'].min().strftime('%Y-%m-%d %H:%M:%S'),
+        'last': df['ds'].max().strftime('%Y-%m-%d %H:%M:%S'),
+        'rows': len(df),
+        'interval_seconds': int(np.median(steps) // 10**9) if len(steps) else None
+    }
+
 class BitcoinProphetModel:
     """Modèle Prophet pour la prédiction du prix du Bitcoin."""
     
-    def __init__(self):
-        """Initialise le modèle Prophet avec les paramètres optimisés."""
-        self.model = Prophet(
-            changepoint_prior_scale=0.1,
-            seasonality_prior_scale=20.0,
-            holidays_prior_scale=10.0,
-            daily_seasonality=True,
-            weekly_seasonality=True,
-            yearly_seasonality=True,
-            changepoint_range=0.95,
-            n_changepoints=35,
-            interval_width=0.95
-        )
+    def __init__(self, params: dict = None, regressors: list = None):
+        """
+        Initialise le modèle Prophet avec les paramètres optimisés.
+        
+        Args:
+            params: Paramètres Prophet (défaut : paramètres retenus par la recherche
+                d'hyperparamètres, sinon PROPHET_CONFIG)
+            regressors: Régresseurs utilisés, parmi REGRESSOR_COLUMNS (défaut : tous)
+        """
+        if params is None or regressors is None:
+            tuned = load_tuned_params() or {}
+            params = params if params is not None else {**PROPHET_CONFIG, **tuned.get('params', {})}
+            regressors = regressors if regressors is not None else tuned.get('regressors', REGRESSOR_COLUMNS)
+        self.params = dict(params)
+        self.regressors = list(regressors)
+        self.model = self._build_prophet()
+        self.last_data = None  # Données du dernier entraînement (non sauvegardées)
+        self.data_watermark = None
+        self.indicator_state = None
+        self.is_trained = False
+        self.fit_info = None
+    
+    def _build_prophet(self) -> Prophet:
+        """Crée un objet Prophet non entraîné (un objet Prophet ne s'entraîne qu'une fois)."""
+        model = ForecastProphet(**self.params)
         
         # Ajout des régresseurs
-        for col in ['ema_5', 'ema_8', 'ema_13', 'ema_21', 'momentum', 'volume_norm',
-                   'trend_1d', 'trend_3d', 'trend_5d']:  # Ajout des tendances
-            self.model.add_regressor(col, mode='multiplicative', standardize=True)
+        for col in self.regressors:
+            model.add_regressor(col, mode='multiplicative', standardize=True)
             
         # Ajout d'une saisonnalité mensuelle personnalisée
-        self.model.add_seasonality(
+        model.add_seasonality(
             name='monthly',
             period=30.5,
             fourier_order=10,
             mode='multiplicative'
         )
-        
-        self.last_data = None
-        self.is_trained = False
+        return model
     
     def prepare_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Prépare les données pour le modèle Prophet."""
+        """
+        Prépare les données pour le modèle Prophet.
+        
+        Les colonnes déjà présentes (lecture de la table bitcoin_features)
+        sont utilisées telles quelles ; sinon la cible et les régresseurs
+        sont calculés depuis les prix.
+        """
         # Copie pour éviter de modifier les données originales
         df = df.copy()
         
@@ -64,31 +124,10 @@ class BitcoinProphetModel:
         df['ds'] = pd.to_datetime(df['timestamp'])
         df = df.sort_values('ds')
         
-        # Normalisation du prix (log transformation)
-        df['y'] = np.log1p(df['close_price'])
-        
-        # Calcul des indicateurs techniques
-        df['ema_5'] = df['close_price'].ewm(span=5, adjust=False).mean()
-        df['ema_8'] = df['close_price'].ewm(span=8, adjust=False).mean()
-        df['ema_13'] = df['close_price'].ewm(span=13, adjust=False).mean()
-        df['ema_21'] = df['close_price'].ewm(span=21, adjust=False).mean()
-        
-        # Normalisation des EMAs
-        for col in ['ema_5', 'ema_8', 'ema_13', 'ema_21']:
-            df[col] = np.log1p(df[col])
-        
-        # Calcul du momentum et des tendances
-        df['momentum'] = df['close_price'].pct_change()
-        df['trend_1d'] = df['close_price'].diff()
-        df['trend_3d'] = df['close_price'].diff(3)
-        df['trend_5d'] = df['close_price'].diff(5)
-        
-        # Normalisation des tendances
-        for col in ['trend_1d', 'trend_3d', 'trend_5d']:
-            df[col] = df[col] / df['close_price'].shift(1)
-            
-        # Normalisation du volume
-        df['volume_norm'] = np.log1p(df['volume'])
+        # Cible (log du prix) et indicateurs normalisés
+        if not {'y', *REGRESSOR_COLUMNS} <= set(df.columns):
+            regressors = compute_prophet_regressors(df)
+            df[regressors.columns] = regressors
         
         # Features temporelles
         df['year'] = df['ds'].dt.year
@@ -102,59 +141,232 @@ class BitcoinProphetModel:
         
         return df
 
-    def train(self, data: pd.DataFrame):
-        """Entraîne le modèle Prophet."""
+    def train(self, data: pd.DataFrame, save: bool = True, init: dict = None, max_iter: int = None):
+        """
+        Entraîne le modèle Prophet.
+        
+        Args:
+            data: DataFrame avec les données historiques
+            save: Sauvegarde le modèle après l'entraînement (False pour un backtest)
+            init: Paramètres Stan initiaux (démarrage à chaud, voir warm_start_params)
+            max_iter: Nombre maximal d'itérations de l'optimiseur (défaut Prophet : 10000)
+        """
         df = self.prepare_data(data)
+        if self.is_trained:
+            self.model = self._build_prophet()
         
         # Entraîner le modèle
-        self.model.fit(df)
+        fit_args = {'iter': max_iter} if max_iter is not None else {}
+        started = time.perf_counter()
+        warm_start = init is not None
+        if warm_start:
+            # Un démarrage à chaud qui fait échouer L-BFGS est repris à froid, plutôt
+            # que par le repli Newton de Prophet (très lent sur un long historique)
+            self.model.stan_backend.set_options(newton_fallback=False)
+            try:
+                self.model.fit(df, init=init, **fit_args)
+            except RuntimeError as e:
+                logger.warning(f"Échec du démarrage à chaud ({str(e)}), entraînement à froid")
+                self.model = self._build_prophet()
+                warm_start = False
+        if not warm_start:
+            self.model.fit(df, **fit_args)
+        self.fit_info = {
+            'seconds': round(time.perf_counter() - started, 3),
+            'iterations': _stan_iterations(self.model),
+            'rows': len(df),
+            'warm_start': warm_start,
+            'trained_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        logger.info(
+            f"✅ Modèle entraîné en {self.fit_info['seconds']:.1f} s "
+            f"({self.fit_info['iterations']} itérations, {len(df)} lignes, "
+            f"démarrage {'à chaud' if warm_start else 'à froid'})"
+        )
         self.last_data = df
+        self.data_watermark = _data_watermark(df)
+        self.indicator_state = (
+            IndicatorState.from_frame(df) if {'close_price', 'volume'} <= set(df.columns) else None
+        )
         self.is_trained = True
         
         # Sauvegarder automatiquement le modèle
-        self.save()
+        if save:
+            self.save()
+    
+    def warm_start_params(self, data: pd.DataFrame = None) -> dict:
+        """
+        Paramètres Stan de l'entraînement précédent, pour démarrer l'optimisation à chaud.
+        
+        Prophet normalise la cible et le temps sur chaque historique : avec
+        `data`, les paramètres sont convertis vers les échelles du prochain
+        entraînement (tendance précédente interpolée aux nouveaux points de
+        rupture, composantes additives, régresseurs et bruit remis à l'échelle).
+        
+        Args:
+            data: Données préparées du prochain entraînement (None : paramètres bruts)
+        
+        Returns:
+            dict: k, m, sigma_obs, delta et beta, ou None si le modèle n'est pas entraîné
+        """
+        if not self.is_trained or not getattr(self.model, 'params', None):
+            return None
+        old = self.model
+        params = old.params
+        k, m, sigma_obs = (float(params[name][0][0]) for name in ('k', 'm', 'sigma_obs'))
+        delta = np.asarray(params['delta'][0], dtype=np.float64)
+        beta = np.asarray(params['beta'][0], dtype=np.float64).copy()
+        init = {'k': k, 'm': m, 'sigma_obs': sigma_obs, 'delta': delta, 'beta': beta}
+        if data is None:
+            return init
+        
+        # Échelles et points de rupture que Prophet calculera sur `data`
+        ds = pd.to_datetime(data['ds']).sort_values().reset_index(drop=True)
+        y_scale = float(data['y'].abs().max()) or 1.0
+        start, t_scale = ds.iloc[0], ds.iloc[-1] - ds.iloc[0]
+        hist_size = int(np.floor(len(ds) * self.params.get('changepoint_range', 0.8)))
+        n_changepoints = min(self.params.get('n_changepoints', 25), hist_size - 1)
+        if n_changepoints <= 0 or t_scale == pd.Timedelta(0):
+            return init
+        knots = ds.iloc[np.linspace(0, hist_size - 1, n_changepoints + 1).round().astype(int)].iloc[1:]
+        
+        # Tendance précédente (en unités réelles) aux bornes et aux nouveaux points de rupture
+        points = pd.concat([ds.iloc[:1], knots, ds.iloc[-1:]])
+        u = ((points - start) / t_scale).to_numpy(dtype=np.float64)
+        t_old = ((points - old.start) / old.t_scale).to_numpy(dtype=np.float64)
+        trend = Prophet.piecewise_linear(t_old, delta, k, m, old.changepoints_t) * old.y_scale / y_scale
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slopes = np.diff(trend) / np.diff(u)
+        if not np.all(np.isfinite(slopes)):
+            return init
+        init['k'] = float(slopes[0])
+        init['m'] = float(trend[0])
+        init['delta'] = np.diff(slopes)[:n_changepoints]
+        init['sigma_obs'] = sigma_obs * old.y_scale / y_scale
+        
+        # Composantes additives en unités de y ; régresseurs standardisés sur `data`
+        columns = old.train_component_cols
+        if len(columns) == len(beta):
+            beta[columns['additive_terms'].to_numpy() == 1] *= old.y_scale / y_scale
+            for name, props in old.extra_regressors.items():
+                if props.get('std') and name in data and name in columns.index:
+                    beta[columns.index.get_loc(name)] *= float(data[name].std()) / props['std']
+        return init
     
-    def predict(self, data: pd.DataFrame, horizon: int) -> pd.DataFrame:
+    def retrain(self, data: pd.DataFrame, min_new_rows: int = RETRAIN_CONFIG['MIN_NEW_ROWS'],
+                window_days: int = RETRAIN_CONFIG['WINDOW_DAYS'], warm_start: bool = RETRAIN_CONFIG['WARM_START'],
+                max_iter: int = RETRAIN_CONFIG['MAX_ITER'], save: bool = True) -> dict:
         """
-        Fait des prédictions pour un nombre donné de jours.
+        Réentraînement planifié : seulement si assez de nouvelles bougies sont arrivées.
+        
+        Les features sont calculées sur tout `data` puis l'entraînement est
+        limité aux `window_days` derniers jours, en démarrant l'optimisation
+        depuis les paramètres de l'entraînement précédent.
         
         Args:
             data: DataFrame avec les données historiques
+            min_new_rows: Nombre minimal de bougies postérieures au dernier entraînement
+            window_days: Fenêtre d'entraînement en jours (None : tout `data`)
+            warm_start: Démarre l'optimisation depuis l'entraînement précédent
+            max_iter: Nombre maximal d'itérations de l'optimiseur
+            save: Sauvegarde le modèle après l'entraînement
+        
+        Returns:
+            dict: retrained, new_rows et, si réentraîné, durée et itérations
+        """
+        df = self.prepare_data(data)
+        last_trained = (
+            pd.Timestamp(self.data_watermark['last']) if self.is_trained and self.data_watermark else None
+        )
+        new_rows = int((df['ds'] > last_trained).sum()) if last_trained is not None else len(df)
+        if last_trained is not None and new_rows < min_new_rows:
+            logger.info(f"Réentraînement ignoré : {new_rows} nouvelles bougies (seuil {min_new_rows})")
+            return {'retrained': False, 'new_rows': new_rows}
+        
+        if window_days is not None:
+            df = df[df['ds'] > df['ds'].max() - pd.Timedelta(days=window_days)]
+        self.train(df, save=save, init=self.warm_start_params(df) if warm_start else None, max_iter=max_iter)
+        return {'retrained': True, 'new_rows': new_rows, **self.fit_info}
+    
+    @property
+    def interval(self) -> int:
+        """
+        Pas des données d'entraînement en secondes.
+        
+        Les artefacts antérieurs au pas mesuré n'en portent pas : on retient
+        alors l'intervalle collecté par défaut.
+        """
+        return (self.data_watermark or {}).get('interval_seconds') or INTERVAL_SECONDS[DEFAULT_INTERVAL]
+    
+    def predict(self, data, horizon: int) -> pd.DataFrame:
+        """
+        Fait des prédictions pour un nombre donné de jours, au pas des données.
+        
+        Args:
+            data: DataFrame avec les données historiques, IndicatorState
+                des dernières bougies (modèle déjà entraîné), ou None pour
+                partir de la dernière bougie d'entraînement
             horizon: Nombre de jours à prédire
             
         Returns:
             DataFrame avec les prédictions
         """
-        if not self.is_trained:
-            self.train(data)
-        
-        # Préparer les données
-        prepared_data = self.prepare_data(data)
+        return self.predict_horizons(data, [horizon])[horizon]
+    
+    def predict_horizons(self, data, horizons: list) -> dict:
+        """
+        Prédit plusieurs horizons en un seul appel à Prophet.
         
-        # Création des dates futures
-        last_date = prepared_data['ds'].max()
-        future_dates = pd.date_range(start=last_date, periods=horizon + 1)[1:]
-        future = pd.DataFrame({'ds': future_dates})
+        La prévision est calculée jusqu'au plus grand horizon ; chaque horizon
+        en reçoit les premières lignes.
         
-        # Calcul des indicateurs techniques pour les dates futures
-        # On utilise les dernières valeurs connues pour les régresseurs
-        for col in ['ema_5', 'ema_8', 'ema_13', 'ema_21']:
-            future[col] = prepared_data[col].iloc[-1]
+        Args:
+            data: Voir predict
+            horizons: Horizons en jours
             
-        future['momentum'] = prepared_data['momentum'].iloc[-1]
-        future['trend_1d'] = prepared_data['trend_1d'].iloc[-1]
-        future['trend_3d'] = prepared_data['trend_3d'].iloc[-1]
-        future['trend_5d'] = prepared_data['trend_5d'].iloc[-1]
-        future['volume_norm'] = prepared_data['volume_norm'].mean()
+        Returns:
+            dict: Prédictions par horizon
+        """
+        if data is None:
+            if self.indicator_state is None:
+                raise ValueError("Aucun état d'indicateurs : fournir les données historiques")
+            data = self.indicator_state
+        if isinstance(data, IndicatorState):
+            state = data
+            if not self.is_trained:
+                raise ValueError("Le modèle doit être entraîné pour prédire depuis un état d'indicateurs")
+        else:
+            if not self.is_trained:
+                self.train(data)
+            state = IndicatorState.from_frame(data)
+        
+        # Dernières valeurs connues des régresseurs, constantes sur l'horizon ;
+        # historique trop court pour les tendances : variation nulle
+        features = state.features()
+        regressors = {
+            name: 0.0 if pd.isna(features[name]) else features[name]
+            for name in self.model.extra_regressors
+        }
+        # Volume futur : moyenne d'entraînement du régresseur (valeur neutre pour le
+        # modèle), indépendante de la longueur de l'historique fourni
+        volume_stats = self.model.extra_regressors.get('volume_norm', {})
+        if volume_stats.get('mu') is not None:
+            regressors['volume_norm'] = volume_stats['mu']
         
-        # Faire la prédiction
+        # Dates futures au pas des données, jusqu'au plus grand horizon
+        steps = {horizon: horizon_steps(horizon, self.interval) for horizon in horizons}
+        future = future_frame(features['ds'], max(steps.values()), self.interval, regressors)
         forecast = self.model.predict(future)
         
-        return forecast
+        return {horizon: forecast.iloc[:n] for horizon, n in steps.items()}
     
     def save(self, model_path: str = None):
         """
-        Sauvegarde le modèle avec pickle.
+        Sauvegarde le modèle au format compact (voir src.models.artifact).
+        
+        Seuls les paramètres ajustés, l'état des indicateurs et un manifeste
+        (version, filigrane des données, empreinte) sont écrits : la taille
+        du fichier ne dépend pas de la profondeur de l'historique.
         
         Args:
             model_path: Chemin de sauvegarde (optionnel)
@@ -165,15 +377,11 @@ class BitcoinProphetModel:
             
             os.makedirs(os.path.dirname(model_path), exist_ok=True)
             
-            # Créer un dictionnaire avec l'état du modèle
-            state = {
-                'model': self.model,
-                'last_data': self.last_data.copy() if self.last_data is not None else None,
-                'is_trained': self.is_trained
-            }
-            
-            with open(model_path, 'wb') as f:
-                pickle.dump(state, f)
+            # Écriture atomique : un lecteur (registre de l'API) ne voit jamais un fichier partiel
+            tmp_path = f"{model_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(self.to_bytes())
+            os.replace(tmp_path, model_path)
                 
             logger.info(f"Modèle sauvegardé avec succès dans {model_path}")
             
@@ -181,16 +389,102 @@ class BitcoinProphetModel:
             logger.error(f"Erreur lors de la sauvegarde du modèle : {str(e)}")
             raise
     
+    def to_bytes(self) -> bytes:
+        """Contenu de l'artefact compact du modèle."""
+        payload = {
+            'prophet': artifact.encode_prophet(self.model),
+            'indicator_state': self.indicator_state.to_dict() if self.indicator_state else None
+        }
+        return artifact.encode(payload, self.data_watermark, self.params, self.regressors,
+                               self.is_trained, self.fit_info)
+    
+    @staticmethod
+    def from_bytes(data: bytes):
+        """
+        Reconstruit un modèle à partir du contenu d'un artefact compact.
+        
+        Les anciens fichiers pickle sont refusés : ils se convertissent une
+        fois avec `python -m src.models.artifact convert` (voir from_pickle).
+        
+        Args:
+            data: Contenu du fichier
+        
+        Returns:
+            BitcoinProphetModel: Instance restaurée
+        
+        Raises:
+            ArtifactError: Si le fichier n'est pas un artefact ou s'il est invalide (format, version, empreinte)
+        """
+        if not artifact.is_artifact(data):
+            raise artifact.ArtifactError(
+                "Fichier non reconnu comme artefact compact ; un ancien pickle se convertit avec "
+                "`python -m src.models.artifact convert`"
+            )
+        manifest, payload = artifact.decode(data)
+        model = BitcoinProphetModel(manifest['params'], manifest['regressors'])
+        prophet_model = artifact.decode_prophet(payload['prophet'])
+        if prophet_model is not None:
+            model.model = as_forecast_model(prophet_model)
+        model.data_watermark = manifest['data_watermark']
+        model.fit_info = manifest['fit_info']
+        model.is_trained = manifest['is_trained']
+        if payload['indicator_state'] is not None:
+            model.indicator_state = IndicatorState.from_dict(payload['indicator_state'])
+        return model
+    
+    @staticmethod
+    def from_pickle(data: bytes):
+        """
+        Reconstruit un modèle à partir d'un ancien fichier pickle (état complet).
+        
+        pickle peut exécuter du code arbitraire : réservé à la conversion
+        explicite d'un fichier de confiance (`artifact convert`).
+        
+        Args:
+            data: Contenu du fichier pickle
+        
+        Returns:
+            BitcoinProphetModel: Instance restaurée
+        """
+        return BitcoinProphetModel.from_state(pickle.loads(data))
+    
+    @staticmethod
+    def from_state(state: dict):
+        """
+        Reconstruit un modèle à partir d'un état pickle (ancien format de `save`).
+        
+        Args:
+            state: Dictionnaire (model, last_data, is_trained)
+        
+        Returns:
+            BitcoinProphetModel: Instance restaurée
+        """
+        model = BitcoinProphetModel()
+        model.model = as_forecast_model(state['model'])
+        model.params = {k: getattr(state['model'], k) for k in PROPHET_CONFIG if hasattr(state['model'], k)}
+        model.regressors = list(state['model'].extra_regressors)
+        model.last_data = state['last_data']
+        if model.last_data is not None and len(model.last_data):
+            model.data_watermark = _data_watermark(model.last_data)
+            if {'timestamp', 'close_price', 'volume'} <= set(model.last_data.columns):
+                model.indicator_state = IndicatorState.from_frame(model.last_data)
+        model.is_trained = state['is_trained']
+        model.fit_info = state.get('fit_info')
+        return model
+    
     @staticmethod
     def load(model_path: str = None):
         """
-        Charge un modèle sauvegardé.
+        Charge un modèle sauvegardé (artefact compact uniquement).
         
         Args:
             model_path: Chemin vers le modèle sauvegardé
         
         Returns:
             BitcoinProphetModel: Instance du modèle chargé
+        
+        Raises:
+            ArtifactError: Si le fichier n'est pas un artefact valide
         """
         try:
             if model_path is None:
@@ -200,19 +494,11 @@ class BitcoinProphetModel:
                 raise FileNotFoundError(f"Aucun modèle trouvé à {model_path}")
             
             with open(model_path, 'rb') as f:
-                state = pickle.load(f)
-            
-            # Créer une nouvelle instance
-            model = BitcoinProphetModel()
-            
-            # Restaurer l'état
-            model.model = state['model']
-            model.last_data = state['last_data']
-            model.is_trained = state['is_trained']
+                model = BitcoinProphetModel.from_bytes(f.read())
             
             logger.info(f"Modèle chargé avec succès depuis {model_path}")
             return model
             
         except Exception as e:
             logger.error(f"Erreur lors du chargement du modèle : {str(e)}")
-            raise 
\ No newline at end of file
+            raise 
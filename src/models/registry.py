@@ -0,0 +1,200 @@
+"""
+Registre du modèle Prophet servi par l'API.
+
+Le modèle est chargé une seule fois puis partagé entre les requêtes. Un
+thread surveille le fichier (mtime, taille puis empreinte SHA-256) et
+remplace atomiquement le modèle courant lorsqu'une nouvelle version est
+publiée : les requêtes en cours conservent leur référence à l'ancienne.
+
+Les processus de prévision de l'API ne reçoivent pas le modèle à chaque
+requête : chacun le charge une fois depuis le fichier, par version
+(empreinte SHA-256), et ne reçoit ensuite que les données et l'horizon.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from src.models.config import MODEL_PATHS, MODEL_RELOAD_INTERVAL
+from src.models.prophet_model import BitcoinProphetModel
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """Version chargée du modèle et ses métadonnées."""
+    model: BitcoinProphetModel
+    version: str  # Préfixe de l'empreinte SHA-256 du fichier
+    sha256: str
+    path: str
+    file_mtime: float
+    loaded_at: datetime
+    load_seconds: float
+
+
+class ModelRegistry:
+    """Détient la version courante du modèle et la recharge à chaud."""
+
+    def __init__(self, model_path: str = None, check_interval: float = MODEL_RELOAD_INTERVAL):
+        """
+        Initialise le registre (sans charger le modèle).
+
+        Args:
+            model_path (str): Fichier du modèle (défaut : MODEL_PATHS['PROPHET'])
+            check_interval (float): Secondes entre deux vérifications du fichier
+        """
+        self.model_path = model_path or MODEL_PATHS['PROPHET']
+        self.check_interval = check_interval
+        self._current: Optional[LoadedModel] = None
+        self._file_stat = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def current(self) -> Optional[LoadedModel]:
+        """
+        Retourne la version courante, en la chargeant au premier appel.
+
+        Returns:
+            LoadedModel: Version courante, ou None si aucun modèle n'est disponible
+        """
+        if self._current is None:
+            self.reload()
+        return self._current
+
+    def reload(self) -> bool:
+        """
+        Recharge le modèle si le fichier a changé.
+
+        En cas d'échec (fichier absent ou corrompu), la version courante est
+        conservée.
+
+        Returns:
+            bool: True si une nouvelle version a été installée
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self.model_path)
+            except FileNotFoundError:
+                if self._current is None:
+                    logger.warning(f"Aucun modèle trouvé à {self.model_path}")
+                return False
+            file_stat = (stat.st_mtime_ns, stat.st_size)
+            if file_stat == self._file_stat:
+                return False
+
+            try:
+                started = time.perf_counter()
+                with open(self.model_path, 'rb') as f:
+                    data = f.read()
+                sha256 = hashlib.sha256(data).hexdigest()
+                if self._current is not None and sha256 == self._current.sha256:
+                    self._file_stat = file_stat
+                    return False
+                model = BitcoinProphetModel.from_bytes(data)
+                load_seconds = time.perf_counter() - started
+            except Exception as e:
+                logger.error(f"❌ Erreur lors du chargement du modèle {self.model_path}: {str(e)}")
+                return False
+
+            previous = self._current.version if self._current else None
+            self._current = LoadedModel(
+                model=model,
+                version=sha256[:12],
+                sha256=sha256,
+                path=self.model_path,
+                file_mtime=stat.st_mtime,
+                loaded_at=datetime.now(),
+                load_seconds=load_seconds
+            )
+            self._file_stat = file_stat
+            logger.info(
+                f"✅ Modèle {self._current.version} chargé en {load_seconds * 1000:.0f} ms"
+                + (f" (remplace {previous})" if previous else "")
+            )
+            return True
+
+    def _watch(self):
+        while not self._stop.wait(self.check_interval):
+            self.reload()
+
+    def start(self):
+        """Charge le modèle puis lance la surveillance du fichier."""
+        self.reload()
+        if self._watcher is None:
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+            self._watcher.start()
+
+    def stop(self):
+        """Arrête la surveillance du fichier."""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+
+class StaleModelError(RuntimeError):
+    """Le fichier du modèle ne correspond plus à la version demandée."""
+
+
+# Modèle chargé par le processus de prévision courant : {"sha256", "model"}
+_process_model = {}
+
+
+def load_process_model(model_path: str, sha256: str = None) -> BitcoinProphetModel:
+    """
+    Modèle du processus courant, chargé une seule fois par version.
+
+    Args:
+        model_path (str): Fichier du modèle
+        sha256 (str): Empreinte de la version attendue (None : version du fichier)
+
+    Returns:
+        BitcoinProphetModel: Modèle en cache dans le processus
+
+    Raises:
+        StaleModelError: Si le fichier a été remplacé par une autre version
+    """
+    cached = _process_model.get("sha256")
+    if cached is not None and (sha256 is None or cached == sha256):
+        return _process_model["model"]
+    with open(model_path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if sha256 is not None and digest != sha256:
+        raise StaleModelError(f"{model_path} ne contient plus la version {sha256[:12]}")
+    model = BitcoinProphetModel.from_bytes(data)
+    _process_model.clear()
+    _process_model.update(sha256=digest, model=model)
+    logger.info(f"Modèle {digest[:12]} chargé dans le processus de prévision")
+    return model
+
+
+def preload_process_model(model_path: str):
+    """Initialiseur des processus de prévision : charge le modèle publié, s'il existe."""
+    try:
+        load_process_model(model_path)
+    except Exception as e:
+        logger.warning(f"Modèle non préchargé ({model_path}) : {str(e)}")
+
+
+def forecast_process(model_path: str, sha256: str, data, horizon: int):
+    """
+    Prévision dans un processus de l'API avec le modèle de ce processus.
+
+    Args:
+        model_path (str): Fichier du modèle
+        sha256 (str): Empreinte de la version servie par le registre
+        data: IndicatorState ou historique, voir BitcoinProphetModel.predict
+        horizon (int): Horizon en jours
+
+    Returns:
+        pd.DataFrame: Prévision
+    """
+    return load_process_model(model_path, sha256).predict(data, horizon)
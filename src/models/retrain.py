@@ -0,0 +1,89 @@
+"""
+Réentraînement planifié du modèle Prophet (à lancer toutes les heures).
+
+Le modèle n'est réentraîné que si au moins MIN_NEW_ROWS bougies sont
+arrivées depuis le dernier entraînement, sur une fenêtre glissante de
+WINDOW_DAYS jours lue avec ses features précalculées (bitcoin_features) et
+en démarrant l'optimisation Stan depuis les paramètres précédents : le coût
+d'un réentraînement reste borné quelle que soit la profondeur de
+l'historique. Le fichier du modèle est remplacé atomiquement
+et l'API recharge la nouvelle version à chaud.
+
+Usage :
+    python -m src.models.retrain [--min-new-rows 24] [--window-days 365] [--max-iter 2000] [--cold] [--force]
+"""
+import argparse
+import logging
+import os
+import sys
+
+from src.data.config import DEFAULT_SYMBOL, DEFAULT_INTERVAL, INTERVAL_SECONDS
+from src.data.feature_store import read_training_data
+from src.data.storage import connect_writer
+from src.models.config import MODEL_PATHS, RETRAIN_CONFIG
+from src.models.features import feature_warmup
+from src.models.prophet_model import BitcoinProphetModel
+
+logger = logging.getLogger(__name__)
+
+
+def history_rows(window_days, interval=DEFAULT_INTERVAL):
+    """
+    Bougies à lire pour une fenêtre d'entraînement, chauffe des indicateurs comprise.
+
+    Args:
+        window_days (int): Fenêtre d'entraînement en jours (None : tout l'historique)
+        interval (str): Intervalle des bougies
+
+    Returns:
+        int: Nombre de bougies à lire (None : tout l'historique)
+    """
+    if window_days is None:
+        return None
+    return window_days * 86400 // INTERVAL_SECONDS[interval] + feature_warmup()
+
+
+def main(argv=None):
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Réentraînement planifié du modèle Prophet")
+    parser.add_argument("--min-new-rows", type=int, default=RETRAIN_CONFIG['MIN_NEW_ROWS'])
+    parser.add_argument("--window-days", type=int, default=RETRAIN_CONFIG['WINDOW_DAYS'])
+    parser.add_argument("--max-iter", type=int, default=RETRAIN_CONFIG['MAX_ITER'])
+    parser.add_argument("--cold", action="store_true", default=not RETRAIN_CONFIG['WARM_START'],
+                        help="Optimisation sans démarrage à chaud")
+    parser.add_argument("--force", action="store_true", help="Ignore le seuil de nouvelles bougies")
+    parser.add_argument("--symbol", default=DEFAULT_SYMBOL)
+    parser.add_argument("--interval", default=DEFAULT_INTERVAL)
+    parser.add_argument("--model", default=MODEL_PATHS['PROPHET'])
+    args = parser.parse_args(argv)
+
+    model = BitcoinProphetModel.load(args.model) if os.path.exists(args.model) else BitcoinProphetModel()
+    conn = connect_writer()  # Migre au besoin une base au schéma historique
+    try:
+        df = read_training_data(conn, args.symbol, args.interval, history_rows(args.window_days, args.interval))
+    finally:
+        conn.close()
+    if df.empty:
+        print(f"❌ Aucune bougie pour {args.symbol} {args.interval}")
+        return 1
+
+    result = model.retrain(
+        df,
+        min_new_rows=0 if args.force else args.min_new_rows,
+        window_days=args.window_days,
+        warm_start=not args.cold,
+        max_iter=args.max_iter,
+        save=False
+    )
+    if not result['retrained']:
+        print(f"Réentraînement ignoré : {result['new_rows']} nouvelles bougies (seuil {args.min_new_rows})")
+        return 0
+
+    model.save(args.model)
+    print(f"✅ Modèle réentraîné en {result['seconds']:.1f} s ({result['iterations']} itérations, "
+          f"{result['rows']} lignes, démarrage {'à chaud' if result['warm_start'] else 'à froid'})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
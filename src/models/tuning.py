@@ -0,0 +1,346 @@
+"""
+Recherche d'hyperparamètres du modèle Prophet.
+
+Chaque candidat (priors de changepoints et de saisonnalité, jeu de
+régresseurs) est évalué par le backtest walk-forward dans un pool de
+processus, sur l'historique lu avec les features précalculées de
+bitcoin_features lorsque la table est à jour. Un candidat est abandonné dès qu'un pli dépasse
+EARLY_STOP_FACTOR fois le meilleur score déjà obtenu. Les scores complets
+sont mis en cache par empreinte (paramètres, données, plis) : une recherche
+relancée sur les mêmes données ne réentraîne que les nouveaux candidats.
+Un abandon n'est pas mis en cache : il dépend du seuil et du meilleur score
+connu au moment de l'évaluation, donc de l'ordre des candidats. Le meilleur
+candidat est publié dans MODEL_PATHS['PARAMS'] (lu par BitcoinProphetModel)
+et archivé sous une nouvelle version dans MODEL_PATHS['PARAMS_HISTORY'].
+
+Usage :
+    python -m src.models.tuning [--search grid|random] [--n-iter 20] [--workers 4] [--folds 3]
+"""
+import argparse
+import glob
+import hashlib
+import itertools
+import json
+import logging
+import math
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data.config import DEFAULT_SYMBOL, DEFAULT_INTERVAL
+from src.data.feature_store import read_training_data
+from src.data.storage import connect_writer
+from src.models.backtest import make_folds, run_fold
+from src.models.config import BACKTEST_CONFIG, MODEL_PATHS, PROPHET_CONFIG, TUNING_CONFIG
+from src.models.indicator_state import REGRESSOR_COLUMNS
+from src.models.prophet_model import load_tuned_params
+
+logger = logging.getLogger(__name__)
+
+# État des processus de recherche (initialisé par _init_worker)
+_worker = {}
+
+
+def select_regressors(groups: List[str]) -> List[str]:
+    """Colonnes de REGRESSOR_COLUMNS appartenant aux groupes (ema, momentum, volume, trend)."""
+    return [col for col in REGRESSOR_COLUMNS if col.split('_')[0] in groups]
+
+
+def make_candidates(search: str = TUNING_CONFIG['SEARCH'], n_iter: int = TUNING_CONFIG['N_ITER'],
+                    seed: int = TUNING_CONFIG['SEED']) -> List[dict]:
+    """
+    Génère les candidats de la recherche.
+
+    Le premier candidat est la configuration courante (référence).
+
+    Args:
+        search: grid (toutes les combinaisons) ou random (n_iter tirages)
+        n_iter: Nombre de candidats en recherche aléatoire
+        seed: Graine de la recherche aléatoire
+
+    Returns:
+        List[dict]: Candidats (name, params, regressors)
+    """
+    current = load_tuned_params() or {}
+    baseline = {
+        'name': 'courant',
+        'params': {**PROPHET_CONFIG, **current.get('params', {})},
+        'regressors': current.get('regressors', REGRESSOR_COLUMNS)
+    }
+    space = TUNING_CONFIG['SEARCH_SPACE']
+    names = list(space)
+    combinations = list(itertools.product(
+        *(space[name] for name in names), TUNING_CONFIG['REGRESSOR_SETS'].items()
+    ))
+    if search == 'random':
+        combinations = random.Random(seed).sample(combinations, min(n_iter, len(combinations)))
+    elif search != 'grid':
+        raise ValueError(f"Recherche inconnue : {search} (grid ou random)")
+
+    candidates = [baseline]
+    for *values, (set_name, groups) in combinations:
+        candidates.append({
+            'name': f"{set_name} " + ' '.join(f"{n}={v}" for n, v in zip(names, values)),
+            'params': {**PROPHET_CONFIG, **dict(zip(names, values))},
+            'regressors': select_regressors(groups)
+        })
+    return candidates
+
+
+def data_fingerprint(df: pd.DataFrame) -> dict:
+    """Empreinte des bougies évaluées (invalide le cache quand les données changent)."""
+    return {
+        'rows': len(df),
+        'start': str(pd.Timestamp(df['timestamp'].iloc[0])),
+        'end': str(pd.Timestamp(df['timestamp'].iloc[-1])),
+        'close_sum': round(float(np.sum(df['close_price'].to_numpy(dtype=np.float64))), 6)
+    }
+
+
+def candidate_key(candidate: dict, context: dict) -> str:
+    """Empreinte SHA-256 d'un candidat pour un contexte (données, plis, métrique)."""
+    payload = json.dumps(
+        {'params': candidate['params'], 'regressors': candidate['regressors'], **context},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _cache_path(key: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def _write_json(path: str, data: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _cpu_time() -> float:
+    """Temps CPU du processus et de ses sous-processus terminés (CmdStan)."""
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+def _init_worker(plan, horizon, metric, early_stop_factor, best):
+    _worker.update(plan=plan, horizon=horizon, metric=metric, factor=early_stop_factor, best=best)
+
+
+def evaluate_candidate(candidate: dict) -> dict:
+    """
+    Évalue un candidat sur les plis du processus, avec arrêt anticipé.
+
+    Returns:
+        dict: Candidat, métriques par pli, score moyen (None si abandonné),
+            durée et temps CPU
+    """
+    started, cpu_started = time.perf_counter(), _cpu_time()
+    metric, best = _worker['metric'], _worker['best']
+    folds, stopped = [], False
+    for fold in _worker['plan']:
+        result = run_fold(fold, _worker['horizon'], candidate['params'], candidate['regressors'])
+        folds.append(result)
+        score = (result['metrics'] or {}).get(metric)
+        if score is None or score > best.value * _worker['factor']:
+            stopped = True
+            break
+
+    score = None
+    if not stopped:
+        score = float(np.mean([f['metrics'][metric] for f in folds]))
+        with best.get_lock():
+            best.value = min(best.value, score)
+    return {
+        **candidate,
+        'folds': folds,
+        'score': score,
+        'stopped': stopped,
+        'wall_seconds': round(time.perf_counter() - started, 3),
+        'cpu_seconds': round(_cpu_time() - cpu_started, 3)
+    }
+
+
+def run_search(df: pd.DataFrame, candidates: List[dict], folds: int = 3,
+               horizon: int = BACKTEST_CONFIG['HORIZON'], step: int = BACKTEST_CONFIG['STEP'],
+               train_days: Optional[int] = BACKTEST_CONFIG['TRAIN_DAYS'],
+               workers: Optional[int] = BACKTEST_CONFIG['WORKERS'],
+               metric: str = TUNING_CONFIG['METRIC'],
+               early_stop_factor: float = TUNING_CONFIG['EARLY_STOP_FACTOR'],
+               cache_dir: str = None) -> dict:
+    """
+    Évalue les candidats en parallèle et retient le meilleur.
+
+    Args:
+        df: Bougies (timestamp, close_price, volume), par ordre chronologique
+        candidates: Candidats produits par make_candidates
+        folds, horizon, step, train_days: Découpage walk-forward (voir make_folds)
+        workers: Processus parallèles (None : un par cœur, 1 : sans pool)
+        metric: Métrique minimisée
+        early_stop_factor: Seuil d'abandon relatif au meilleur score
+        cache_dir: Répertoire du cache des scores (défaut : MODEL_PATHS['TUNING_CACHE'])
+
+    Returns:
+        dict: Résultats par candidat, meilleur candidat, temps CPU et accélération
+    """
+    started, cpu_started = time.perf_counter(), _cpu_time()
+    cache_dir = cache_dir or MODEL_PATHS['TUNING_CACHE']
+    plan = make_folds(df, folds, horizon, step, train_days)
+    context = {
+        'data': data_fingerprint(df),
+        'origins': [str(fold['origin']) for fold in plan],
+        'horizon': horizon,
+        'train_days': train_days,
+        'metric': metric,
+        # Features précalculées sur tout l'historique ou recalculées par pli
+        'source': 'features' if 'y' in df.columns else 'prices'
+    }
+
+    results, pending = [], []
+    for candidate in candidates:
+        key = candidate_key(candidate, context)
+        try:
+            with open(_cache_path(key, cache_dir)) as f:
+                results.append({**json.load(f), 'cached': True})
+        except FileNotFoundError:
+            pending.append({**candidate, 'key': key})
+
+    ctx = multiprocessing.get_context("spawn")
+    scores = [r['score'] for r in results if r['score'] is not None]
+    best = ctx.Value('d', min(scores) if scores else math.inf)
+    initargs = (plan, horizon, metric, early_stop_factor, best)
+    workers = min(workers or os.cpu_count() or 1, max(len(pending), 1))
+    logger.info(f"Recherche : {len(candidates)} candidats ({len(results)} en cache), "
+                f"{len(plan)} plis, {workers} processus")
+
+    def record(result):
+        if not result['stopped']:
+            _write_json(_cache_path(result['key'], cache_dir), result)
+        results.append({**result, 'cached': False})
+        status = "abandonné" if result['stopped'] else f"{metric}={result['score']:.4f}"
+        logger.info(f"{result['name']} : {status} ({result['wall_seconds']:.1f} s)")
+
+    if workers == 1:
+        _init_worker(*initargs)
+        for candidate in pending:
+            record(evaluate_candidate(candidate))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=_init_worker, initargs=initargs) as pool:
+            for future in as_completed([pool.submit(evaluate_candidate, c) for c in pending]):
+                record(future.result())
+
+    evaluated = [r for r in results if not r['cached']]
+    completed = [r for r in results if r['score'] is not None]
+    wall = time.perf_counter() - started
+    # Durée estimée en série : temps CPU cumulé des candidats évalués
+    serial = sum(r['cpu_seconds'] for r in evaluated)
+    # Inclut les processus du pool, terminés à la sortie du bloc with
+    cpu = _cpu_time() - cpu_started
+    return {
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'context': context,
+        'candidates': sorted(results, key=lambda r: (r['score'] is None, r['score'] or 0)),
+        'best': min(completed, key=lambda r: r['score']) if completed else None,
+        'evaluated': len(evaluated),
+        'cached': len(results) - len(evaluated),
+        'stopped': sum(r['stopped'] for r in evaluated),
+        'workers': workers,
+        'wall_seconds': round(wall, 3),
+        'cpu_seconds': round(cpu, 3),
+        'serial_seconds': round(serial, 3),
+        'speedup': round(serial / wall, 2) if evaluated and wall > 0 else None
+    }
+
+
+def publish_params(search: dict, path: str = None, history_dir: str = None) -> Optional[Dict]:
+    """
+    Publie les paramètres du meilleur candidat sous une nouvelle version.
+
+    Args:
+        search: Résultat de run_search
+        path: Paramètres courants (défaut : MODEL_PATHS['PARAMS'])
+        history_dir: Archive des versions (défaut : MODEL_PATHS['PARAMS_HISTORY'])
+
+    Returns:
+        dict: Artefact publié, ou None si aucun candidat n'a été évalué jusqu'au bout
+    """
+    best = search['best']
+    if best is None:
+        return None
+    path = path or MODEL_PATHS['PARAMS']
+    history_dir = history_dir or MODEL_PATHS['PARAMS_HISTORY']
+    version = len(glob.glob(os.path.join(history_dir, 'v*.json'))) + 1
+    artifact = {
+        'version': version,
+        'generated_at': search['generated_at'],
+        'params': best['params'],
+        'regressors': best['regressors'],
+        'metric': search['context']['metric'],
+        'score': best['score'],
+        'folds': best['folds'],
+        'context': search['context']
+    }
+    _write_json(os.path.join(history_dir, f"v{version:04d}.json"), artifact)
+    _write_json(path, artifact)
+    return artifact
+
+
+def main(argv=None):
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Recherche d'hyperparamètres du modèle Prophet")
+    parser.add_argument("--search", choices=["grid", "random"], default=TUNING_CONFIG['SEARCH'])
+    parser.add_argument("--n-iter", type=int, default=TUNING_CONFIG['N_ITER'])
+    parser.add_argument("--folds", type=int, default=3)
+    parser.add_argument("--horizon", type=int, default=BACKTEST_CONFIG['HORIZON'])
+    parser.add_argument("--step", type=int, default=BACKTEST_CONFIG['STEP'])
+    parser.add_argument("--train-days", type=int, default=BACKTEST_CONFIG['TRAIN_DAYS'])
+    parser.add_argument("--workers", type=int, default=BACKTEST_CONFIG['WORKERS'])
+    parser.add_argument("--symbol", default=DEFAULT_SYMBOL)
+    parser.add_argument("--interval", default=DEFAULT_INTERVAL)
+    parser.add_argument("--dry-run", action="store_true", help="N'écrit pas les paramètres retenus")
+    args = parser.parse_args(argv)
+
+    conn = connect_writer()  # Migre au besoin une base au schéma historique
+    try:
+        df = read_training_data(conn, args.symbol, args.interval)
+    finally:
+        conn.close()
+    if df.empty:
+        print(f"❌ Aucune bougie pour {args.symbol} {args.interval}")
+        return 1
+
+    search = run_search(df, make_candidates(args.search, args.n_iter), args.folds, args.horizon,
+                        args.step, args.train_days, args.workers)
+    for result in search['candidates'][:10]:
+        score = "abandonné" if result['score'] is None else f"{result['score']:.4f}"
+        print(f"{score:>12}  {result['name']}{' (cache)' if result['cached'] else ''}")
+    print(f"{search['evaluated']} candidats évalués ({search['stopped']} abandonnés), "
+          f"{search['cached']} en cache : {search['wall_seconds']:.1f} s, "
+          f"CPU {search['cpu_seconds']:.1f} s, accélération x{search['speedup']} vs série "
+          f"({search['serial_seconds']:.1f} s)")
+
+    if search['best'] is None:
+        print("❌ Aucun candidat évalué sur tous les plis")
+        return 1
+    if args.dry_run:
+        print(f"Meilleur candidat : {search['best']['name']}")
+        return 0
+    artifact = publish_params(search)
+    print(f"✅ Paramètres v{artifact['version']} publiés ({search['best']['name']}, "
+          f"{artifact['metric']}={artifact['score']:.4f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
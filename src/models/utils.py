@@ -4,17 +4,29 @@ Fonctions utilitaires pour les modèles de prédiction.
 
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
-import ta
-from typing import Dict, List, Tuple, Union
+from typing import Dict, Iterator, List, Tuple, Union
 import logging
 from .config import DATA_CONFIG, TECHNICAL_INDICATORS, LOGGING_CONFIG
+from .features import compute_technical_indicators, TECHNICAL_COLUMNS
 
 # Configuration du logging
 logging.basicConfig(**LOGGING_CONFIG)
 logger = logging.getLogger(__name__)
 
+# Noms des indicateurs dans les données préparées
+INDICATOR_NAMES = {
+    'rsi': 'RSI',
+    'macd': 'MACD',
+    'macd_signal': 'MACD_signal',
+    'macd_diff': 'MACD_diff',
+    'bb_high': 'BB_high',
+    'bb_mid': 'BB_mid',
+    'bb_low': 'BB_low'
+}
+
 def prepare_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     Prépare les données pour l'entraînement en ajoutant les indicateurs techniques.
@@ -28,43 +40,10 @@ def prepare_data(df: pd.DataFrame) -> pd.DataFrame:
     try:
         df = df.copy()
         
-        # Ajout RSI
-        if 'RSI' in TECHNICAL_INDICATORS:
-            df['RSI'] = ta.momentum.RSIIndicator(
-                close=df['close_price'], 
-                window=TECHNICAL_INDICATORS['RSI']['period']
-            ).rsi()
-            
-        # Ajout MACD
-        if 'MACD' in TECHNICAL_INDICATORS:
-            macd = ta.trend.MACD(
-                close=df['close_price'],
-                window_fast=TECHNICAL_INDICATORS['MACD']['fast_period'],
-                window_slow=TECHNICAL_INDICATORS['MACD']['slow_period'],
-                window_sign=TECHNICAL_INDICATORS['MACD']['signal_period']
-            )
-            df['MACD'] = macd.macd()
-            df['MACD_signal'] = macd.macd_signal()
-            df['MACD_diff'] = macd.macd_diff()
-            
-        # Ajout Bollinger Bands
-        if 'BB' in TECHNICAL_INDICATORS:
-            bb = ta.volatility.BollingerBands(
-                close=df['close_price'],
-                window=TECHNICAL_INDICATORS['BB']['period'],
-                window_dev=TECHNICAL_INDICATORS['BB']['std_dev']
-            )
-            df['BB_high'] = bb.bollinger_hband()
-            df['BB_low'] = bb.bollinger_lband()
-            df['BB_mid'] = bb.bollinger_mavg()
-            
-        # Ajout EMA
-        if 'EMA' in TECHNICAL_INDICATORS:
-            for period in TECHNICAL_INDICATORS['EMA']['periods']:
-                df[f'EMA_{period}'] = ta.trend.EMAIndicator(
-                    close=df['close_price'],
-                    window=period
-                ).ema_indicator()
+        # Ajout RSI, MACD, Bollinger Bands et EMA (calcul partagé avec bitcoin_features)
+        indicators = compute_technical_indicators(df)
+        for col in TECHNICAL_COLUMNS:
+            df[INDICATOR_NAMES.get(col, col.replace('ta_ema_', 'EMA_'))] = indicators[col]
         
         # Suppression des lignes avec des NaN
         df = df.dropna()
@@ -75,22 +54,56 @@ def prepare_data(df: pd.DataFrame) -> pd.DataFrame:
         logger.error(f"Erreur lors de la préparation des données: {str(e)}")
         raise
 
-def create_sequences(data: np.ndarray, seq_length: int) -> Tuple[np.ndarray, np.ndarray]:
+def _sequence_views(data: np.ndarray, seq_length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Fenêtres glissantes X (vue sans copie) et cibles y de `data`."""
+    data = np.asarray(data)
+    if len(data) <= seq_length:
+        return np.empty((0, seq_length) + data.shape[1:], dtype=data.dtype), data[:0]
+    windows = sliding_window_view(data[:-1], seq_length, axis=0)
+    # sliding_window_view place la fenêtre en dernier axe : (n, features..., seq_length)
+    return np.moveaxis(windows, -1, 1), data[seq_length:]
+
+def create_sequences(data: np.ndarray, seq_length: int, copy: bool = False) -> Tuple[np.ndarray, np.ndarray]:
     """
     Crée des séquences pour l'entraînement des modèles de type séquence (LSTM).
     
+    Par défaut, X est une vue en lecture seule sur `data` (stride tricks) :
+    aucune donnée n'est copiée, quelle que soit la longueur des séquences.
+    
     Args:
-        data (np.ndarray): Données d'entrée
+        data (np.ndarray): Données d'entrée, par ordre chronologique (n, ...)
         seq_length (int): Longueur de la séquence
+        copy (bool): Matérialise X et y dans des tableaux contigus modifiables
         
     Returns:
-        Tuple[np.ndarray, np.ndarray]: Séquences X et y
+        Tuple[np.ndarray, np.ndarray]: Séquences X (n - seq_length, seq_length, ...) et y
+    """
+    X, y = _sequence_views(data, seq_length)
+    if copy:
+        return np.ascontiguousarray(X), y.copy()
+    return X, y
+
+def iter_sequences(data: np.ndarray, seq_length: int, batch_size: int = 4096,
+                   copy: bool = True) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Parcourt les séquences de `data` par lots, pour les jeux de données plus grands que la RAM.
+    
+    `data` peut être un np.memmap : seuls les lots en cours sont lus et, avec
+    copy=True, matérialisés (batch_size * seq_length valeurs par lot).
+    
+    Args:
+        data (np.ndarray): Données d'entrée, par ordre chronologique (n, ...)
+        seq_length (int): Longueur de la séquence
+        batch_size (int): Nombre de séquences par lot
+        copy (bool): Matérialise chaque lot dans des tableaux contigus
+        
+    Yields:
+        Tuple[np.ndarray, np.ndarray]: Lots de séquences X et de cibles y
     """
-    X, y = [], []
-    for i in range(len(data) - seq_length):
-        X.append(data[i:(i + seq_length)])
-        y.append(data[i + seq_length])
-    return np.array(X), np.array(y)
+    n = max(len(data) - seq_length, 0)
+    for start in range(0, n, batch_size):
+        stop = min(start + batch_size, n)
+        yield create_sequences(data[start:stop + seq_length], seq_length, copy=copy)
 
 def evaluate_predictions(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
     """
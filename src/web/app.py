@@ -5,6 +5,7 @@ import streamlit as st
 import requests
 import pandas as pd
 import plotly.graph_objects as go
+import pyarrow as pa
 from datetime import datetime, timedelta
 import google.generativeai as genai
 import os
@@ -53,8 +54,15 @@ def get_latest_price():
         st.error(f"Erreur lors de la récupération du prix : {str(e)}")
         return 0, 0
 
-def get_historical_data(days=90):
-    """Récupère l'historique des données."""
+def get_historical_data(days=90, bucket="4hour"):
+    """
+    Récupère l'historique des données, agrégé par l'API en tranches de `bucket`.
+    
+    Les bougies sont regroupées côté serveur (/prices/ohlcv) : le graphique
+    sur 3 mois reçoit une tranche de 4 heures au lieu de quatre bougies horaires.
+    La réponse est demandée au format Arrow, relu en DataFrame typé sans
+    analyse JSON ni conversion des dates.
+    """
     try:
         st.write("Tentative de récupération des données historiques...")  # Debug log
         end_date = datetime.now().strftime("%Y-%m-%d")
@@ -63,20 +71,20 @@ def get_historical_data(days=90):
         st.write(f"Dates demandées : du {start_date} au {end_date}")  # Debug log
         
         response = requests.get(
-            f"{API_URL}/prices/historical",
+            f"{API_URL}/prices/ohlcv",
             params={
+                "bucket": bucket,
                 "start_date": start_date,
                 "end_date": end_date,
-                "limit": days * 24  # Données horaires
-            }
+                "limit": (days + 1) * 24  # Borne haute : une tranche par heure au plus
+            },
+            headers={"Accept": "application/vnd.apache.arrow.stream"}
         )
         
         st.write(f"Status code historique: {response.status_code}")  # Debug log
         
         if response.status_code == 200:
-            data = pd.DataFrame(response.json())
-            data['timestamp'] = pd.to_datetime(data['timestamp'])
-            data = data.sort_values('timestamp', ascending=True)  # Tri chronologique
+            data = pa.ipc.open_stream(response.content).read_pandas()  # Déjà en ordre chronologique
             st.write(f"Nombre de données reçues: {len(data)}")  # Debug log
             
             # Vérification des données manquantes
@@ -180,6 +188,7 @@ with col1:
 
 # Données historiques
 historical_data = get_historical_data()
+recent_data = get_historical_data(days=1, bucket="1hour")  # Bougies horaires pour l'analyse 24h
 if not historical_data.empty:
     # Graphique principal (3 mois)
     st.subheader("📈 Historique du Bitcoin (3 mois)")
@@ -212,9 +221,9 @@ if not historical_data.empty:
         start_time_24h = current_time - timedelta(hours=24)
         
         # Filtrer les données des dernières 24h
-        last_24h = historical_data[
-            (historical_data['timestamp'] >= start_time_24h.strftime("%Y-%m-%d %H:%M:%S"))
-        ].copy()
+        last_24h = recent_data[
+            (recent_data['timestamp'] >= start_time_24h.strftime("%Y-%m-%d %H:%M:%S"))
+        ].copy() if not recent_data.empty else recent_data
         
         if not last_24h.empty:
             # Afficher les informations de debug
@@ -6,11 +6,15 @@ from fastapi.testclient import TestClient
 from datetime import datetime, timedelta
 import sqlite3
 import os
+import json
+import time
+from email.utils import parsedate_to_datetime
 from unittest.mock import patch, MagicMock
 import pandas as pd
 import numpy as np
 
-from src.api.main import app, get_prophet_model
+from src.api.main import app, get_prophet_model, forecast_cache, http_cache
+from src.api import executors
 from src.data.collector import BitcoinDataCollector
 from src.models.prophet_model import BitcoinProphetModel
 from src.models.config import MODEL_PATHS
@@ -43,7 +47,9 @@ def session_db():
             volume_buy REAL,
             transactions INTEGER,
             transactions_buy INTEGER,
-            UNIQUE(timestamp)
+            symbol TEXT NOT NULL DEFAULT 'BTCUSDC.A',
+            interval TEXT NOT NULL DEFAULT '1hour',
+            UNIQUE(symbol, interval, timestamp)
         );
     """)
     
@@ -126,12 +132,18 @@ def trained_model(session_db):
     return model
 
 @pytest.fixture
-def client(mock_model):
+def client(mock_model, monkeypatch):
     """Fixture pour créer un client de test."""
+    # Le mock n'est pas sérialisable : prévisions dans un thread plutôt qu'un processus
+    monkeypatch.setattr(executors, "API_FORECAST_EXECUTOR", "thread")
+    executors.shutdown_executors()
     app.dependency_overrides[get_prophet_model] = lambda: mock_model
+    forecast_cache.clear()
+    http_cache.clear()
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
+    executors.shutdown_executors()
 
 @pytest.fixture
 def sample_data(session_db):
@@ -216,8 +228,41 @@ def test_get_price_stats(client, sample_data):
         assert "max_price" in data
         assert "avg_price" in data
         assert data["period"] == period
+    
+    # Périodes libres et plage personnalisée, VWAP et ratio acheteurs/vendeurs
+    response = client.get("/api/v1/prices/stats?period=1y")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["data_points"] == 30
+    assert data["min_price"] <= data["vwap"] <= data["max_price"]
+    assert data["buy_sell_ratio"] == pytest.approx(1.5)
+    
+    start_date = (datetime.now() - timedelta(days=9)).strftime("%Y-%m-%d")
+    end_date = (datetime.now() - timedelta(days=5)).strftime("%Y-%m-%d")
+    response = client.get(f"/api/v1/prices/stats?start_date={start_date}&end_date={end_date}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["data_points"] == 5
+    assert data["period"] == f"{start_date}/{end_date}"
+    
+    # Période sans bougie
+    response = client.get("/api/v1/prices/stats?start_date=2001-01-01&end_date=2001-01-31")
+    assert response.status_code == 404
+    response = client.get("/api/v1/prices/stats?period=24h&symbol=INCONNU")
+    assert response.status_code == 404
+
+def test_markets_and_symbol_filter(client, sample_data):
+    """Test de la liste des marchés et du filtrage par symbole."""
+    response = client.get("/api/v1/markets")
+    assert response.status_code == 200
+    markets = response.json()
+    assert {"symbol": "BTCUSDC.A", "interval": "1hour"}.items() <= markets[0].items()
+    
+    response = client.get("/api/v1/prices/historical?symbol=ETHUSDT.A")
+    assert response.status_code == 200
+    assert response.json() == []
 
-def test_predict_prices(client, mock_model):
+def test_predict_prices(client, mock_model, sample_data):
     """Test des prédictions de prix."""
     # Test de prédiction simple
     request_data = {"horizon": 7, "return_components": False}
@@ -242,7 +287,7 @@ def test_predict_prices(client, mock_model):
     assert "trend" in data["components"]
     assert len(data["dates"]) == 5
 
-def test_model_info(client):
+def test_model_info(client, tmp_path):
     """Test des informations du modèle."""
     response = client.get("/api/v1/model/info")
     assert response.status_code == 200
@@ -253,6 +298,18 @@ def test_model_info(client):
     assert "metrics" in data
     assert "last_training" in data
     assert "features" in data
+    
+    # Métriques servies depuis le rapport de backtest
+    from src.models.backtest import save_report
+    report_path = str(tmp_path / "backtest.json")
+    save_report({
+        "generated_at": "2024-01-10 00:00:00", "data_end": "2024-01-09 23:00:00", "horizon": 7,
+        "folds": [{}, {}], "wall_seconds": 12.5, "metrics": {"RMSE": 810.0, "MAE": 640.0, "MAPE": 1.5, "R2": 0.2}
+    }, report_path)
+    with patch.dict(MODEL_PATHS, {"BACKTEST": report_path}):
+        data = client.get("/api/v1/model/info").json()
+    assert data["metrics"] == {"rmse": 810.0, "mae": 640.0, "mape": 1.5}
+    assert data["backtest"]["folds"] == 2
 
 def test_error_handling(client, mock_model):
     """Test de la gestion des erreurs."""
@@ -274,4 +331,339 @@ def test_error_handling(client, mock_model):
 
     # Test avec une période invalide
     response = client.get("/api/v1/prices/stats?period=invalid")
-    assert response.status_code == 400 
\ No newline at end of file
+    assert response.status_code == 400
+
+    # Test avec un intervalle invalide
+    response = client.get("/api/v1/prices/latest?interval=3hour")
+    assert response.status_code == 400
+
+
+def test_executor_backpressure(client, sample_data, monkeypatch):
+    """Test du rejet en 429 lorsque la file d'un exécuteur est pleine."""
+    import asyncio
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    release = threading.Event()
+    bounded = executors.BoundedExecutor(ThreadPoolExecutor(max_workers=1), 1, "db")
+
+    async def saturate():
+        blocked = asyncio.ensure_future(bounded.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(executors.QueueFullError):
+            await bounded.run(lambda: None)
+        release.set()
+        await blocked
+        # Le créneau est libéré une fois la tâche terminée
+        assert await bounded.run(lambda: 42) == 42
+
+    asyncio.run(saturate())
+    bounded.shutdown()
+
+    # Une file pleine est répondue en 429 par l'API
+    full = executors.BoundedExecutor(ThreadPoolExecutor(max_workers=1), 1, "db")
+    full._slots.acquire()
+    monkeypatch.setitem(executors._executors, "db", full)
+    response = client.get("/api/v1/prices/latest")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+def test_forecast_cache(client, mock_model, session_db, sample_data):
+    """Test du cache des prévisions et de son invalidation par une nouvelle bougie."""
+    first = client.post("/api/v1/predict", json={"horizon": 3})
+    second = client.post("/api/v1/predict", json={"horizon": 3})
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert mock_model.predict.call_count == 1
+
+    # Paramètres différents : nouvelle entrée
+    client.post("/api/v1/predict", json={"horizon": 3, "return_components": True})
+    assert mock_model.predict.call_count == 2
+
+    # Le collecteur remplace la dernière bougie : le cache est invalidé
+    conn = sqlite3.connect(session_db)
+    conn.execute("""
+        INSERT OR REPLACE INTO bitcoin_prices
+        (timestamp, open_price, high_price, low_price, close_price,
+         volume, volume_buy, transactions, transactions_buy, symbol, interval)
+        SELECT timestamp, open_price, high_price, low_price, close_price,
+               volume, volume_buy, transactions, transactions_buy, symbol, interval
+        FROM bitcoin_prices ORDER BY timestamp DESC LIMIT 1
+    """)
+    conn.commit()
+    conn.close()
+    client.post("/api/v1/predict", json={"horizon": 3})
+    assert mock_model.predict.call_count == 3
+
+    stats = client.get("/api/v1/cache/stats").json()["forecast"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["invalidations"] == 1
+
+def test_get_ohlcv(client, sample_data):
+    """Test de l'agrégation OHLCV par tranches de temps."""
+    response = client.get("/api/v1/prices/ohlcv?bucket=daily")
+    assert response.status_code == 200
+    assert response.headers["X-OHLCV-Source"] == "aggregate"  # Base de test sans table d'agrégats
+    bars = response.json()
+    assert len(bars) == 30 and all(bar["candles"] == 1 for bar in bars)
+    assert [bar["timestamp"] for bar in bars] == sorted(bar["timestamp"] for bar in bars)
+    assert bars[-1]["timestamp"].endswith("00:00:00")
+    
+    response = client.get("/api/v1/prices/ohlcv?bucket=7d&limit=2")
+    assert response.status_code == 200
+    bars = response.json()
+    assert len(bars) == 2 and sum(bar["candles"] for bar in bars) <= 14
+    last_week = bars[-1]
+    assert last_week["high_price"] >= max(last_week["open_price"], last_week["close_price"])
+    
+    end_date = datetime.now().strftime("%Y-%m-%d")
+    start_date = (datetime.now() - timedelta(days=6)).strftime("%Y-%m-%d")
+    response = client.get(f"/api/v1/prices/ohlcv?bucket=3h&start_date={start_date}&end_date={end_date}")
+    assert response.status_code == 200
+    assert len(response.json()) == 7
+    
+    for params in ["bucket=weekly", "bucket=0h", "bucket=90s", "interval=daily&bucket=4hour", "limit=0"]:
+        response = client.get(f"/api/v1/prices/ohlcv?{params}")
+        assert response.status_code == 400, params
+
+def test_historical_pagination_and_streaming(client, sample_data, monkeypatch):
+    """Test de la pagination par curseur et des exports NDJSON/CSV en flux."""
+    import src.api.main as api_main
+    
+    # Pagination : pages disjointes, dans l'ordre, jusqu'à épuisement
+    timestamps, cursor = [], None
+    for _ in range(5):
+        response = client.get("/api/v1/prices/historical", params={"limit": 12, "cursor": cursor})
+        assert response.status_code == 200
+        timestamps += [row["timestamp"] for row in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert len(timestamps) == 30
+    assert timestamps == sorted(timestamps, reverse=True)
+    
+    # Export en flux, lu par pages de 7 lignes
+    monkeypatch.setattr(api_main, "HISTORY_STREAM_CHUNK", 7)
+    response = client.get("/api/v1/prices/historical?format=ndjson&order=asc")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["timestamp"] for row in rows] == sorted(timestamps)
+    assert rows[0].keys() == {
+        "timestamp", "open_price", "high_price", "low_price", "close_price",
+        "volume", "volume_buy", "transactions", "transactions_buy"
+    }
+    
+    response = client.get(f"/api/v1/prices/historical?format=csv&limit=10&cursor={timestamps[4]}")
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0].startswith("timestamp,open_price") and len(lines) == 11
+    assert [line.split(",")[0] for line in lines[1:]] == timestamps[5:15]
+    
+    for params in ["format=xml", "order=up", "cursor=hier", "limit=0"]:
+        response = client.get(f"/api/v1/prices/historical?{params}")
+        assert response.status_code == 400, params
+
+def test_columnar_formats(client, sample_data):
+    """Test des formats en colonnes (JSON par colonnes, Arrow IPC) et de la négociation de contenu."""
+    import pyarrow as pa
+    
+    rows = client.get("/api/v1/prices/historical?limit=20").json()
+    expected = pd.DataFrame(rows)
+    
+    response = client.get("/api/v1/prices/historical?limit=20&format=columns")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.bitcoin-trends.columns+json"
+    assert "X-Next-Cursor" in response.headers
+    pd.testing.assert_frame_equal(pd.DataFrame(response.json()), expected, check_dtype=False)
+    
+    # Arrow choisi par l'en-tête Accept, préféré au JSON par sa q-valeur
+    response = client.get("/api/v1/prices/historical?limit=20", headers={
+        "Accept": "application/json;q=0.5, application/vnd.apache.arrow.stream"
+    })
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    assert response.headers["vary"] == "Accept"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.schema.field("timestamp").type == pa.timestamp("us")
+    frame = table.to_pandas()
+    assert (frame["timestamp"] == pd.to_datetime(expected["timestamp"])).all()
+    pd.testing.assert_frame_equal(frame.drop(columns="timestamp"), expected.drop(columns="timestamp"),
+                                  check_dtype=False)
+    
+    bars = client.get("/api/v1/prices/ohlcv?bucket=7d").json()
+    table = pa.ipc.open_stream(client.get("/api/v1/prices/ohlcv?bucket=7d&format=arrow").content).read_all()
+    assert table.column("candles").to_pylist() == [bar["candles"] for bar in bars]
+    columns = client.get("/api/v1/prices/ohlcv?bucket=7d&format=columns").json()
+    assert columns["close_price"] == [bar["close_price"] for bar in bars]
+    
+    assert client.get("/api/v1/prices/ohlcv?format=csv").status_code == 400
+
+def test_http_cache(client, session_db, sample_data, monkeypatch):
+    """Test du cache HTTP : ETag, Last-Modified, réponses 304 et invalidation par le filigrane d'écriture."""
+    def replace_last_candle(delta):
+        conn = sqlite3.connect(session_db)
+        conn.execute("""
+            INSERT OR REPLACE INTO bitcoin_prices
+            (timestamp, open_price, high_price, low_price, close_price,
+             volume, volume_buy, transactions, transactions_buy, symbol, interval)
+            SELECT timestamp, open_price, high_price, low_price, close_price + ?,
+                   volume, volume_buy, transactions, transactions_buy, symbol, interval
+            FROM bitcoin_prices ORDER BY timestamp DESC LIMIT 1
+        """, (delta,))
+        conn.commit()
+        conn.close()
+    
+    first = client.get("/api/v1/prices/latest")
+    second = client.get("/api/v1/prices/latest")
+    assert first.status_code == second.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('"') and second.headers["ETag"] == etag
+    assert first.headers["Cache-Control"] == "max-age=60"
+    
+    # Requêtes conditionnelles
+    response = client.get("/api/v1/prices/latest", headers={"If-None-Match": etag})
+    assert response.status_code == 304 and response.content == b""
+    assert response.headers["ETag"] == etag
+    response = client.get("/api/v1/prices/latest", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert response.status_code == 304
+    response = client.get("/api/v1/prices/latest", headers={"If-None-Match": '"autre"'})
+    assert response.status_code == 200 and response.json() == first.json()
+    
+    # Représentations distinctes selon les paramètres et l'en-tête Accept
+    json_page = client.get("/api/v1/prices/historical?limit=5")
+    columns_page = client.get("/api/v1/prices/historical?limit=5", headers={
+        "Accept": "application/vnd.bitcoin-trends.columns+json"
+    })
+    assert json_page.headers["ETag"] != columns_page.headers["ETag"]
+    assert columns_page.headers["content-type"] == "application/vnd.bitcoin-trends.columns+json"
+    assert "ETag" not in client.get("/api/v1/prices/historical?format=ndjson&limit=5").headers
+    
+    # Bougie réécrite à l'identique : cache invalidé, même représentation donc toujours 304
+    replace_last_candle(0.0)
+    response = client.get("/api/v1/prices/latest", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    # Bougie modifiée : nouvelle représentation
+    replace_last_candle(1.0)
+    try:
+        response = client.get("/api/v1/prices/latest", headers={"If-None-Match": etag})
+        assert response.status_code == 200 and response.headers["ETag"] != etag
+        assert response.json()["close_price"] == pytest.approx(first.json()["close_price"] + 1.0)
+    finally:
+        replace_last_candle(-1.0)
+    
+    stats = client.get("/api/v1/cache/stats").json()["http"]
+    latest = stats["routes"]["/api/v1/prices/latest"]
+    assert (latest["hits"], latest["misses"], latest["not_modified"]) == (4, 3, 3)
+    assert latest["hit_rate"] == pytest.approx(4 / 7, abs=1e-4)
+    assert stats["invalidations"] == 2
+    
+    # Validateur faible d'un cache intermédiaire : comparaison faible
+    response = client.get("/api/v1/prices/latest", headers={"If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+    
+    # Corps recalculé après expiration du TTL : Last-Modified rafraîchi
+    monkeypatch.setattr(http_cache, "ttl", 0)
+    time.sleep(1.1)
+    response = client.get("/api/v1/prices/latest", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert response.status_code == 200
+    assert parsedate_to_datetime(response.headers["Last-Modified"]) > parsedate_to_datetime(first.headers["Last-Modified"])
+
+def test_legacy_database_migrated_at_startup(tmp_path, monkeypatch):
+    """Base au schéma historique (sans symbol/interval) : migrée au démarrage, lue par le pool en lecture seule."""
+    db_file = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_file)
+    conn.execute("""
+        CREATE TABLE bitcoin_prices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TIMESTAMP NOT NULL,
+            open_price REAL NOT NULL,
+            high_price REAL NOT NULL,
+            low_price REAL NOT NULL,
+            close_price REAL NOT NULL,
+            volume REAL,
+            volume_buy REAL,
+            transactions INTEGER,
+            transactions_buy INTEGER,
+            UNIQUE(timestamp)
+        )
+    """)
+    conn.execute("""
+        INSERT INTO bitcoin_prices
+        (timestamp, open_price, high_price, low_price, close_price, volume, volume_buy, transactions, transactions_buy)
+        VALUES ('2024-01-01 00:00:00', 1.0, 2.0, 0.5, 1.5, 10.0, 5.0, 3, 1)
+    """)
+    conn.commit()
+    conn.close()
+    
+    monkeypatch.setattr(data_config, "DB_FILE", db_file)
+    http_cache.clear()
+    with TestClient(app) as client:
+        response = client.get("/api/v1/prices/latest")
+    assert response.status_code == 200
+    assert response.json()["close_price"] == 1.5
+
+def test_price_stats_utc_candles_under_local_timezone(tmp_path, monkeypatch):
+    """Bougies horodatées en UTC : stats relatives à maintenant complètes sous un fuseau local à décalage négatif."""
+    from datetime import timezone
+    db_file = str(tmp_path / "utc.db")
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    rows = [
+        ((now - timedelta(hours=h)).strftime('%Y-%m-%d %H:%M:%S'), 100.0, 101.0, 99.0, 100.5, 10.0, 5.0, 3, 1)
+        for h in range(10)
+    ]
+    monkeypatch.setattr(data_config, "DB_FILE", db_file)
+    collector = BitcoinDataCollector()
+    collector.connect_db()
+    collector.save_price_data(rows)
+    collector.close()
+    
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        http_cache.clear()
+        with TestClient(app) as client:
+            response = client.get("/api/v1/prices/stats?period=24h")
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+    assert response.status_code == 200
+    assert response.json()["data_points"] == 10
+
+def test_db_pool_opens_no_writer_on_current_schema(tmp_path, monkeypatch):
+    """Base au schéma courant : vérifiée en lecture seule, sans connexion d'écriture ni passage en WAL."""
+    from fastapi import HTTPException
+    from src.api import main as api
+    from src.data.config import PRICE_TABLE_SCHEMA
+    db_file = str(tmp_path / "current.db")
+    conn = sqlite3.connect(db_file)
+    conn.execute(PRICE_TABLE_SCHEMA)
+    conn.commit()
+    conn.close()
+    
+    writer = MagicMock(side_effect=sqlite3.OperationalError("attempt to write a readonly database"))
+    monkeypatch.setattr(api, "connect_writer", writer)
+    monkeypatch.setattr(data_config, "DB_FILE", db_file)
+    api.close_db_pool()
+    try:
+        with api.get_db_pool().connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM bitcoin_prices").fetchone()[0] == 0
+        assert not writer.called
+        conn = sqlite3.connect(db_file)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+        conn.close()
+        
+        # Schéma historique sur une base non inscriptible : erreur explicite pour l'opérateur
+        conn = sqlite3.connect(db_file)
+        conn.execute("DROP TABLE bitcoin_prices")
+        conn.execute("CREATE TABLE bitcoin_prices (id INTEGER PRIMARY KEY, timestamp TIMESTAMP NOT NULL)")
+        conn.commit()
+        conn.close()
+        api.close_db_pool()
+        with pytest.raises(HTTPException) as error:
+            api.get_db_pool()
+        assert writer.called
+        assert "python -m src.data.collector" in error.value.detail
+    finally:
+        api.close_db_pool()
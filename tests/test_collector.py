@@ -4,10 +4,33 @@ Tests du collecteur de données Bitcoin.
 import pytest
 import sqlite3
 import os
-from datetime import datetime
+import json
+import asyncio
+import threading
+import time
+import httpx
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
 from unittest.mock import patch, MagicMock
 
 from src.data.collector import BitcoinDataCollector
+from src.data.backfill import AdaptiveWindowSizer, BackfillEngine, TokenBucket, plan_windows, subtract_ranges
+from src.data.live_collector import LiveCollector, next_candle_close
+from src.data.storage import (
+    ConnectionPool,
+    connect_reader,
+    connect_writer,
+    load_indicator_state,
+    read_recent_candles
+)
+from src.data import feature_store
+from src.data.feature_store import check_features, read_features
+from src.data import rollups
+from src.data.rollups import check_rollups, read_ohlcv, read_stats
+from src.models.indicator_state import IndicatorState
 from src.data import config as data_config
 
 @pytest.fixture
@@ -102,6 +125,53 @@ def test_database_connection(collector):
     """)
     assert collector.db_cursor.fetchone() is not None
 
+def test_storage_connections(tmp_path):
+    """Test de la couche de stockage : écrivain en WAL, lecteurs en lecture seule."""
+    db_file = str(tmp_path / "storage.db")
+    writer = connect_writer(db_file)
+    reader = connect_reader(db_file)
+    try:
+        assert writer.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert writer.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        
+        writer.execute("""
+            INSERT INTO bitcoin_prices (timestamp, open_price, high_price, low_price, close_price)
+            VALUES ('2024-01-01 00:00:00', 1, 1, 1, 1)
+        """)
+        writer.commit()
+        assert reader.execute("SELECT COUNT(*) FROM bitcoin_prices").fetchone()[0] == 1
+        with pytest.raises(sqlite3.OperationalError):
+            reader.execute("DELETE FROM bitcoin_prices")
+
+        # Lecture bornée et typée des dernières bougies, par ordre chronologique
+        writer.executemany("""
+            INSERT INTO bitcoin_prices (timestamp, open_price, high_price, low_price, close_price)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(f'2024-01-01 0{h}:00:00', h, h, h, h) for h in range(1, 4)])
+        writer.commit()
+        df = read_recent_candles(reader, limit=2)
+        assert df["close_price"].tolist() == [2.0, 3.0]
+        assert str(df["timestamp"].dtype) == "datetime64[ns]"
+        assert df["volume"].dtype == np.float64 and df["volume"].isna().all()
+    finally:
+        reader.close()
+        writer.close()
+
+def test_connection_pool(tmp_path):
+    """Test du pool de lecture : réutilisation des connexions et attente bornée."""
+    db_file = str(tmp_path / "pool.db")
+    connect_writer(db_file).close()
+    pool = ConnectionPool(db_file, size=1, timeout=0.05)
+    try:
+        with pool.connection() as first:
+            assert first.execute("SELECT COUNT(*) FROM bitcoin_prices").fetchone()[0] == 0
+            with pytest.raises(TimeoutError):
+                pool.acquire()
+        with pool.connection() as second:
+            assert second is first
+    finally:
+        pool.close()
+
 def test_data_collection(collector):
     """Test de la collecte et sauvegarde des données."""
     mock_response = MagicMock()
@@ -145,4 +215,578 @@ def test_data_collection(collector):
         print(f"Volume: {last_record[6]}")
         print(f"Volume Buy: {last_record[7]}")
         print(f"Trades: {last_record[8]}")
-        print(f"Trades Buy: {last_record[9]}") 
\ No newline at end of file
+        print(f"Trades Buy: {last_record[9]}") 
+
+class _StubCoinalyzeHandler(BaseHTTPRequestHandler):
+    """Serveur HTTP local imitant l'endpoint ohlcv-history de Coinalyze."""
+    
+    requests_count = 0
+    max_points = None
+    rate_limited = 0  # Nombre de 429 renvoyés avant de répondre
+    
+    def do_GET(self):
+        type(self).requests_count += 1
+        if type(self).rate_limited > 0:
+            type(self).rate_limited -= 1
+            self.send_response(429)
+            self.send_header("Retry-After", "0.3")
+            self.end_headers()
+            return
+        query = parse_qs(urlparse(self.path).query)
+        start, end = int(query["from"][0]), int(query["to"][0])
+        first = start - start % 3600 + (3600 if start % 3600 else 0)
+        history = [
+            {"t": t, "o": 100.0, "h": 101.0, "l": 99.0, "c": 100.5,
+             "v": 10.0, "vb": 5.0, "n": 3, "nb": 1}
+            for t in range(first, end + 1, 3600)
+        ][:self.max_points]
+        body = json.dumps([
+            {"symbol": symbol, "history": history}
+            for symbol in query["symbols"][0].split(",")
+        ]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_server():
+    """Fixture démarrant un serveur Coinalyze local."""
+    _StubCoinalyzeHandler.requests_count = 0
+    _StubCoinalyzeHandler.max_points = None
+    _StubCoinalyzeHandler.rate_limited = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubCoinalyzeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+def test_plan_windows():
+    """Test du découpage de la période en fenêtres contiguës."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    windows = plan_windows(start, start + timedelta(days=10), 3)
+    assert len(windows) == 4
+    assert windows[0] == (start, start + timedelta(days=3))
+    assert windows[-1][1] == start + timedelta(days=10)
+
+def test_subtract_ranges():
+    """Test du retrait des fenêtres déjà validées."""
+    day = lambda d: datetime(2024, 1, d, tzinfo=timezone.utc)
+    remaining = subtract_ranges([(day(1), day(10))], [(day(3), day(4)), (day(8), day(12))])
+    assert remaining == [
+        (day(1), day(3) - timedelta(seconds=1)),
+        (day(4) + timedelta(seconds=1), day(8) - timedelta(seconds=1)),
+    ]
+
+def test_adaptive_window_sizer():
+    """Test de l'ajustement de la taille des fenêtres."""
+    sizer = AdaptiveWindowSizer(interval_seconds=3600, max_points=100, fill_ratio=0.9)
+    assert sizer.size_seconds == 90 * 3600
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    
+    # Troncature : la fenêtre rétrécit et la suite doit être redemandée
+    assert sizer.record(start, start + timedelta(hours=150), 100) is True
+    assert sizer.size_seconds == 45 * 3600
+    
+    # Réponse peu remplie : la fenêtre grandit
+    assert sizer.record(start, start + timedelta(hours=45), 10) is False
+    assert sizer.size_seconds == 90 * 3600
+    
+    sizer.record_rate_limited()
+    summary = sizer.summary()
+    assert summary["round_trips"] == 3
+    assert summary["truncations"] == 1
+    assert summary["rate_limited"] == 1
+
+def test_token_bucket_limits_rate():
+    """Test du limiteur : au-delà de la rafale, le débit est respecté."""
+    bucket = TokenBucket(rate=50, capacity=1)
+    started = datetime.now()
+    for _ in range(6):
+        bucket.acquire()
+    assert (datetime.now() - started).total_seconds() >= 0.09
+
+def test_concurrent_backfill(tmp_path, stub_server):
+    """Test du backfill concurrent contre un serveur HTTP local."""
+    db_file = str(tmp_path / "backfill.db")
+    with patch("src.data.config.DB_FILE", db_file):
+        collector = BitcoinDataCollector(base_url=stub_server)
+        collector.connect_db()
+        try:
+            start_date = (datetime.now(timezone.utc) - timedelta(days=12)).strftime("%Y-%m-%d")
+            stats = collector.fetch_historical_data(
+                start_date=start_date, batch_size=2, workers=4, rate_per_minute=6000
+            )
+            
+            collector.db_cursor.execute("SELECT COUNT(*) FROM bitcoin_prices;")
+            count = collector.db_cursor.fetchone()[0]
+        finally:
+            collector.close()
+    
+    assert stats["batches"] >= 6
+    assert not stats["failed_windows"]
+    assert stats["rows"] >= count >= 12 * 24
+    assert stats["rows_per_sec"] > 0
+
+def test_backfill_write_error_stops_pipeline():
+    """Test d'une erreur d'écriture : run() la propage au lieu de rester bloqué sur la file pleine."""
+    def write_batch(window, rows):
+        # Laisse les workers remplir la file avant d'échouer
+        time.sleep(0.2)
+        raise sqlite3.OperationalError("database is locked")
+
+    engine = BackfillEngine(lambda start, end: [(start, end)], write_batch, workers=4, queue_size=16)
+    windows = [(i, i + 1) for i in range(500)]
+    outcome = {}
+
+    def run():
+        try:
+            engine.run(windows)
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert isinstance(outcome.get("error"), sqlite3.OperationalError)
+
+def test_find_missing_ranges(collector):
+    """Test de la détection des trous dans la série horaire."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        ((start + timedelta(hours=h)).strftime('%Y-%m-%d %H:%M:%S'),
+         1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1, 1)
+        for h in list(range(0, 10)) + list(range(15, 24))
+    ]
+    collector.save_price_data(rows)
+    
+    missing = collector.find_missing_ranges(start, start + timedelta(hours=30))
+    assert missing == [
+        (start + timedelta(hours=10), start + timedelta(hours=14)),
+        (start + timedelta(hours=24), start + timedelta(hours=30)),
+    ]
+
+def test_resumable_backfill(tmp_path, stub_server):
+    """Test de la reprise : un second backfill ne refait pas les fenêtres validées."""
+    db_file = str(tmp_path / "resume.db")
+    start_date = (datetime.now(timezone.utc) - timedelta(days=6)).strftime("%Y-%m-%d")
+    with patch("src.data.config.DB_FILE", db_file):
+        collector = BitcoinDataCollector(base_url=stub_server)
+        collector.connect_db()
+        try:
+            # Simule un trou au milieu de la série (ex. crash du backfill)
+            first = collector.fetch_historical_data(start_date=start_date, batch_size=2, rate_per_minute=6000)
+            collector.db_cursor.execute("""
+                DELETE FROM bitcoin_prices
+                WHERE timestamp >= datetime(?, '+2 days') AND timestamp < datetime(?, '+3 days')
+            """, (start_date, start_date))
+            collector.db_cursor.execute("DELETE FROM backfill_checkpoints")
+            collector.db_conn.commit()
+            
+            _StubCoinalyzeHandler.requests_count = 0
+            second = collector.fetch_historical_data(start_date=start_date, batch_size=2, rate_per_minute=6000)
+            collector.db_cursor.execute("SELECT COUNT(*) FROM bitcoin_prices;")
+            count = collector.db_cursor.fetchone()[0]
+        finally:
+            collector.close()
+    
+    assert first["batches"] >= 3
+    assert second["rows"] >= 24
+    assert _StubCoinalyzeHandler.requests_count <= 2
+    assert count >= 6 * 24
+
+def test_adaptive_backfill_handles_truncation(tmp_path, stub_server):
+    """Test du backfill adaptatif contre un endpoint qui tronque ses réponses."""
+    _StubCoinalyzeHandler.max_points = 50
+    db_file = str(tmp_path / "adaptive.db")
+    start_date = (datetime.now(timezone.utc) - timedelta(days=10)).strftime("%Y-%m-%d")
+    with patch("src.data.config.DB_FILE", db_file), \
+         patch("src.data.collector.COINALYZE_MAX_POINTS", 40):
+        collector = BitcoinDataCollector(base_url=stub_server)
+        collector.connect_db()
+        try:
+            stats = collector.fetch_historical_data(start_date=start_date, rate_per_minute=6000)
+            collector.db_cursor.execute("SELECT COUNT(*) FROM bitcoin_prices;")
+            count = collector.db_cursor.fetchone()[0]
+        finally:
+            collector.close()
+    
+    assert count >= 10 * 24
+    assert stats["round_trips"] == _StubCoinalyzeHandler.requests_count
+    # La capacité réelle (50) est apprise : moins d'allers-retours que de jours
+    assert stats["round_trips"] < 10
+    assert stats["window_hours_max"] >= 36
+
+def test_legacy_schema_migration(collector):
+    """Test de la migration de l'ancienne table vers le schéma multi-marchés."""
+    collector.db_cursor.execute("PRAGMA table_info(bitcoin_prices)")
+    columns = [row[1] for row in collector.db_cursor.fetchall()]
+    assert "symbol" in columns
+    assert "interval" in columns
+
+def test_multi_symbol_backfill(tmp_path, stub_server):
+    """Test du backfill de plusieurs marchés, regroupés dans les mêmes requêtes."""
+    db_file = str(tmp_path / "markets.db")
+    symbols = ["BTCUSDC.A", "ETHUSDT.A", "SOLUSDT.A"]
+    start_date = (datetime.now(timezone.utc) - timedelta(days=4)).strftime("%Y-%m-%d")
+    with patch("src.data.config.DB_FILE", db_file):
+        collector = BitcoinDataCollector(base_url=stub_server, symbols=symbols, intervals=["1hour"])
+        collector.connect_db()
+        try:
+            stats = collector.fetch_historical_data(start_date=start_date, batch_size=2, rate_per_minute=6000)
+            collector.db_cursor.execute("""
+                SELECT symbol, interval, COUNT(*) FROM bitcoin_prices
+                GROUP BY symbol, interval ORDER BY symbol
+            """)
+            counts = collector.db_cursor.fetchall()
+        finally:
+            collector.close()
+    
+    assert [c[0] for c in counts] == sorted(symbols)
+    assert all(c[1] == "1hour" and c[2] >= 4 * 24 for c in counts)
+    # Un aller-retour par fenêtre, quel que soit le nombre de symboles
+    assert _StubCoinalyzeHandler.requests_count == stats["batches"]
+
+def test_indicator_state_on_ingest(tmp_path):
+    """Test de l'état des indicateurs tenu à jour par le collecteur à l'ingestion."""
+    db_file = str(tmp_path / "state.db")
+    start = datetime(2024, 1, 1)
+    row = lambda h, price: (
+        (start + timedelta(hours=h)).strftime('%Y-%m-%d %H:%M:%S'),
+        price, price, price, price, 10.0 + h, 5.0, 3, 1
+    )
+    with patch("src.data.config.DB_FILE", db_file):
+        collector = BitcoinDataCollector()
+        collector.connect_db()
+        try:
+            collector.save_price_data([row(h, 100.0 + h) for h in range(10, 40)])
+            collector.save_price_data([row(h, 150.0 - h) for h in range(40, 45)])  # Avance O(1)
+            collector.save_price_data([row(44, 120.0)])  # Révision de la dernière bougie
+            collector.save_price_data([row(h, 90.0) for h in range(0, 10)])  # Backfill : reconstruction
+            
+            stored = IndicatorState.from_dict(load_indicator_state(collector.db_conn))
+            expected = IndicatorState.from_frame(read_recent_candles(collector.db_conn))
+        finally:
+            collector.close()
+    
+    assert stored.last_timestamp == expected.last_timestamp == row(44, 0)[0]
+    for col, value in expected.features().items():
+        if col != "ds":
+            assert stored.features()[col] == pytest.approx(value, rel=1e-9), col
+
+def test_feature_table_on_ingest(tmp_path):
+    """Test de la table bitcoin_features tenue à jour à l'ingestion, reconstruite et vérifiée."""
+    db_file = str(tmp_path / "features.db")
+    start = datetime(2024, 1, 1)
+    rng = np.random.default_rng(0)
+    prices = 30000 + np.cumsum(rng.normal(0, 50, 3000))
+    row = lambda h: (
+        (start + timedelta(hours=h)).strftime('%Y-%m-%d %H:%M:%S'),
+        prices[h], prices[h] + 10, prices[h] - 10, prices[h], 100.0 + h % 7, 50.0, 3, 1
+    )
+    with patch("src.data.config.DB_FILE", db_file):
+        collector = BitcoinDataCollector()
+        collector.connect_db()
+        try:
+            collector.save_price_data([row(h) for h in range(500, 2990)])
+            for h in range(2990, 3000):  # Ingestion temps réel : fenêtre de chauffe seulement
+                collector.save_price_data([row(h)])
+            collector.save_price_data([row(h) for h in range(0, 500)])  # Backfill dans le passé
+            report = check_features(collector.db_conn)
+            
+            # Une valeur corrompue est détectée, puis corrigée par la reconstruction
+            collector.db_conn.execute("UPDATE bitcoin_features SET rsi = 0 WHERE timestamp = ?", (row(2000)[0],))
+            collector.db_conn.commit()
+            assert check_features(collector.db_conn)["mismatched"] == {"rsi": 1}
+        finally:
+            collector.close()
+        
+        assert feature_store.main(["rebuild"]) == 0
+        assert feature_store.main(["check"]) == 0
+        conn = connect_reader(db_file)
+        features = read_features(conn, limit=300)
+        conn.close()
+    
+    assert report["ok"], report
+    assert report["rows"] == report["candles"] == 3000
+    assert len(features) == 300 and features["timestamp"].is_monotonic_increasing
+    assert features["rsi"].notna().all()
+
+def test_next_candle_close():
+    """Test de l'alignement sur la clôture de bougie suivante."""
+    close = datetime(2024, 1, 1, 11, tzinfo=timezone.utc).timestamp()
+    assert next_candle_close(close - 1800, 3600) == close
+    assert next_candle_close(close, 3600) == close + 3600
+
+def test_live_poll_once(tmp_path, stub_server):
+    """Test d'une interrogation temps réel : bougie clôturée enregistrée et retard mesuré."""
+    db_file = str(tmp_path / "live.db")
+    symbols = ["BTCUSDC.A", "ETHUSDT.A"]
+    close_ts = next_candle_close(datetime.now(timezone.utc).timestamp(), 3600) - 3600
+    
+    async def poll(live):
+        async with httpx.AsyncClient() as client:
+            return await live.poll_once(client, "1hour", tuple(symbols), close_ts)
+    
+    with patch("src.data.config.DB_FILE", db_file):
+        collector = BitcoinDataCollector(symbols=symbols, intervals=["1hour"])
+        collector.connect_db(check_same_thread=False)
+        try:
+            live = LiveCollector(collector, base_url=stub_server)
+            saved = asyncio.run(poll(live))
+            collector.db_cursor.execute("SELECT MAX(timestamp) FROM bitcoin_prices")
+            last = collector.db_cursor.fetchone()[0]
+        finally:
+            collector.close()
+    
+    assert saved == 4  # Deux bougies par symbole, une seule requête
+    assert _StubCoinalyzeHandler.requests_count == 1
+    assert last == datetime.fromtimestamp(close_ts - 3600, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    assert 0 <= live.lag[("ETHUSDT.A", "1hour")] < 3600
+
+def test_live_poll_recovers_from_errors(tmp_path, stub_server):
+    """Test des erreurs d'une interrogation : 429 avec Retry-After puis écriture en échec, retentés."""
+    db_file = str(tmp_path / "live_errors.db")
+    close_ts = next_candle_close(datetime.now(timezone.utc).timestamp(), 3600) - 3600
+    _StubCoinalyzeHandler.rate_limited = 1
+    
+    async def poll(live):
+        async with httpx.AsyncClient() as client:
+            return await live.poll_once(client, "1hour", ("BTCUSDC.A",), close_ts)
+    
+    with patch("src.data.config.DB_FILE", db_file), \
+         patch("src.data.live_collector.backoff_delay", return_value=0):
+        collector = BitcoinDataCollector(symbols=["BTCUSDC.A"], intervals=["1hour"])
+        collector.connect_db(check_same_thread=False)
+        save = collector.save_price_data
+        failures = [sqlite3.OperationalError("database is locked")]
+        
+        def flaky_save(rows):
+            if failures:
+                raise failures.pop()
+            save(rows)
+        
+        collector.save_price_data = flaky_save
+        try:
+            live = LiveCollector(collector, base_url=stub_server)
+            started = time.monotonic()
+            saved = asyncio.run(poll(live))
+            elapsed = time.monotonic() - started
+            count = collector.db_conn.execute("SELECT COUNT(*) FROM bitcoin_prices").fetchone()[0]
+        finally:
+            collector.close()
+    
+    assert _StubCoinalyzeHandler.requests_count == 3  # 429, écriture en échec, succès
+    assert elapsed >= 0.3  # Attente demandée par Retry-After
+    assert saved == count == 2
+    assert ("BTCUSDC.A", "1hour") in live.lag
+
+def test_ohlcv_rollups_on_ingest(tmp_path):
+    """Test des agrégats OHLCV tenus à jour à l'ingestion, identiques à l'agrégation à la demande."""
+    db_file = str(tmp_path / "rollups.db")
+    start = datetime(2024, 1, 1)
+    rng = np.random.default_rng(0)
+    prices = 30000 + np.cumsum(rng.normal(0, 50, 500))
+    row = lambda h: (
+        (start + timedelta(hours=h)).strftime('%Y-%m-%d %H:%M:%S'),
+        prices[h], prices[h] + 10 + h % 5, prices[h] - 10 - h % 3, prices[h] + 1, 100.0 + h % 7, 50.0, 3, 1
+    )
+    with patch("src.data.config.DB_FILE", db_file):
+        collector = BitcoinDataCollector()
+        collector.connect_db()
+        try:
+            collector.save_price_data([row(h) for h in range(100, 490)])
+            for h in range(490, 500):  # Ingestion temps réel : dernière tranche seulement
+                collector.save_price_data([row(h)])
+            collector.save_price_data([row(h) for h in range(0, 100)])  # Backfill dans le passé
+            report = check_rollups(collector.db_conn)
+            daily, source = read_ohlcv(collector.db_conn, bucket_seconds=86400, start="2024-01-03", end="2024-01-10")
+            
+            # Bougie écrite hors collecteur : la table en retard est ignorée, puis rattrapée
+            collector.db_conn.execute("""
+                INSERT INTO bitcoin_prices
+                (timestamp, open_price, high_price, low_price, close_price, volume, volume_buy, transactions, transactions_buy)
+                VALUES ('2024-01-05 00:30:00', 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1, 1)
+            """)
+            collector.db_conn.commit()
+            stale, stale_source = read_ohlcv(collector.db_conn, bucket_seconds=86400, start="2024-01-03", end="2024-01-10")
+            assert not check_rollups(collector.db_conn)["ok"]
+            collector.save_price_data([row(499)])
+            caught_up, caught_up_source = read_ohlcv(collector.db_conn, bucket_seconds=86400, start="2024-01-03", end="2024-01-10")
+            assert check_rollups(collector.db_conn)["ok"]
+            collector.db_conn.execute("DELETE FROM bitcoin_prices WHERE timestamp = '2024-01-05 00:30:00'")
+            collector.db_conn.commit()
+        finally:
+            collector.close()
+        
+        assert rollups.main(["rebuild"]) == 0
+        assert rollups.main(["check"]) == 0
+    
+    assert report["ok"], report
+    assert set(report["resolutions"]) == {"4hour", "daily"}
+    assert report["resolutions"]["4hour"]["rows"] == 125
+    assert source == caught_up_source == "rollup" and stale_source == "aggregate"
+    assert stale == caught_up and len(daily) == 7
+    assert stale[2][-1] == daily[2][-1] + 1 and stale[2][1:-1] != daily[2][1:-1]
+    bucket, open_, high, low, close, volume, _, transactions, _, candles = daily[2]
+    hours = range(4 * 24, 5 * 24)
+    assert bucket == "2024-01-05 00:00:00" and candles == 24
+    assert open_ == row(hours[0])[1] and close == row(hours[-1])[4]
+    assert high == max(row(h)[2] for h in hours) and low == min(row(h)[3] for h in hours)
+    assert volume == pytest.approx(sum(row(h)[5] for h in hours)) and transactions == 72
+
+def test_stats_from_rollups(tmp_path):
+    """Test des statistiques combinant tranches précalculées et bougies des extrémités."""
+    db_file = str(tmp_path / "stats.db")
+    start = datetime(2024, 1, 1)
+    rng = np.random.default_rng(1)
+    prices = 30000 + np.cumsum(rng.normal(0, 50, 2000))
+    rows = [
+        ((start + timedelta(hours=h)).strftime('%Y-%m-%d %H:%M:%S'),
+         prices[h], prices[h] + 20, prices[h] - 15, prices[h] + 5, 100.0 + h % 7, 40.0 + h % 5, 3, 1)
+        for h in range(2000)
+    ]
+    with patch("src.data.config.DB_FILE", db_file):
+        collector = BitcoinDataCollector()
+        collector.connect_db()
+        try:
+            collector.save_price_data(rows)
+            conn = collector.db_conn
+            ok = check_rollups(conn)["ok"]
+            
+            ranges = [
+                ("2024-01-01 00:00:00", "2024-03-24 08:00:00"),  # Tout l'historique
+                ("2024-01-03 05:30:00", "2024-02-17 22:00:00"),
+                ("2024-01-10 01:00:00", "2024-01-10 03:00:00"),  # Moins d'une tranche
+                ("2024-02-01 00:00:00", None)
+            ]
+            results = [(read_stats(conn, start=a, end=b), read_stats(conn, start=a, end=b, use_rollups=False))
+                       for a, b in ranges]
+        finally:
+            collector.close()
+    
+    assert ok
+    assert [fast[1] for fast, _ in results] == ["rollup", "rollup", "aggregate", "rollup"]
+    for (fast, _), (slow, _) in results:
+        assert fast.keys() == slow.keys()
+        for key in fast:
+            assert fast[key] == pytest.approx(slow[key], rel=1e-9), key
+    stats = results[0][0][0]
+    assert stats["data_points"] == 2000
+    assert stats["min_price"] == pytest.approx(min(r[3] for r in rows))
+    assert stats["vwap"] == pytest.approx(
+        sum((r[2] + r[3] + r[4]) / 3 * r[5] for r in rows) / sum(r[5] for r in rows)
+    )
+    assert stats["buy_sell_ratio"] == pytest.approx(
+        sum(r[6] for r in rows) / sum(r[5] - r[6] for r in rows)
+    )
+
+
+def test_legacy_migration_is_atomic(tmp_path):
+    """Migration du schéma historique : défaite entièrement en cas d'erreur, reprise si interrompue."""
+    from src.data.storage import migrate_legacy_schema
+    db_file = str(tmp_path / "legacy.db")
+    legacy_schema = """
+        CREATE TABLE {} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TIMESTAMP NOT NULL,
+            open_price REAL NOT NULL,
+            high_price REAL NOT NULL,
+            low_price REAL NOT NULL,
+            close_price REAL NOT NULL,
+            volume REAL,
+            volume_buy REAL,
+            transactions INTEGER,
+            transactions_buy INTEGER,
+            UNIQUE(timestamp)
+        )
+    """
+    rows = [(f"2024-01-01 {h:02d}:00:00", 1.0, 2.0, 0.5, 1.5 + h, 10.0, 5.0, 3, 1) for h in range(5)]
+    conn = sqlite3.connect(db_file)
+    conn.execute(legacy_schema.format("bitcoin_prices"))
+    conn.executemany("""
+        INSERT INTO bitcoin_prices
+        (timestamp, open_price, high_price, low_price, close_price, volume, volume_buy, transactions, transactions_buy)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+    
+    class FailingCopy(sqlite3.Connection):
+        """Connexion dont la copie des lignes échoue, après le renommage de l'ancienne table."""
+        def execute(self, sql, *args):
+            if "FROM bitcoin_prices_legacy" in sql:
+                raise sqlite3.OperationalError("database is locked")
+            return super().execute(sql, *args)
+    
+    conn = sqlite3.connect(db_file, factory=FailingCopy)
+    with pytest.raises(sqlite3.OperationalError):
+        migrate_legacy_schema(conn)
+    conn.close()
+    
+    # Renommage et création défaits : l'ancienne table est intacte, puis migrée normalement
+    conn = sqlite3.connect(db_file)
+    tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "bitcoin_prices_legacy" not in tables
+    assert conn.execute("SELECT COUNT(*) FROM bitcoin_prices").fetchone()[0] == 5
+    conn.close()
+    conn = connect_writer(db_file)
+    assert conn.execute("SELECT COUNT(*) FROM bitcoin_prices WHERE symbol = 'BTCUSDC.A'").fetchone()[0] == 5
+    
+    # Migration interrompue par une version antérieure : nouvelle table partielle à côté de l'ancienne
+    conn.execute("DELETE FROM bitcoin_prices WHERE timestamp > '2024-01-01 01:00:00'")
+    conn.execute(legacy_schema.format("bitcoin_prices_legacy"))
+    conn.executemany("""
+        INSERT INTO bitcoin_prices_legacy
+        (timestamp, open_price, high_price, low_price, close_price, volume, volume_buy, transactions, transactions_buy)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+    conn = connect_writer(db_file)
+    try:
+        tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        closes = [row[0] for row in conn.execute("SELECT close_price FROM bitcoin_prices ORDER BY timestamp")]
+    finally:
+        conn.close()
+    assert "bitcoin_prices_legacy" not in tables
+    assert closes == [row[4] for row in rows]
+
+def test_read_training_data_coverage(tmp_path):
+    """Données d'entraînement : features précalculées si la table couvre la fenêtre, sinon prix bruts."""
+    from src.data.feature_store import read_training_data
+    db_file = str(tmp_path / "training.db")
+    start = datetime(2024, 1, 1)
+    rows = [
+        ((start + timedelta(hours=h)).strftime('%Y-%m-%d %H:%M:%S'), 100.0 + h, 101.0 + h, 99.0 + h, 100.5 + h,
+         10.0, 5.0, 3, 1)
+        for h in range(400)
+    ]
+    with patch("src.data.config.DB_FILE", db_file):
+        collector = BitcoinDataCollector()
+        collector.connect_db()
+        try:
+            collector.save_price_data(rows)
+            conn = collector.db_conn
+            window, full = read_training_data(conn, limit=100), read_training_data(conn)
+            
+            # Trou avant la fenêtre : la fenêtre reste couverte, pas tout l'historique
+            conn.execute("DELETE FROM bitcoin_features WHERE timestamp = ?", (rows[10][0],))
+            conn.commit()
+            gap_window, gap_full = read_training_data(conn, limit=100), read_training_data(conn)
+            
+            # Dernière bougie sans features (table en retard) : prix bruts
+            conn.execute("DELETE FROM bitcoin_features WHERE timestamp = ?", (rows[-1][0],))
+            conn.commit()
+            stale = read_training_data(conn, limit=100)
+        finally:
+            collector.close()
+    
+    assert len(window) == 100 and "y" in window and window["timestamp"].iloc[-1] == pd.Timestamp(rows[-1][0])
+    assert len(full) == 400 and "y" in full
+    assert "y" in gap_window and "y" not in gap_full and len(gap_full) == 400
+    assert "y" not in stale and len(stale) == 100
@@ -11,6 +11,10 @@ from src.models.prophet_model import BitcoinProphetModel
 from src.models.utils import prepare_data, evaluate_predictions
 from src.models.config import PROPHET_CONFIG, MODEL_PATHS
 
+# Artefact livré, lu à l'import : test_model_training le réécrit ensuite
+with open(MODEL_PATHS['PROPHET'], 'rb') as f:
+    SHIPPED_ARTIFACT = f.read()
+
 @pytest.fixture
 def sample_data():
     """Génère des données synthétiques pour les tests."""
@@ -190,4 +194,427 @@ if __name__ == '__main__':
         print(f"\n📋 Exécution de {test.__name__}")
         test(data)
     
-    print("\n✨ Tous les tests sont terminés") 
\ No newline at end of file
+    print("\n✨ Tous les tests sont terminés") 
+def test_model_registry_hot_swap(tmp_path):
+    """Test du chargement unique et du remplacement à chaud du modèle."""
+    import time
+    from src.models.registry import ModelRegistry
+
+    model_path = str(tmp_path / "prophet_model.jsonl")
+    BitcoinProphetModel().save(model_path)
+    registry = ModelRegistry(model_path, check_interval=0.05)
+
+    first = registry.current()
+    assert first is not None and not first.model.is_trained
+    assert registry.current() is first, "Le modèle ne doit être chargé qu'une fois"
+    assert not registry.reload(), "Fichier inchangé : pas de rechargement"
+
+    # Publication d'une nouvelle version : remplacée, l'ancienne reste utilisable
+    new_model = BitcoinProphetModel()
+    new_model.is_trained = True
+    new_model.save(model_path)
+    registry.start()
+    try:
+        deadline = datetime.now() + timedelta(seconds=5)
+        while registry.current().version == first.version and datetime.now() < deadline:
+            time.sleep(0.01)
+    finally:
+        registry.stop()
+    assert registry.current().version != first.version
+    assert registry.current().model.is_trained
+    assert not first.model.is_trained
+
+    # Un fichier corrompu ne remplace pas la version courante
+    current = registry.current()
+    with open(model_path, "wb") as f:
+        f.write(b"corrompu")
+    assert not registry.reload()
+    assert registry.current() is current
+
+def test_bounded_history_matches_full(sample_data):
+    """Les régresseurs calculés sur la fenêtre bornée égalent ceux de l'historique complet."""
+    from src.models.indicator_state import PREDICT_HISTORY
+
+    model = BitcoinProphetModel()
+    full = model.prepare_data(sample_data).iloc[-1]
+    window = model.prepare_data(sample_data.tail(PREDICT_HISTORY)).iloc[-1]
+    columns = ['ema_5', 'ema_8', 'ema_13', 'ema_21', 'momentum', 'trend_1d', 'trend_3d', 'trend_5d']
+    np.testing.assert_allclose(window[columns].astype(float), full[columns].astype(float), rtol=1e-9)
+
+def test_incremental_indicator_state(sample_data):
+    """L'état avancé bougie par bougie reproduit le calcul batch de prepare_data."""
+    from src.models.indicator_state import IndicatorState, REGRESSOR_COLUMNS
+
+    prepared = BitcoinProphetModel().prepare_data(sample_data)
+    state = IndicatorState()
+    warmup = 6  # Au-delà, aucune valeur n'est complétée par bfill dans le batch
+    for i, row in enumerate(sample_data.itertuples()):
+        features = state.update(row.timestamp, row.close_price, row.volume)
+        if i >= warmup:
+            expected = prepared.iloc[i]
+            for col in REGRESSOR_COLUMNS + ['y']:
+                assert features[col] == pytest.approx(expected[col], rel=1e-9, abs=1e-12), col
+
+    # Construction vectorisée et persistance équivalentes
+    rebuilt = IndicatorState.from_dict(IndicatorState.from_frame(sample_data).to_dict())
+    for col in REGRESSOR_COLUMNS:
+        assert rebuilt.features()[col] == pytest.approx(state.features()[col], rel=1e-9)
+
+    # Révision de la dernière bougie : remplacée, pas empilée
+    last = sample_data.iloc[-1]
+    revised = state.update(last['timestamp'], last['close_price'] * 1.01, last['volume'])
+    expected = BitcoinProphetModel().prepare_data(
+        sample_data.assign(close_price=sample_data['close_price'].where(
+            sample_data.index != sample_data.index[-1], last['close_price'] * 1.01))
+    ).iloc[-1]
+    assert revised['ema_21'] == pytest.approx(expected['ema_21'], rel=1e-9)
+    with pytest.raises(ValueError):
+        state.update(sample_data.iloc[0]['timestamp'], 1.0, 1.0)
+
+def test_prepare_data_precomputed_features(sample_data):
+    """Les features précalculées (bitcoin_features) sont utilisées sans recalcul."""
+    from src.models.features import compute_features
+    from src.models.indicator_state import REGRESSOR_COLUMNS
+
+    model = BitcoinProphetModel()
+    precomputed = sample_data.merge(
+        compute_features(sample_data).assign(timestamp=lambda f: f['timestamp']), on='timestamp'
+    )
+    expected = model.prepare_data(sample_data)
+    prepared = model.prepare_data(precomputed)
+    np.testing.assert_allclose(
+        prepared[REGRESSOR_COLUMNS].astype(float), expected[REGRESSOR_COLUMNS].astype(float), rtol=1e-12
+    )
+
+def test_indicator_engine_matches_ta():
+    """Le moteur NumPy reproduit les indicateurs de `ta` et de pandas."""
+    import ta
+    from src.models.indicators import compute_indicators
+
+    rng = np.random.default_rng(1)
+    close = pd.Series(30000 * np.exp(np.cumsum(rng.normal(0, 0.01, 5000))))
+    volume = pd.Series(rng.uniform(10, 1000, 5000))
+    macd = ta.trend.MACD(close=close, window_fast=12, window_slow=26, window_sign=9)
+    bollinger = ta.volatility.BollingerBands(close=close, window=20, window_dev=2)
+    expected = {
+        'rsi': ta.momentum.RSIIndicator(close=close, window=14).rsi(),
+        'macd': macd.macd(),
+        'macd_signal': macd.macd_signal(),
+        'macd_diff': macd.macd_diff(),
+        'bb_high': bollinger.bollinger_hband(),
+        'bb_mid': bollinger.bollinger_mavg(),
+        'bb_low': bollinger.bollinger_lband(),
+        'volatility': close.pct_change().rolling(window=30).std(),
+        'volume_sma': volume.rolling(window=20).mean()
+    }
+    for period in [9, 21, 50, 200]:
+        expected[f'ta_ema_{period}'] = ta.trend.EMAIndicator(close=close, window=period).ema_indicator()
+    for period in [1, 7, 14, 30]:
+        expected[f'return_{period}d'] = close.pct_change(periods=period)
+
+    indicators = compute_indicators(close.to_numpy(), volume.to_numpy())
+    assert set(indicators) == set(expected)
+    for name, values in expected.items():
+        np.testing.assert_array_equal(np.isnan(indicators[name]), values.isna().to_numpy(), err_msg=name)
+        np.testing.assert_allclose(indicators[name], values.to_numpy(), rtol=1e-9, atol=1e-9, err_msg=name)
+
+def test_create_sequences(tmp_path):
+    """Séquences sans copie, matérialisées ou par lots identiques à la boucle de référence."""
+    from src.models.utils import create_sequences, iter_sequences
+
+    data = np.arange(200, dtype=np.float64).reshape(100, 2)
+    expected_X = np.array([data[i:i + 7] for i in range(len(data) - 7)])
+    expected_y = data[7:]
+
+    X, y = create_sequences(data, 7)
+    assert X.shape == (93, 7, 2) and np.shares_memory(X, data)
+    np.testing.assert_array_equal(X, expected_X)
+    np.testing.assert_array_equal(y, expected_y)
+
+    X, y = create_sequences(data, 7, copy=True)
+    assert X.flags['C_CONTIGUOUS'] and not np.shares_memory(X, data)
+    np.testing.assert_array_equal(X, expected_X)
+
+    stored = np.memmap(tmp_path / "data.bin", dtype=np.float64, mode='w+', shape=data.shape)
+    stored[:] = data
+    batches = list(iter_sequences(stored, 7, batch_size=10))
+    assert len(batches) == 10
+    np.testing.assert_array_equal(np.concatenate([b[0] for b in batches]), expected_X)
+    np.testing.assert_array_equal(np.concatenate([b[1] for b in batches]), expected_y)
+
+    X, y = create_sequences(data[:5], 7)
+    assert X.shape == (0, 7, 2) and len(y) == 0
+
+def test_walk_forward_backtest(tmp_path):
+    """Backtest walk-forward parallèle : un résultat par pli et rapport relu."""
+    from src.models.backtest import run_backtest, save_report, load_report
+
+    dates = pd.date_range('2024-01-01', periods=40 * 24, freq='h')
+    rng = np.random.default_rng(3)
+    close = 40000 + np.cumsum(rng.normal(0, 30, len(dates)))
+    df = pd.DataFrame({'timestamp': dates, 'close_price': close, 'volume': rng.uniform(10, 100, len(dates))})
+
+    report = run_backtest(df, folds=2, horizon=3, step=3, train_days=20, workers=2)
+    assert report['workers'] == 2
+    assert [fold['fold'] for fold in report['folds']] == [0, 1]
+    for fold in report['folds']:
+        assert fold['train_rows'] == 20 * 24 and fold['test_rows'] == 3 * 24
+        assert fold['seconds'] > 0
+        assert set(fold['metrics']) == {'RMSE', 'MAE', 'MAPE', 'R2'}
+    assert report['metrics']['MAE'] > 0
+
+    path = str(tmp_path / "backtest.json")
+    save_report(report, path)
+    assert load_report(path) == report
+    assert load_report(str(tmp_path / "absent.json")) is None
+
+    # En ligne de commande : plis lus depuis bitcoin_features, sans recalcul depuis les prix bruts
+    from unittest.mock import patch
+    from src.data.collector import BitcoinDataCollector
+    from src.models import backtest
+    db_file = str(tmp_path / "backtest.db")
+    with patch("src.data.config.DB_FILE", db_file):
+        collector = BitcoinDataCollector()
+        collector.connect_db()
+        collector.save_price_data([
+            (ts.strftime('%Y-%m-%d %H:%M:%S'), c, c + 10, c - 10, c, v, v / 2, 3, 1)
+            for ts, c, v in zip(dates, close, df['volume'])
+        ])
+        collector.close()
+        with patch.object(backtest, "run_backtest", wraps=backtest.run_backtest) as run:
+            assert backtest.main(["--folds", "1", "--horizon", "3", "--train-days", "10", "--workers", "1",
+                                  "--output", str(tmp_path / "cli.json")]) == 0
+    assert {'y', 'ema_5', 'rsi'} <= set(run.call_args.args[0].columns)
+    assert load_report(str(tmp_path / "cli.json"))['folds'][0]['metrics']['MAE'] > 0
+
+def test_hyperparameter_search(tmp_path):
+    """Recherche parallèle : cache par empreinte, arrêt anticipé et paramètres versionnés."""
+    import math
+    from unittest.mock import patch
+    from src.models.tuning import make_candidates, run_search, publish_params, select_regressors
+
+    assert len(make_candidates('grid')) == 1 + 4 * 3 * 2 * 3
+    assert len(make_candidates('random', n_iter=5)) == 6
+
+    dates = pd.date_range('2024-01-01', periods=20 * 24, freq='h')
+    rng = np.random.default_rng(4)
+    close = 40000 + np.cumsum(rng.normal(0, 30, len(dates)))
+    df = pd.DataFrame({'timestamp': dates, 'close_price': close, 'volume': rng.uniform(10, 100, len(dates))})
+    candidates = [
+        {'name': f'cps={cps}', 'params': {**PROPHET_CONFIG, 'changepoint_prior_scale': cps},
+         'regressors': select_regressors(['ema', 'momentum'])}
+        for cps in (0.05, 0.5)
+    ]
+    cache_dir = str(tmp_path / "cache")
+    options = dict(folds=2, horizon=2, step=2, train_days=10, cache_dir=cache_dir)
+
+    search = run_search(df, candidates, workers=2, **options)
+    assert search['evaluated'] == 2 and search['workers'] == 2
+    assert search['best']['score'] == min(r['score'] for r in search['candidates'])
+    assert search['cpu_seconds'] > 0 and search['speedup'] > 0
+
+    # Même recherche : tous les scores viennent du cache
+    again = run_search(df, candidates, workers=2, **options)
+    assert again['evaluated'] == 0 and again['cached'] == 2
+    assert again['best']['key'] == search['best']['key']
+
+    # Arrêt anticipé : tout pli moins bon que le meilleur score abandonne le candidat
+    stopped_candidates = candidates + [{**candidates[0], 'name': 'ema', 'regressors': ['ema_5']}]
+    stopped = run_search(df, stopped_candidates, workers=1, early_stop_factor=1e-6, **options)
+    assert stopped['evaluated'] == 1 and stopped['stopped'] == 1
+    assert len(next(r for r in stopped['candidates'] if r['stopped'])['folds']) == 1
+
+    # Un abandon n'est pas mis en cache : le candidat est réévalué sans seuil
+    resumed = run_search(df, stopped_candidates, workers=1, early_stop_factor=math.inf, **options)
+    assert resumed['evaluated'] == 1 and resumed['stopped'] == 0
+    assert all(r['score'] is not None for r in resumed['candidates'])
+
+    path, history = str(tmp_path / "params.json"), str(tmp_path / "history")
+    assert publish_params(search, path, history)['version'] == 1
+    assert publish_params(search, path, history)['version'] == 2
+    with patch.dict(MODEL_PATHS, {'PARAMS': path}):
+        model = BitcoinProphetModel()
+    assert model.regressors == search['best']['regressors']
+    assert model.model.changepoint_prior_scale == search['best']['params']['changepoint_prior_scale']
+
+    # En ligne de commande : candidats évalués sur les features de bitcoin_features
+    from src.data.collector import BitcoinDataCollector
+    from src.models import tuning
+    db_file = str(tmp_path / "tuning.db")
+    with patch("src.data.config.DB_FILE", db_file), patch.dict(MODEL_PATHS, {'TUNING_CACHE': cache_dir}):
+        collector = BitcoinDataCollector()
+        collector.connect_db()
+        collector.save_price_data([
+            (ts.strftime('%Y-%m-%d %H:%M:%S'), c, c + 10, c - 10, c, v, v / 2, 3, 1)
+            for ts, c, v in zip(dates, close, df['volume'])
+        ])
+        collector.close()
+        with patch.object(tuning, "run_search", wraps=tuning.run_search) as run:
+            assert tuning.main(["--search", "random", "--n-iter", "1", "--folds", "1", "--horizon", "2",
+                                "--train-days", "10", "--workers", "1", "--dry-run"]) == 0
+    assert {'y', 'ema_5', 'rsi'} <= set(run.call_args.args[0].columns)
+
+def test_incremental_retrain():
+    """Réentraînement planifié : seuil de nouvelles bougies, fenêtre glissante et démarrage à chaud."""
+    from src.models.retrain import history_rows
+
+    dates = pd.date_range('2024-01-01', periods=30 * 24, freq='h')
+    rng = np.random.default_rng(6)
+    close = 40000 * np.exp(np.cumsum(rng.normal(0, 0.003, len(dates))))
+    df = pd.DataFrame({'timestamp': dates, 'close_price': close, 'volume': rng.uniform(10, 100, len(dates))})
+
+    model = BitcoinProphetModel()
+    first = model.retrain(df[:-30], window_days=20, save=False)
+    assert first['retrained'] and not first['warm_start']
+    assert first['rows'] == 20 * 24 and first['iterations'] > 0
+    assert model.last_data['ds'].min() > df['timestamp'].iloc[-31] - pd.Timedelta(days=20)
+
+    # Paramètres convertis vers les échelles des mêmes données : identiques aux paramètres bruts
+    raw, mapped = model.warm_start_params(), model.warm_start_params(model.last_data)
+    for name in ('k', 'm', 'sigma_obs', 'delta', 'beta'):
+        np.testing.assert_allclose(mapped[name], raw[name], rtol=1e-6, atol=1e-9)
+
+    assert model.retrain(df[:-20], window_days=20, save=False) == {'retrained': False, 'new_rows': 10}
+    second = model.retrain(df, window_days=20, max_iter=500, save=False)
+    assert second['retrained'] and second['new_rows'] == 30
+    assert second['iterations'] <= 500
+    assert BitcoinProphetModel.from_state({
+        'model': model.model, 'last_data': model.last_data, 'is_trained': True, 'fit_info': model.fit_info
+    }).fit_info == model.fit_info
+
+    assert history_rows(None) is None
+    assert history_rows(10, '1hour') > 240
+
+def test_model_artifact(tmp_path):
+    """Artefact compact : manifeste, empreinte, prédictions identiques et ancien pickle converti explicitement."""
+    import pickle
+    from src.models import artifact
+
+    dates = pd.date_range('2024-01-01', periods=20 * 24, freq='h')
+    rng = np.random.default_rng(7)
+    close = 40000 * np.exp(np.cumsum(rng.normal(0, 0.003, len(dates))))
+    df = pd.DataFrame({'timestamp': dates, 'close_price': close, 'volume': rng.uniform(10, 100, len(dates))})
+    model = BitcoinProphetModel()
+    model.train(df[:-24], save=False)
+
+    path = str(tmp_path / "prophet_model.jsonl")
+    model.save(path)
+    manifest = artifact.read_manifest(path)
+    assert manifest['data_watermark'] == model.data_watermark
+    assert manifest['data_watermark']['last'] == str(dates[-25])
+    assert manifest['regressors'] == model.regressors and manifest['fit_info'] == model.fit_info
+
+    # Taille indépendante de l'historique : ni données d'entraînement ni tendance point par point
+    legacy = pickle.dumps({'model': model.model, 'last_data': model.last_data,
+                           'is_trained': True, 'fit_info': model.fit_info})
+    assert os.path.getsize(path) < len(legacy) / 5
+
+    loaded = BitcoinProphetModel.load(path)
+    assert loaded.last_data is None and loaded.regressors == model.regressors
+    np.random.seed(0)
+    expected = model.predict(df[:-24], 3)
+    np.random.seed(0)
+    pd.testing.assert_frame_equal(loaded.predict(df[:-24], 3), expected)
+    pd.testing.assert_frame_equal(loaded.predict(None, 3)[['ds', 'yhat']], expected[['ds', 'yhat']])
+
+    # Le filigrane remplace last_data pour compter les nouvelles bougies
+    assert loaded.retrain(df, min_new_rows=25, save=False) == {'retrained': False, 'new_rows': 24}
+
+    # Ancien pickle refusé au chargement, lisible seulement par la conversion explicite
+    legacy_path = tmp_path / "prophet_model.pkl"
+    legacy_path.write_bytes(legacy)
+    with pytest.raises(artifact.ArtifactError):
+        BitcoinProphetModel.from_bytes(legacy)
+    with pytest.raises(artifact.ArtifactError):
+        BitcoinProphetModel.load(str(legacy_path))
+    converted = str(tmp_path / "converted.jsonl")
+    assert artifact.main(["convert", str(legacy_path), converted]) == 0
+    assert BitcoinProphetModel.load(converted).data_watermark == model.data_watermark
+
+    # Artefact modifié refusé
+    with open(path, 'rb') as f:
+        data = f.read()
+    with pytest.raises(artifact.ArtifactError):
+        BitcoinProphetModel.from_bytes(data.replace(b'"k":[[', b'"k":[[1'))
+
+def test_forecast_native_interval():
+    """Prévision au pas des données : dates horaires, Fourier en cache identique à Prophet, horizons groupés."""
+    import copy
+    from prophet import Prophet
+    from src.models.forecast import ForecastProphet, fourier_grid
+    from src.models.indicator_state import IndicatorState
+
+    grid = pd.Series(pd.date_range('2024-03-01 05:00', periods=500, freq='h'))
+    for period, order in [(1, 4), (7, 3), (30.5, 10), (365.25, 10)]:
+        np.testing.assert_allclose(fourier_grid(grid, period, order),
+                                   Prophet.fourier_series(grid, period, order), atol=1e-9)
+    assert fourier_grid(grid.drop(3), 7, 3) is None, "Grille irrégulière : calcul de Prophet"
+
+    dates = pd.date_range('2024-01-01', periods=20 * 24, freq='h')
+    rng = np.random.default_rng(8)
+    close = 40000 * np.exp(np.cumsum(rng.normal(0, 0.003, len(dates))))
+    df = pd.DataFrame({'timestamp': dates, 'close_price': close, 'volume': rng.uniform(10, 100, len(dates))})
+    model = BitcoinProphetModel()
+    model.train(df, save=False)
+    assert isinstance(model.model, ForecastProphet) and model.interval == 3600
+
+    state = IndicatorState.from_frame(df)
+    forecasts = model.predict_horizons(state, [1, 3])
+    assert len(forecasts[1]) == 24 and len(forecasts[3]) == 72
+    assert forecasts[3]['ds'].iloc[0] == dates[-1] + pd.Timedelta(hours=1)
+    assert (forecasts[3]['ds'].diff().dropna() == pd.Timedelta(hours=1)).all()
+    np.testing.assert_allclose(forecasts[1]['yhat'], forecasts[3]['yhat'][:24])
+
+    # Même prévision que Prophet sans cache, sur le même cadre futur
+    plain = copy.copy(model.model)
+    plain.__class__ = Prophet
+    features = state.features()
+    future = pd.DataFrame({'ds': forecasts[3]['ds']})
+    for name in model.model.extra_regressors:
+        future[name] = 0.0 if pd.isna(features[name]) else features[name]
+    future['volume_norm'] = model.model.extra_regressors['volume_norm']['mu']
+    np.testing.assert_allclose(plain.predict(future)['yhat'], forecasts[3]['yhat'], atol=1e-9)
+
+def test_shipped_artifact_forecasts_hourly():
+    """L'artefact livré, sans pas mesuré dans son filigrane, prévoit au pas horaire collecté."""
+    model = BitcoinProphetModel.from_bytes(SHIPPED_ARTIFACT)
+    assert 'interval_seconds' not in model.data_watermark
+    assert model.interval == 3600
+    
+    forecast = model.predict(None, 1)
+    assert len(forecast) == 24
+    assert (forecast['ds'].diff().dropna() == pd.Timedelta(hours=1)).all()
+
+def test_process_model_loaded_once_per_version(tmp_path):
+    """Processus de prévision : modèle chargé une fois par version, fichier remplacé détecté."""
+    import hashlib
+    from unittest.mock import patch
+    from src.models import registry
+    from src.models.indicator_state import IndicatorState
+
+    dates = pd.date_range('2024-01-01', periods=10 * 24, freq='h')
+    rng = np.random.default_rng(9)
+    close = 40000 * np.exp(np.cumsum(rng.normal(0, 0.003, len(dates))))
+    df = pd.DataFrame({'timestamp': dates, 'close_price': close, 'volume': rng.uniform(10, 100, len(dates))})
+    model = BitcoinProphetModel()
+    model.train(df, save=False)
+    model_path = str(tmp_path / "prophet_model.jsonl")
+    model.save(model_path)
+    with open(model_path, 'rb') as f:
+        sha256 = hashlib.sha256(f.read()).hexdigest()
+
+    registry._process_model.clear()
+    state = IndicatorState.from_frame(df)
+    with patch.object(BitcoinProphetModel, 'from_bytes', wraps=BitcoinProphetModel.from_bytes) as from_bytes:
+        registry.preload_process_model(model_path)
+        first = registry.forecast_process(model_path, sha256, state, 1)
+        second = registry.forecast_process(model_path, sha256, state, 2)
+    assert from_bytes.call_count == 1
+    assert len(first) == 24 and len(second) == 48
+    pd.testing.assert_frame_equal(first[['ds', 'yhat']], model.predict(state, 1)[['ds', 'yhat']])
+
+    # Version inconnue et fichier remplacé : la requête doit fournir le modèle
+    BitcoinProphetModel().save(model_path)
+    with pytest.raises(registry.StaleModelError):
+        registry.forecast_process(model_path, "0" * 64, state, 1)
+    registry._process_model.clear()